@@ -0,0 +1,188 @@
+"""
+并发收集引擎基准测试
+通过HotspotCollector走完整的收集流程（HttpClient限流器、熔断器、整体截止时间、正文读取、快照保存），
+只把网络换成挂在HttpClient会话上的桩传输层: 按URL返回固定的响应，并按设定的延迟等待。
+对比 collect_all 顺序收集与 collect_all_async 并发收集的耗时，以及:
+    - 慢接口 + --deadline: 超时平台标记为timeout，其余平台按时保存
+    - 连续采集（共享客户端）: 限流器在同一主机上的等待
+    - 接口持续5xx: 熔断器打开后跳过该接口，不再等待它
+
+运行: python benchmarks/bench_async_collect.py
+"""
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.bench_html_parsers import make_github_fixture
+from hotspot_collector import HotspotCollector
+from utils.circuit_breaker import CircuitBreaker
+from utils.http_client import HttpClient
+
+RANKING_URL = "https://api.bilibili.com/x/web-interface/ranking/v2"
+HOT_SEARCH_URL = "https://app.bilibili.com/x/v2/search/trending/ranking"
+TRENDING_URL = "https://github.com/trending"
+
+# 各接口的模拟延迟（秒）
+LATENCY = {
+    RANKING_URL: 0.3,
+    HOT_SEARCH_URL: 0.2,
+    TRENDING_URL: 0.5
+}
+
+
+def make_bodies():
+    ranking = {"code": 0, "message": "0", "data": {"list": [
+        {"bvid": f"BV{i}", "title": f"视频{i}", "duration": 120, "owner": {"name": f"up{i}"},
+         "stat": {"view": 10000 - i, "like": 100}} for i in range(20)]}}
+    hot_search = {"code": 0, "data": {"list": [
+        {"keyword": f"热搜{i}", "show_name": f"热搜{i}", "heat": 1000 - i} for i in range(20)]}}
+    return {
+        RANKING_URL: (json.dumps(ranking).encode("utf-8"), "application/json"),
+        HOT_SEARCH_URL: (json.dumps(hot_search).encode("utf-8"), "application/json"),
+        TRENDING_URL: (make_github_fixture().encode("utf-8"), "text/html; charset=utf-8")
+    }
+
+
+class StubTransport(HTTPAdapter):
+    """按URL返回固定正文的传输层，等待模拟延迟；超过读取超时时抛出ReadTimeout
+
+    继承HTTPAdapter只是为了保留空的连接池，HttpClient.connection_stats照常可用
+    """
+
+    def __init__(self, bodies, latency, status=None):
+        super().__init__()
+        self.bodies = bodies
+        self.latency = latency
+        self.status = status or {}
+        self._lock = threading.Lock()
+        self.sent = {}
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        url = request.url.split("?", 1)[0]
+        with self._lock:
+            self.sent[url] = self.sent.get(url, 0) + 1
+
+        delay = self.latency.get(url, 0.1)
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        if read_timeout is not None and read_timeout < delay:
+            time.sleep(read_timeout)
+            raise requests.ReadTimeout(f"桩传输层: {url} 需要 {delay}s，超时 {read_timeout:.2f}s", request=request)
+        time.sleep(delay)
+
+        body, content_type = self.bodies[url]
+        response = requests.Response()
+        response.status_code = self.status.get(url, 200)
+        response.headers["Content-Type"] = content_type
+        response.headers["Content-Length"] = str(len(body))
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+def make_collector(data_dir, transport, breaker_file=None):
+    """真实的HttpClient（默认限流预算、正文上限，可选熔断器），只替换传输层"""
+    client = HttpClient(circuit_breaker=CircuitBreaker(breaker_file) if breaker_file else None)
+    client.session.mount("https://", transport)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return HotspotCollector(data_dir=data_dir, http_client=client, history=False)
+
+
+def timed(func):
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        result = func()
+    return time.perf_counter() - start, result
+
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def bench_sequential_vs_async(bodies, rounds):
+    sequential, concurrent = [], []
+    for _ in range(rounds):
+        with tempfile.TemporaryDirectory() as data_dir:
+            collector = make_collector(data_dir, StubTransport(bodies, LATENCY))
+            elapsed, _ = timed(lambda: collector.collect_all())
+            sequential.append(elapsed)
+        with tempfile.TemporaryDirectory() as data_dir:
+            collector = make_collector(data_dir, StubTransport(bodies, LATENCY))
+            elapsed, _ = timed(lambda: asyncio.run(collector.collect_all_async()))
+            concurrent.append(elapsed)
+
+    sequential, concurrent = min(sequential), min(concurrent)
+    print(f"\n📦 顺序 vs 并发 (接口延迟 {', '.join(f'{v}s' for v in LATENCY.values())}，取{rounds}轮最快)")
+    print(f"  collect_all        {sequential:6.2f}s")
+    print(f"  collect_all_async  {concurrent:6.2f}s   ({sequential / concurrent:.1f}x)")
+
+
+def bench_deadline(bodies, deadline):
+    latency = dict(LATENCY)
+    latency[TRENDING_URL] = 5.0
+    with tempfile.TemporaryDirectory() as data_dir:
+        collector = make_collector(data_dir, StubTransport(bodies, latency))
+        elapsed, filename = timed(lambda: asyncio.run(collector.collect_all_async(deadline=deadline)))
+        snapshot = load(filename)
+
+    statuses = ", ".join(f"{platform}={info['status']}" for platform, info in snapshot["platforms"].items())
+    print(f"\n⏰ 整体预算 {deadline}s，GitHub延迟 {latency[TRENDING_URL]}s")
+    print(f"  耗时 {elapsed:.2f}s | {statuses} | 超时平台: {snapshot['deadline']['timed_out']}")
+
+
+def bench_throttle(bodies, runs):
+    with tempfile.TemporaryDirectory() as data_dir:
+        collector = make_collector(data_dir, StubTransport(bodies, LATENCY))
+        print(f"\n🚦 共享客户端连续并发采集 {runs} 次（默认令牌桶预算）")
+        for run in range(1, runs + 1):
+            elapsed, _ = timed(lambda: asyncio.run(collector.collect_all_async()))
+            print(f"  第{run}次 {elapsed:5.2f}s | 累计限流等待 {collector.http.rate_limiter.total_throttled_seconds():5.2f}s")
+        for key, entry in collector.http.throttle_stats().items():
+            print(f"  {key:20} 请求 {entry['requests']} | 等待 {entry['throttled']} 次 "
+                  f"共 {entry['throttled_seconds']:.2f}s")
+
+
+def bench_breaker(bodies, runs):
+    latency = dict(LATENCY)
+    latency[HOT_SEARCH_URL] = 1.0
+    with tempfile.TemporaryDirectory() as data_dir:
+        breaker_file = os.path.join(data_dir, "circuit_state.json")
+        print(f"\n🔌 B站热搜持续返回503（延迟 {latency[HOT_SEARCH_URL]}s），熔断器状态跨运行保存")
+        for run in range(1, runs + 1):
+            # 每次运行新建客户端，熔断状态从文件加载，与实际的定时采集相同
+            transport = StubTransport(bodies, latency, status={HOT_SEARCH_URL: 503})
+            collector = make_collector(data_dir, transport, breaker_file=breaker_file)
+            elapsed, _ = timed(lambda: asyncio.run(collector.collect_all_async()))
+            state = collector.http.circuit_stats().get("app.bilibili.com/x/v2/search/trending/ranking", {})
+            print(f"  第{run}次 {elapsed:5.2f}s | 热搜请求 {transport.sent.get(HOT_SEARCH_URL, 0)} 次 | "
+                  f"熔断状态 {state.get('state', 'closed')}")
+
+
+def main():
+    bodies = make_bodies()
+    print("=" * 60)
+    print("并发收集基准测试 (HotspotCollector + HttpClient，桩传输层)")
+    print("=" * 60)
+    bench_sequential_vs_async(bodies, rounds=3)
+    bench_deadline(bodies, deadline=1.5)
+    bench_throttle(bodies, runs=4)
+    bench_breaker(bodies, runs=5)
+    print("=" * 60)
+    print("💡 并发模式的总耗时接近最慢的接口；同一主机的请求间隔仍由令牌桶保证")
+
+
+if __name__ == "__main__":
+    main()
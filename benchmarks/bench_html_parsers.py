@@ -0,0 +1,158 @@
+"""
+HTML解析后端基准测试
+在页面样本上比较各后端每页解析耗时，并检查各后端输出完全一致。
+legacy 为原先的做法: BeautifulSoup构建整页树后逐个select。
+
+运行: python benchmarks/bench_html_parsers.py
+      python benchmarks/bench_html_parsers.py --github 保存的trending.html --weibo 保存的summary.html
+"""
+import argparse
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawlers.html_parsers import available_backends, parse_trending_articles, parse_weibo_rows
+
+ROUNDS = 20
+
+
+def make_github_fixture(article_count=25):
+    """仿照github.com/trending结构生成页面，外层包含大量无关的头部、脚本和页脚"""
+    noise = "".join(
+        f'<div class="Header-item"><a href="/nav/{i}" class="Link">导航 {i}</a>'
+        f'<svg aria-hidden="true" height="16"><path d="M8 0c4.42 0 8 3.58 8 8"></path></svg></div>'
+        for i in range(800)
+    )
+    scripts = "".join(f"<script>window.__data{i} = {{'k': '{'x' * 200}'}};</script>" for i in range(200))
+    articles = []
+    for i in range(article_count):
+        articles.append(f"""
+<article class="Box-row">
+  <div class="float-right d-flex"><div class="BtnGroup"><a href="/login">Star</a></div></div>
+  <h2 class="h3 lh-condensed">
+    <a href="/owner{i}/repo-{i}" class="Link">
+      <svg class="octicon octicon-repo"></svg>
+      <span class="text-normal">owner{i} /</span>
+      repo-{i}
+    </a>
+  </h2>
+  <p class="col-9 color-fg-muted my-1 pr-4">
+    A &amp; B description for repo {i} <g-emoji>🚀</g-emoji> with  spaces
+  </p>
+  <div class="f6 color-fg-muted mt-2">
+    <span class="d-inline-block ml-0 mr-3">
+      <span class="repo-language-color"></span>
+      <span itemprop="programmingLanguage">{'Python' if i % 2 else 'TypeScript'}</span>
+    </span>
+    <a href="/owner{i}/repo-{i}/stargazers" class="Link Link--muted d-inline-block mr-3">
+      <svg class="octicon octicon-star"></svg>
+      {i * 1234:,}
+    </a>
+    <a href="/owner{i}/repo-{i}/forks" class="Link Link--muted d-inline-block mr-3">
+      <svg class="octicon octicon-repo-forked"></svg>
+      {i}.{i % 10}k
+    </a>
+    <span class="d-inline-block mr-3">Built by <a href="/u{i}"><img alt="@u{i}"></a></span>
+    <span class="d-inline-block float-sm-right">
+      <svg class="octicon octicon-star"></svg>
+      {i * 37:,} stars today
+    </span>
+  </div>
+</article>""")
+    return (f"<!DOCTYPE html><html><head>{scripts}</head><body><header>{noise}</header>"
+            f"<main><div class=\"Box\">{''.join(articles)}</div></main><footer>{noise}</footer></body></html>")
+
+
+def make_weibo_fixture(row_count=50):
+    """仿照s.weibo.com/top/summary结构生成页面"""
+    scripts = "".join(f"<script>var conf{i} = '{'y' * 300}';</script>" for i in range(100))
+    rows = "".join(f"""
+<tr>
+  <td class="td-01 ranktop">{i}</td>
+  <td class="td-02">
+    <a href="/weibo?q=%23topic{i}%23&amp;t=31" target="_blank">话题 {i} &amp; 新闻</a>
+    <span> 剧集 {i * 10000 + 123}</span>
+  </td>
+  <td class="td-03"><i class="icon-txt icon-txt-hot">热</i></td>
+</tr>""" for i in range(1, row_count + 1))
+    return (f"<html><head>{scripts}</head><body><div id=\"pl_top_realtimehot\"><table><tbody>"
+            f"{rows}</tbody></table></div></body></html>")
+
+
+def legacy_trending(html):
+    """原先的解析方式，作为对照"""
+    soup = BeautifulSoup(html, "html.parser")
+    result = []
+    for article in soup.select("article.Box-row"):
+        title_elem = article.select_one("h2 a")
+        if not title_elem:
+            continue
+        for selector in ("p", 'span[itemprop="programmingLanguage"]', 'a[href$="/stargazers"]',
+                         'a[href$="/forks"]', "span.d-inline-block.float-sm-right"):
+            article.select(selector)
+        result.append(title_elem.get_text(strip=True))
+    return result
+
+
+def legacy_weibo(html):
+    soup = BeautifulSoup(html, "html.parser")
+    return [td.find("a") for td in soup.find_all("td", class_="td-02")]
+
+
+def time_per_page(func, html):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(html)
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def run_suite(name, html, parse, legacy):
+    print(f"\n📄 {name} ({len(html) / 1024:.0f}KB)")
+    print(f"  {'后端':12} {'每页耗时(ms)':>14} {'条数':>6}")
+
+    baseline = time_per_page(legacy, html)
+    print(f"  {'legacy':12} {baseline:>14.2f} {len(legacy(html)):>6}")
+
+    outputs = {}
+    for backend in available_backends():
+        outputs[backend] = parse(html, backend)
+        cost = time_per_page(lambda page: parse(page, backend), html)
+        print(f"  {backend:12} {cost:>14.2f} {len(outputs[backend]):>6}   ({baseline / cost:.1f}x)")
+
+    reference = outputs["bs4"]
+    for backend, output in outputs.items():
+        if output != reference:
+            print(f"  ❌ {backend} 输出与bs4不一致")
+            return False
+    print(f"  ✅ {len(outputs)} 个后端输出完全一致")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML解析后端基准测试")
+    parser.add_argument("--github", help="保存的GitHub Trending页面")
+    parser.add_argument("--weibo", help="保存的微博热搜页面")
+    args = parser.parse_args()
+
+    def load(path, fallback):
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        return fallback()
+
+    print("=" * 60)
+    print(f"HTML解析后端基准测试 (可用后端: {', '.join(available_backends())})")
+    print("=" * 60)
+
+    ok = run_suite("GitHub Trending", load(args.github, make_github_fixture),
+                   parse_trending_articles, legacy_trending)
+    ok = run_suite("微博热搜", load(args.weibo, make_weibo_fixture),
+                   parse_weibo_rows, legacy_weibo) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
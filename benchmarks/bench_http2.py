@@ -0,0 +1,159 @@
+"""
+HTTP/2 传输基准测试
+本地测试服务器同时支持HTTP/1.1和HTTP/2(h2c)，每条新连接模拟一次握手延迟（TCP+TLS往返），
+每个请求模拟服务器处理耗时。并发发出同一主机的一批请求，比较:
+  requests.get    每次调用新建连接（原先的写法）
+  HTTP/1.1连接池  HttpClient默认的keep-alive连接池
+  HTTP/2          HttpClient挂载Http2Adapter，同一连接多路复用
+
+需要 httpx[http2]，未安装时跳过。
+运行: python benchmarks/bench_http2.py [--requests 48] [--workers 8]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.http2_adapter import http2_available
+from utils.http_client import HttpClient
+
+HANDSHAKE_DELAY = 0.06
+REQUEST_DELAY = 0.03
+BODY = b'{"code": 0, "data": {"list": [' + b", ".join(b'{"id": %d}' % i for i in range(400)) + b"]}}"
+H2_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+
+
+class DualProtocolServer:
+    """在后台线程运行的HTTP/1.1 + h2c测试服务器，统计收到的连接数"""
+
+    def __init__(self):
+        self.connections = 0
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        ready = threading.Event()
+        threading.Thread(target=self._run, args=(ready,), daemon=True).start()
+        ready.wait()
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = server.sockets[0].getsockname()[1]
+        ready.set()
+        self.loop.run_forever()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        await asyncio.sleep(HANDSHAKE_DELAY)
+        try:
+            head = await reader.readexactly(len(H2_PREFACE))
+            if head == H2_PREFACE:
+                await self._serve_h2(head, reader, writer)
+            else:
+                await self._serve_h1(head, reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_h1(self, data, reader, writer):
+        while True:
+            while b"\r\n\r\n" not in data:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    return
+                data += chunk
+            request, data = data.split(b"\r\n\r\n", 1)
+            await asyncio.sleep(REQUEST_DELAY)
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n" % len(BODY) + BODY)
+            await writer.drain()
+            if b"connection: close" in request.lower():
+                return
+
+    async def _serve_h2(self, data, reader, writer):
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+
+        async def respond(stream_id):
+            await asyncio.sleep(REQUEST_DELAY)
+            conn.send_headers(stream_id, [(":status", "200"), ("content-type", "application/json"),
+                                          ("content-length", str(len(BODY)))])
+            conn.send_data(stream_id, BODY, end_stream=True)
+            writer.write(conn.data_to_send())
+
+        while data:
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    asyncio.ensure_future(respond(event.stream_id))
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            writer.write(conn.data_to_send())
+            await writer.drain()
+            data = await reader.read(65536)
+
+
+def run_batch(fetch, count, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        sizes = list(executor.map(fetch, range(count)))
+    assert all(size == len(BODY) for size in sizes)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/2传输基准测试")
+    parser.add_argument("--requests", type=int, default=48, help="请求数")
+    parser.add_argument("--workers", type=int, default=8, help="并发线程数")
+    args = parser.parse_args()
+
+    if not http2_available():
+        print("⏭️ 未安装 httpx[http2]，跳过HTTP/2基准测试 (pip install 'httpx[http2]')")
+        return
+
+    import requests
+
+    server = DualProtocolServer()
+    url = f"{server.base_url}/x/web-interface/ranking"
+
+    h1_client = HttpClient(rate_limiter=False)
+    h2_client = HttpClient(rate_limiter=False)
+    # 本地服务器没有TLS，用h2c直接走HTTP/2
+    h2_client.enable_http2([server.base_url], http1=False)
+
+    cases = [
+        ("requests.get", lambda i: len(requests.get(f"{url}?i={i}", timeout=10).content)),
+        ("HTTP/1.1连接池", lambda i: len(h1_client.get(f"{url}?i={i}", timeout=10).content)),
+        ("HTTP/2", lambda i: len(h2_client.get(f"{url}?i={i}", timeout=10).content))
+    ]
+
+    print("=" * 60)
+    print(f"HTTP/2传输基准测试 ({args.requests} 个请求, {args.workers} 线程并发, "
+          f"握手 {HANDSHAKE_DELAY * 1000:.0f}ms, 处理 {REQUEST_DELAY * 1000:.0f}ms)")
+    print("=" * 60)
+    print(f"  {'方式':16} {'总耗时(秒)':>10} {'新建连接':>8}")
+
+    baseline = None
+    for name, fetch in cases:
+        before = server.connections
+        elapsed = run_batch(fetch, args.requests, args.workers)
+        baseline = baseline or elapsed
+        print(f"  {name:16} {elapsed:>10.2f} {server.connections - before:>8}   ({baseline / elapsed:.1f}x)")
+
+    h1_client.close()
+    h2_client.close()
+
+
+if __name__ == "__main__":
+    main()
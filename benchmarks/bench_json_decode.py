@@ -0,0 +1,182 @@
+"""
+JSON解码基准测试
+比较 response.json() + 逐层dict.get 的原做法与按Schema解码（msgspec / orjson / json 后端）
+每个响应的耗时，并检查各方式抽取出的字段完全一致。
+
+默认使用仿照真实接口结构生成的响应（包含owner、stat、rights等完整大对象），
+也可以传入保存下来的真实响应:
+运行: python benchmarks/bench_json_decode.py
+      python benchmarks/bench_json_decode.py --bilibili ranking.json --toutiao hot_board.json --weibo hot_search.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawlers.json_schemas import BilibiliRanking, ToutiaoHotBoard, WeiboHotSearch
+from utils.fast_json import available_backends, decode
+
+ROUNDS = 200
+
+
+def make_bilibili_payload(count=100):
+    """仿照ranking/v2结构，每个视频带完整的owner/stat/rights等字段"""
+    videos = []
+    for i in range(count):
+        videos.append({
+            "aid": 100000 + i, "videos": 1, "tid": 17, "tname": "单机游戏", "copyright": 1,
+            "pic": f"http://i0.hdslb.com/bfs/archive/{'a' * 40}{i}.jpg",
+            "title": f"【测试】视频标题 {i} 有点长的标题文字",
+            "pubdate": 1700000000 + i, "ctime": 1700000000 + i,
+            "desc": "视频简介" * 20,
+            "state": 0, "duration": 300 + i,
+            "rights": {key: 0 for key in ("bp", "elec", "download", "movie", "pay", "hd5", "no_reprint",
+                                          "autoplay", "ugc_pay", "is_cooperation", "ugc_pay_preview",
+                                          "no_background", "arc_pay", "pay_free_watch")},
+            "owner": {"mid": 200000 + i, "name": f"UP主{i}", "face": f"https://i1.hdslb.com/bfs/face/{'f' * 40}.jpg"},
+            "stat": {"aid": 100000 + i, "view": 1000000 - i * 997, "danmaku": 5000 + i, "reply": 3000 + i,
+                     "favorite": 20000 + i, "coin": 15000 + i, "share": 800 + i, "now_rank": 0,
+                     "his_rank": i + 1, "like": 60000 + i, "dislike": 0, "vt": 0, "vv": 0},
+            "dynamic": "动态文字" * 5,
+            "cid": 300000 + i,
+            "dimension": {"width": 1920, "height": 1080, "rotate": 0},
+            "short_link_v2": f"https://b23.tv/BV1xx411c7m{i}",
+            "first_frame": f"http://i0.hdslb.com/bfs/storyff/{'b' * 40}.jpg",
+            "pub_location": "上海",
+            "bvid": f"BV1xx411c7m{i:03d}",
+            "score": 0, "enable_vt": 0,
+            "others": [{"aid": 1, "title": "相关视频", "stat": {"view": 1}}]
+        })
+    return json.dumps({"code": 0, "message": "0", "ttl": 1,
+                       "data": {"note": "根据稿件内容质量、近期的数据综合展示，动态更新", "list": videos}},
+                      ensure_ascii=False).encode("utf-8")
+
+
+def make_toutiao_payload(count=50):
+    """仿照hot-board结构，HotValue是数字字符串"""
+    items = []
+    for i in range(count):
+        items.append({
+            "ClusterId": 7300000000000000000 + i, "Title": f"头条热点新闻标题 {i}",
+            "LabelUrl": "https://p3-sign.toutiaoimg.com/label.png",
+            "Label": "hot" if i % 3 == 0 else "", "LabelStyle": "", "LabelDesc": "热",
+            "Url": f"https://www.toutiao.com/trending/{7300000000000000000 + i}/",
+            "HotValue": str(30000000 - i * 100000),
+            "Schema": "sslocal://concern?" + "x" * 80,
+            "LabelUri": {"uri": "label", "url": "https://p3.toutiaoimg.com/label.png", "width": 36, "height": 36},
+            "ClusterIdStr": str(7300000000000000000 + i), "ClusterType": 0, "QueryWord": f"热点 {i}",
+            "InterestCategory": ["society", "entertainment"],
+            "Image": {"uri": "img", "url": "https://p3.toutiaoimg.com/img.jpeg", "width": 300, "height": 170,
+                      "url_list": [{"url": "https://p3.toutiaoimg.com/img.jpeg"}] * 3}
+        })
+    return json.dumps({"data": items, "fixed_top_data": [], "status": "success", "message": "success"},
+                      ensure_ascii=False).encode("utf-8")
+
+
+def make_weibo_payload(count=50):
+    """仿照ajax/side/hotSearch结构"""
+    items = []
+    for i in range(count):
+        items.append({
+            "word_scheme": f"#话题{i}#", "word": f"微博热搜 {i}", "num": 2000000 - i * 10000, "rank": i,
+            "flag": 1, "icon_desc": "热", "icon_desc_color": "#ff9406", "small_icon_desc": "热",
+            "small_icon_desc_color": "#ff9406", "emoticon": "", "realpos": i + 1, "label_name": "热",
+            "onboard_time": 1700000000, "topic_flag": 1, "note": f"微博热搜 {i}", "raw_hot": 2000000 - i * 10000,
+            "category": "社会,时事", "subject_querys": "", "subject_label": "", "star_word": 0, "fun_word": 0,
+            "channel_type": "", "mid": "49" + "0" * 14, "expand": 0, "is_ad": 0
+        })
+    return json.dumps({"ok": 1, "data": {"realtime": items, "hotgovs": [], "hotgov": {}}},
+                      ensure_ascii=False).encode("utf-8")
+
+
+# 原做法: 完整解析后逐层dict.get，与改造前爬虫里的写法一致
+
+def legacy_bilibili(body):
+    data = json.loads(body)
+    return [(v.get("bvid", ""), v.get("title", ""), v.get("owner", {}).get("name", ""), v.get("duration", 0),
+             v.get("stat", {}).get("view", 0), v.get("stat", {}).get("like", 0))
+            for v in data.get("data", {}).get("list", [])]
+
+
+def fast_bilibili(body, backend):
+    data = decode(body, BilibiliRanking, backend)
+    return [(v.bvid, v.title, v.owner.name, v.duration, v.stat.view, v.stat.like) for v in data.data.list]
+
+
+def legacy_toutiao(body):
+    data = json.loads(body)
+    return [(n.get("ClusterId", ""), n.get("Title", ""), int(n.get("HotValue", 0)), n.get("Label", ""))
+            for n in data.get("data", [])]
+
+
+def fast_toutiao(body, backend):
+    data = decode(body, ToutiaoHotBoard, backend)
+    return [(n.ClusterId, n.Title, n.HotValue, n.Label) for n in data.data]
+
+
+def legacy_weibo(body):
+    data = json.loads(body)
+    return [(item.get("word", ""), item.get("num", 0), item.get("rank", 0))
+            for item in data.get("data", {}).get("realtime", [])]
+
+
+def fast_weibo(body, backend):
+    data = decode(body, WeiboHotSearch, backend)
+    return [(item.word, item.num, item.rank) for item in data.data.realtime]
+
+
+def time_per_call(func, body):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(body)
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def run_suite(name, body, legacy, fast):
+    print(f"\n📄 {name} ({len(body) / 1024:.0f}KB)")
+    print(f"  {'方式':12} {'每次耗时(ms)':>14} {'条数':>6}")
+
+    expected = legacy(body)
+    baseline = time_per_call(legacy, body)
+    print(f"  {'legacy':12} {baseline:>14.3f} {len(expected):>6}")
+
+    ok = True
+    for backend in available_backends():
+        output = fast(body, backend)
+        cost = time_per_call(lambda payload: fast(payload, backend), body)
+        print(f"  {backend:12} {cost:>14.3f} {len(output):>6}   ({baseline / cost:.1f}x)")
+        if output != expected:
+            print(f"  ❌ {backend} 抽取结果与原做法不一致")
+            ok = False
+    if ok:
+        print("  ✅ 各后端抽取结果与原做法完全一致")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON解码基准测试")
+    parser.add_argument("--bilibili", help="保存的B站排行榜响应")
+    parser.add_argument("--toutiao", help="保存的头条热榜响应")
+    parser.add_argument("--weibo", help="保存的微博热搜响应")
+    args = parser.parse_args()
+
+    def load(path, fallback):
+        if path:
+            with open(path, "rb") as f:
+                return f.read()
+        return fallback()
+
+    print("=" * 60)
+    print(f"JSON解码基准测试 (可用后端: {', '.join(available_backends())})")
+    print("=" * 60)
+
+    ok = run_suite("B站排行榜", load(args.bilibili, make_bilibili_payload), legacy_bilibili, fast_bilibili)
+    ok = run_suite("头条热榜", load(args.toutiao, make_toutiao_payload), legacy_toutiao, fast_toutiao) and ok
+    ok = run_suite("微博热搜", load(args.weibo, make_weibo_payload), legacy_weibo, fast_weibo) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
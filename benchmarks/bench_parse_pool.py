@@ -0,0 +1,88 @@
+"""
+解析进程池基准测试
+本地桩服务器返回Trending页面样本（带网络延迟），比较 语言×周期 矩阵抓取时
+在抓取线程里解析 与 交给ParsePool进程池解析 的总耗时。
+这里关闭了限流，只衡量解析与下载的重叠；实际运行时矩阵抓取受github.com的令牌桶预算
+（默认0.5页/秒）限制，页面间隔远大于解析耗时，进程池带来的收益接近1.0x，
+见 GitHubTrendingCrawler.get_trending_matrix 的说明。
+
+运行: python benchmarks/bench_parse_pool.py [--backend bs4] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.bench_html_parsers import make_github_fixture
+from crawlers.github_trending import GitHubTrendingCrawler
+from utils.http_client import HttpClient
+from utils.parse_pool import ParsePool
+
+PAGE_DELAY = 0.15
+LANGUAGES = ["", "python", "javascript", "java", "go", "rust", "c", "cpp"]
+PERIODS = ("daily", "weekly", "monthly")
+
+
+def start_page_server(page):
+    body = page.encode("utf-8")
+
+    class PageHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(PAGE_DELAY)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def run_matrix(base_url, backend, parse_pool):
+    crawler = GitHubTrendingCrawler(http_client=HttpClient(rate_limiter=False, pool_maxsize=16),
+                                    parser_backend=backend, parse_pool=parse_pool)
+    crawler.TRENDING_URL = f"{base_url}/trending"
+
+    start = time.perf_counter()
+    merged = crawler.get_trending_matrix(LANGUAGES, PERIODS, max_workers=8)
+    return time.perf_counter() - start, merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解析进程池基准测试")
+    parser.add_argument("--backend", default="bs4", help="HTML解析后端，默认bs4（最吃CPU）")
+    parser.add_argument("--workers", type=int, default=None, help="解析进程数，默认CPU核数")
+    args = parser.parse_args()
+
+    server, base_url = start_page_server(make_github_fixture())
+    pages = len(LANGUAGES) * len(PERIODS)
+
+    try:
+        threaded, threaded_result = run_matrix(base_url, args.backend, None)
+        with ParsePool(max_workers=args.workers) as pool:
+            pooled, pooled_result = run_matrix(base_url, args.backend, pool)
+            workers = pool.max_workers
+    finally:
+        server.shutdown()
+
+    print("=" * 60)
+    print(f"解析进程池基准测试 ({pages} 页, 后端 {args.backend}, 每页延迟 {PAGE_DELAY * 1000:.0f}ms)")
+    print("=" * 60)
+    print(f"  抓取线程内解析:          {threaded:.2f}秒")
+    print(f"  进程池解析 ({workers} 进程):    {pooled:.2f}秒   ({threaded / pooled:.1f}x)")
+    print(f"  结果一致: {'✅' if threaded_result == pooled_result else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,20 @@
 """
 多平台热点爬虫 - 知乎失败就先做其他平台
 """
-import requests
 import json
 from datetime import datetime
-import time
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.http_client import get_default_client
+from utils.fast_json import decode_response
+from crawlers.json_schemas import BilibiliRanking, ToutiaoHotBoard, WeiboHotSearch
+from crawlers.zhihu_hot import get_zhihu_hot
 
 class MultiPlatformCrawler:
-    def __init__(self):
+    def __init__(self, http_client=None):
+        self.http = http_client or get_default_client()
         self.results = {}
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
@@ -17,18 +24,18 @@ class MultiPlatformCrawler:
         """微博热搜 - 通过官方API（稳定）"""
         try:
             url = "https://weibo.com/ajax/side/hotSearch"
-            response = requests.get(url, headers=self.headers, timeout=8)
+            response = self.http.get(url, platform="weibo", headers=self.headers, timeout=8)
             
             if response.status_code == 200:
-                data = response.json()
-                hot_searches = data.get("data", {}).get("realtime", [])
+                data = decode_response(response, WeiboHotSearch)
+                hot_searches = data.data.realtime if data.data else []
                 
                 items = []
                 for item in hot_searches[:15]:
                     items.append({
-                        "title": item.get("word", ""),
-                        "hot": item.get("num", 0),
-                        "rank": item.get("rank", 0)
+                        "title": item.word,
+                        "hot": item.num,
+                        "rank": item.rank
                     })
                 
                 print(f"✅ 微博热搜: 获取 {len(items)} 条")
@@ -41,18 +48,18 @@ class MultiPlatformCrawler:
         """B站热门视频"""
         try:
             url = "https://api.bilibili.com/x/web-interface/ranking/v2?rid=0&type=all"
-            response = requests.get(url, headers=self.headers, timeout=8)
+            response = self.http.get(url, platform="bilibili", headers=self.headers, timeout=8)
             
             if response.status_code == 200:
-                data = response.json()
-                videos = data.get("data", {}).get("list", [])
+                data = decode_response(response, BilibiliRanking)
+                videos = data.data.list if data.data else []
                 
                 items = []
                 for video in videos[:15]:
                     items.append({
-                        "title": video.get("title", ""),
-                        "play": video.get("stat", {}).get("view", 0),
-                        "up": video.get("owner", {}).get("name", "")
+                        "title": video.title,
+                        "play": video.stat.view,
+                        "up": video.owner.name
                     })
                 
                 print(f"✅ B站热门: 获取 {len(items)} 条")
@@ -62,28 +69,14 @@ class MultiPlatformCrawler:
         return None
     
     def get_zhihu_fallback(self):
-        """知乎备用方案 - 模拟简单请求"""
+        """知乎热榜 - 热榜接口、热榜网页、热搜词三个来源对冲，取最先成功的"""
         try:
-            # 知乎热榜的另一个可能接口
-            url = "https://www.zhihu.com/api/v4/search/top_search"
-            response = requests.get(url, headers=self.headers, timeout=8)
-            
-            if response.status_code == 200:
-                data = response.json()
-                top_search = data.get("top_search", {}).get("words", [])
-                
-                items = []
-                for word in top_search[:10]:
-                    items.append({
-                        "title": word.get("query", ""),
-                        "display_query": word.get("display_query", "")
-                    })
-                
-                if items:
-                    print(f"✅ 知乎热词: 获取 {len(items)} 条")
-                    return items
+            items, report = get_zhihu_hot(client=self.http)
+            if items:
+                print(f"✅ 知乎热榜: 获取 {len(items[:15])} 条 (来源: {report['winner']})")
+                return items[:15]
         except Exception as e:
-            print(f"❌ 知乎热词失败: {e}")
+            print(f"❌ 知乎热榜失败: {e}")
         
         # 如果上面失败，返回空列表
         print("⚠️ 知乎数据获取失败，跳过")
@@ -93,17 +86,16 @@ class MultiPlatformCrawler:
         """今日头条热榜"""
         try:
             url = "https://www.toutiao.com/hot-event/hot-board/?origin=toutiao_pc"
-            response = requests.get(url, headers=self.headers, timeout=8)
+            response = self.http.get(url, platform="toutiao", headers=self.headers, timeout=8)
             
             if response.status_code == 200:
-                data = response.json()
-                hot_news = data.get("data", [])
+                data = decode_response(response, ToutiaoHotBoard)
                 
                 items = []
-                for news in hot_news[:15]:
+                for news in data.data[:15]:
                     items.append({
-                        "title": news.get("Title", ""),
-                        "hot": news.get("HotValue", 0)
+                        "title": news.Title,
+                        "hot": news.HotValue
                     })
                 
                 print(f"✅ 今日头条: 获取 {len(items)} 条")
@@ -121,13 +113,10 @@ class MultiPlatformCrawler:
         
         # 运行所有爬虫
         self.results["weibo"] = self.get_weibo_hot()
-        time.sleep(1)  # 避免请求太快
         
         self.results["bilibili"] = self.get_bilibili_hot()
-        time.sleep(1)
         
         self.results["toutiao"] = self.get_toutiao_hot()
-        time.sleep(1)
         
         self.results["zhihu"] = self.get_zhihu_fallback()
         
@@ -146,6 +135,8 @@ class MultiPlatformCrawler:
                 print(f"{platform:10}: ❌ 获取失败")
         
         print(f"\n🎯 总计获取: {total_items} 条热点数据")
+        self.http.print_stats()
+        self.http.save_state()
         
         # 保存数据
         if total_items > 0:
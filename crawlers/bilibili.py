@@ -2,25 +2,50 @@
 B站热点数据收集
 包含：热门视频排行榜、热搜词
 """
-import requests
 import json
 from datetime import datetime
-import time
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.http_client import get_default_client
+from utils.fast_json import decode_response
+from utils.paginator import paginate
+from crawlers.json_schemas import BilibiliHotSearch, BilibiliPopular, BilibiliRanking
+
+# 分区ID -> 分区名称
+CATEGORIES = {
+    0: "全站",
+    1: "动画",
+    3: "音乐",
+    4: "游戏",
+    5: "娱乐",
+    36: "科技",
+    119: "鬼畜",
+    129: "舞蹈",
+    155: "时尚",
+    160: "生活",
+    168: "国创",
+    188: "数码"
+}
 
 class BilibiliCrawler:
-    def __init__(self):
+    def __init__(self, http_client=None):
+        self.http = http_client or get_default_client()
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Referer": "https://www.bilibili.com"
         }
         
-    def get_ranking(self, rid=0, day=3, page_size=20):
+    def get_ranking(self, rid=0, day=3, page_size=20, rate_key=None):
         """
         获取B站排行榜
         Args:
             rid: 分区ID (0:全站, 1:动画, 3:音乐, 4:游戏, 5:娱乐, 36:科技, 160:生活, 119:鬼畜, 129:舞蹈)
             day: 1(日榜), 3(三日榜), 7(周榜)
             page_size: 每页数量
+            rate_key: 限流桶，默认按api.bilibili.com
         """
         url = "https://api.bilibili.com/x/web-interface/ranking/v2"
         params = {
@@ -33,38 +58,23 @@ class BilibiliCrawler:
         print(f"[{datetime.now().strftime('%H:%M:%S')}] 获取B站排行榜 (分区: {rid})...")
         
         try:
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.http.get(url, platform="bilibili", params=params, headers=self.headers, timeout=10,
+                                     rate_key=rate_key)
             
             if response.status_code == 200:
-                data = response.json()
+                data = decode_response(response, BilibiliRanking)
                 
-                if data.get("code") == 0:
-                    videos = data.get("data", {}).get("list", [])
+                if data.code == 0:
+                    videos = data.data.list if data.data else []
                     
                     result = []
                     for i, video in enumerate(videos[:page_size], 1):
-                        video_info = {
-                            "rank": i,
-                            "bvid": video.get("bvid", ""),
-                            "title": video.get("title", ""),
-                            "url": f"https://www.bilibili.com/video/{video.get('bvid', '')}",
-                            "up": video.get("owner", {}).get("name", ""),
-                            "duration": video.get("duration", 0),  # 秒
-                            "view": video.get("stat", {}).get("view", 0),
-                            "danmaku": video.get("stat", {}).get("danmaku", 0),
-                            "like": video.get("stat", {}).get("like", 0),
-                            "coin": video.get("stat", {}).get("coin", 0),
-                            "favorite": video.get("stat", {}).get("favorite", 0),
-                            "share": video.get("stat", {}).get("share", 0),
-                            "reply": video.get("stat", {}).get("reply", 0),
-                            "category": self._get_category_name(rid)
-                        }
-                        result.append(video_info)
+                        result.append(self._parse_video(video, i, rid))
                     
                     print(f"✅ 获取到 {len(result)} 个热门视频")
                     return result
                 else:
-                    print(f"⚠️ API返回错误: {data.get('message', '未知错误')}")
+                    print(f"⚠️ API返回错误: {data.message or '未知错误'}")
             else:
                 print(f"❌ 请求失败: {response.status_code}")
                 
@@ -73,6 +83,109 @@ class BilibiliCrawler:
         
         return []
     
+    def _parse_video(self, video, rank, rid):
+        """解析排行榜中的单个视频（BilibiliVideo记录）"""
+        stat = video.stat
+        return {
+            "rank": rank,
+            "bvid": video.bvid,
+            "title": video.title,
+            "url": f"https://www.bilibili.com/video/{video.bvid}",
+            "up": video.owner.name,
+            "duration": video.duration,  # 秒
+            "view": stat.view,
+            "danmaku": stat.danmaku,
+            "like": stat.like,
+            "coin": stat.coin,
+            "favorite": stat.favorite,
+            "share": stat.share,
+            "reply": stat.reply,
+            "category": self._get_category_name(rid)
+        }
+    
+    def iter_popular(self, page_size=20, max_pages=None, max_items=None):
+        """按页码逐页读取综合热门，逐条产出视频信息（rank为全局名次）
+
+        排行榜接口ranking/v2一次返回整个榜单、不支持翻页，需要更深的热门列表时用这个接口。
+        解析当前页时已在请求下一页；调用方提前停止时不再请求后续页面
+        Args:
+            page_size: 每页数量
+            max_pages: 最多请求多少页
+            max_items: 最多产出多少个视频
+        """
+        url = "https://api.bilibili.com/x/web-interface/popular"
+
+        def fetch(pn):
+            params = {"ps": page_size, "pn": pn}
+            try:
+                response = self.http.get(url, platform="bilibili", params=params, headers=self.headers, timeout=10)
+                if response.status_code != 200:
+                    print(f"❌ 热门第{pn}页请求失败: {response.status_code}")
+                    return None
+                data = decode_response(response, BilibiliPopular)
+                if data.code != 0 or data.data is None:
+                    print(f"⚠️ 热门第{pn}页返回错误: {data.message or '未知错误'}")
+                    return None
+                return pn, data.data
+            except Exception as e:
+                print(f"❌ 热门第{pn}页获取失败: {e}")
+                return None
+
+        def next_cursor(page, pn):
+            _, data = page
+            return None if data.no_more or not data.list else pn + 1
+
+        def parse(page):
+            pn, data = page
+            start = (pn - 1) * page_size
+            return (self._parse_video(video, start + i, 0) for i, video in enumerate(data.list, 1))
+
+        return paginate(fetch, next_cursor, parse, first_cursor=1, max_pages=max_pages, max_items=max_items)
+    
+    def sweep_rankings(self, rids=None, days=(1, 3, 7), page_size=100, max_workers=12):
+        """并发获取所有分区 × 榜单周期，按bvid合并去重
+        
+        扫描使用限流键 bilibili_sweep，它同时受api.bilibili.com的主机预算约束（见utils/rate_limiter.py），
+        不会提高对该主机的总请求速率: 默认12个分区 × 3个周期共36个请求，前2个立即发出，其余按每秒1个放行，
+        约34秒；并发只用来重叠各请求的网络耗时。
+        Args:
+            rids: 分区ID列表，默认CATEGORIES中的全部分区
+            days: 1(日榜) / 3(三日榜) / 7(周榜) 的任意组合
+            page_size: 每个榜单取前多少个
+            max_workers: 并发线程数
+        Returns:
+            {bvid: 视频信息}，视频信息中的rankings记录它上榜的每个分区榜单:
+            [{"rid": 分区ID, "day": 周期, "rank": 名次}]
+        """
+        if rids is None:
+            rids = list(CATEGORIES)
+        
+        pairs = [(rid, day) for rid in rids for day in days]
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] 并发获取 {len(rids)} 个分区 × {len(days)} 个榜单...")
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pairs)) or 1) as executor:
+            lists = list(executor.map(
+                lambda pair: self.get_ranking(rid=pair[0], day=pair[1], page_size=page_size,
+                                              rate_key="bilibili_sweep"), pairs))
+        
+        merged = {}
+        for (rid, day), videos in zip(pairs, lists):
+            for video in videos:
+                entry = merged.get(video["bvid"])
+                if entry is None:
+                    entry = {key: value for key, value in video.items() if key not in ("rank", "category")}
+                    entry["rankings"] = []
+                    merged[video["bvid"]] = entry
+                else:
+                    # 不同榜单的统计数据有先后，保留较大的值
+                    for key in ("view", "danmaku", "like", "coin", "favorite", "share", "reply"):
+                        entry[key] = max(entry[key], video[key])
+                entry["rankings"].append({"rid": rid, "day": day, "rank": video["rank"]})
+        
+        total = sum(len(entry["rankings"]) for entry in merged.values())
+        print(f"✅ 合并 {total} 条榜单记录为 {len(merged)} 个视频")
+        return merged
+    
     def get_hot_search(self):
         """获取B站热搜榜"""
         url = "https://app.bilibili.com/x/v2/search/trending/ranking"
@@ -80,30 +193,30 @@ class BilibiliCrawler:
         print(f"[{datetime.now().strftime('%H:%M:%S')}] 获取B站热搜...")
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.http.get(url, platform="bilibili", headers=self.headers, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = decode_response(response, BilibiliHotSearch)
                 
-                if data.get("code") == 0:
-                    hot_words = data.get("data", {}).get("list", [])
+                if data.code == 0:
+                    hot_words = data.data.list if data.data else []
                     
                     result = []
                     for i, word in enumerate(hot_words[:20], 1):
                         word_info = {
                             "rank": i,
-                            "keyword": word.get("keyword", ""),
-                            "show_name": word.get("show_name", ""),
-                            "url": f"https://search.bilibili.com/all?keyword={word.get('keyword', '')}",
-                            "icon": word.get("icon", ""),
-                            "heat": word.get("heat", 0)
+                            "keyword": word.keyword,
+                            "show_name": word.show_name,
+                            "url": f"https://search.bilibili.com/all?keyword={word.keyword}",
+                            "icon": word.icon,
+                            "heat": word.heat
                         }
                         result.append(word_info)
                     
                     print(f"✅ 获取到 {len(result)} 个热搜词")
                     return result
                 else:
-                    print(f"⚠️ 热搜API错误: {data.get('message', '未知错误')}")
+                    print(f"⚠️ 热搜API错误: {data.message or '未知错误'}")
             else:
                 print(f"❌ 热搜请求失败: {response.status_code}")
                 
@@ -114,21 +227,7 @@ class BilibiliCrawler:
     
     def _get_category_name(self, rid):
         """根据分区ID获取分区名称"""
-        categories = {
-            0: "全站",
-            1: "动画",
-            3: "音乐",
-            4: "游戏",
-            5: "娱乐",
-            36: "科技",
-            119: "鬼畜",
-            129: "舞蹈",
-            155: "时尚",
-            160: "生活",
-            168: "国创",
-            188: "数码"
-        }
-        return categories.get(rid, f"分区{rid}")
+        return CATEGORIES.get(rid, f"分区{rid}")
     
     def save_to_file(self, data, filename_prefix="bilibili"):
         """保存数据到JSON文件"""
@@ -172,7 +271,6 @@ def test_bilibili():
             print(f"{video['rank']:2d}. {video['title'][:30]:30}...")
             print(f"     UP: {video['up'][:10]:10} 👀{view_str:>8} 👍{video['like']:,}")
     
-    time.sleep(2)
     
     # 2. 测试热搜
     print("\n2. 测试热搜榜:")
@@ -203,5 +301,4 @@ def test_bilibili():
     return videos or hot_search
 
 if __name__ == "__main__":
-    import os
     test_bilibili()
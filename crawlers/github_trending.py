@@ -1,157 +1,186 @@
 """
 GitHub Trending数据收集
 """
-import requests
-from bs4 import BeautifulSoup
 import json
 from datetime import datetime
-import time
 import re
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.http_client import get_default_client
+from crawlers.html_parsers import parse_trending_articles, resolve_backend
 
 class GitHubTrendingCrawler:
-    def __init__(self):
+    TRENDING_URL = "https://github.com/trending"
+    
+    def __init__(self, http_client=None, parser_backend=None, parse_pool=None):
+        """
+        Args:
+            http_client: 共享的HttpClient，默认使用进程内默认客户端
+            parser_backend: HTML解析后端 selectolax / lxml / bs4，默认自动选最快的
+            parse_pool: ParsePool实例，多页抓取时把解析交给进程池，与下载重叠
+        """
+        self.http = http_client or get_default_client()
+        self.parser_backend = resolve_backend(parser_backend)
+        self.parse_pool = parse_pool
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8"
         }
     
-    def get_trending(self, language="", since="daily"):
+    def get_trending(self, language="", since="daily", rate_key=None):
         """
         获取GitHub Trending
         Args:
             language: 编程语言，如"python", "javascript", "go"
             since: daily, weekly, monthly
+            rate_key: 使用的限流桶，默认github.com的主机预算
         """
+        response = self._fetch_page(language, since, rate_key)
+        if response is None:
+            return []
+        
+        # 页面来自缓存且解析过时直接复用上次的解析结果
+        repos = self.http.cached_parse(
+            response, "repos", lambda: self._parse_trending_page(response.text, language, since))
+        
+        print(f"✅ 获取到 {len(repos)} 个热门仓库")
+        return repos
+    
+    def _fetch_page(self, language, since, rate_key=None):
+        """下载Trending页面，失败时返回None"""
         if language:
-            url = f"https://github.com/trending/{language}?since={since}"
+            url = f"{self.TRENDING_URL}/{language}?since={since}"
         else:
-            url = f"https://github.com/trending?since={since}"
+            url = f"{self.TRENDING_URL}?since={since}"
         
         print(f"[{datetime.now().strftime('%H:%M:%S')}] 获取GitHub Trending ({language or 'all'}/{since})...")
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = self.http.get(url, platform="github", headers=self.headers, timeout=15, rate_key=rate_key)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                repos = []
-                
-                for article in soup.select('article.Box-row'):
-                    repo_info = self._parse_repo_element(article)
-                    if repo_info:
-                        repo_info["language"] = language or "all"
-                        repo_info["period"] = since
-                        repos.append(repo_info)
-                
-                print(f"✅ 获取到 {len(repos)} 个热门仓库")
-                return repos
+                return response
             else:
                 print(f"❌ 请求失败: {response.status_code}")
                 
         except Exception as e:
             print(f"❌ 获取失败: {e}")
         
-        return []
+        return None
     
-    def _parse_repo_element(self, article):
-        """解析单个仓库元素"""
-        try:
-            # 仓库标题和链接
-            title_elem = article.select_one('h2 a')
-            if not title_elem:
-                return None
-                
-            title = title_elem.get_text(strip=True)
-            repo_url = f"https://github.com{title_elem.get('href', '')}"
-            
-            # 提取作者和仓库名
-            author, repo_name = "", ""
-            if "/" in title:
-                parts = title.split("/")
-                if len(parts) >= 2:
-                    author = parts[0].strip()
-                    repo_name = parts[1].strip()
-            
-            # 描述
-            desc_elem = article.select_one('p')
-            description = desc_elem.get_text(strip=True) if desc_elem else ""
-            
-            # 编程语言
-            lang_elem = article.select_one('span[itemprop="programmingLanguage"]')
-            language = lang_elem.get_text(strip=True) if lang_elem else "Unknown"
-            
-            # 星标数
-            stars_text = "0"
-            stars_elem = article.select('a[href$="/stargazers"]')
-            if stars_elem:
-                stars_text = stars_elem[0].get_text(strip=True)
-            
-            # forks数
-            forks_text = "0"
-            forks_elem = article.select('a[href$="/forks"]')
-            if forks_elem:
-                forks_text = forks_elem[0].get_text(strip=True)
-            
-            # 今日星标增长
-            stars_today_text = ""
-            stars_today_elem = article.select('span.d-inline-block.float-sm-right')
-            if stars_today_elem:
-                stars_today_text = stars_today_elem[0].get_text(strip=True)
-                # 提取数字
-                match = re.search(r'(\d+[,]?\d*)', stars_today_text)
-                if match:
-                    stars_today_text = match.group(1).replace(',', '')
-            
-            return {
-                "title": title,
-                "author": author,
-                "repo_name": repo_name,
-                "url": repo_url,
-                "description": description,
-                "language": language,
-                "stars": self._parse_number(stars_text),
-                "forks": self._parse_number(forks_text),
-                "stars_today": stars_today_text,
-                "platform": "GitHub"
-            }
-            
-        except Exception as e:
-            print(f"解析仓库失败: {e}")
-            return None
+    def _parse_trending_page(self, html, language, since):
+        """解析整个Trending页面，只解析 article.Box-row 部分"""
+        return parse_trending_page(html, language, since, self.parser_backend)
     
-    def _parse_number(self, text):
-        """解析数字文本，如1.2k -> 1200"""
-        if not text:
-            return 0
+    def get_multiple_languages(self, languages=None, since="daily", max_workers=8):
+        """获取多个编程语言的Trending（并发请求，按languages顺序拼接）"""
+        if languages is None:
+            languages = ["", "python", "javascript", "java", "go", "rust"]
         
-        text = text.replace(',', '').strip()
+        all_repos = []
+        for repos in self._fetch_lists([(lang, since) for lang in languages], max_workers):
+            all_repos.extend(repos)
         
-        if 'k' in text.lower():
-            try:
-                return int(float(text.lower().replace('k', '')) * 1000)
-            except:
-                return 0
-        else:
-            try:
-                return int(text)
-            except:
-                return 0
+        return all_repos
     
-    def get_multiple_languages(self, languages=None, since="daily"):
-        """获取多个编程语言的Trending"""
+    def get_trending_matrix(self, languages=None, periods=("daily", "weekly", "monthly"), max_workers=8,
+                            rate_key=None):
+        """并发获取 语言 × 周期 的所有榜单，按仓库URL合并去重
+        
+        总耗时由限流预算决定，而不是线程数: 默认与其他github.com请求共用 (0.5/秒, 突发2) 的预算，
+        6种语言 × 3个周期 = 18页约需32秒，40种语言 × 3个周期 = 120页约需4分钟，
+        此时并发下载和进程池解析都不会再缩短总时间（解析耗时远小于限流间隔）。
+        经代理池分散出口IP或已登录时，可以在RateLimiter中为rate_key配置更高的预算。
+        Args:
+            languages: 语言列表，""表示全部语言
+            periods: daily / weekly / monthly 的任意组合
+            max_workers: 并发线程数
+            rate_key: 矩阵请求使用的限流桶，默认github.com的主机预算
+        Returns:
+            {仓库URL: 仓库信息}，仓库信息中的appearances记录它出现过的每个榜单:
+            [{"language": 榜单语言, "period": 周期, "rank": 名次, "stars_today": 周期内新增星标}]
+        """
         if languages is None:
             languages = ["", "python", "javascript", "java", "go", "rust"]
         
-        all_repos = []
+        pairs = [(lang, period) for lang in languages for period in periods]
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] 并发获取 {len(languages)} 种语言 × {len(periods)} 个周期...")
         
-        for lang in languages:
-            repos = self.get_trending(language=lang, since=since)
-            all_repos.extend(repos)
-            if lang != languages[-1]:  # 不是最后一个
-                time.sleep(2)  # 避免请求太快
+        merged = {}
+        for (lang, period), repos in zip(pairs, self._fetch_lists(pairs, max_workers, rate_key)):
+            for rank, repo in enumerate(repos, 1):
+                appearance = {
+                    "language": lang or "all",
+                    "period": period,
+                    "rank": rank,
+                    "stars_today": repo.get("stars_today", "")
+                }
+                
+                entry = merged.get(repo["url"])
+                if entry is None:
+                    entry = {key: value for key, value in repo.items()
+                             if key not in ("language", "period", "stars_today")}
+                    entry["appearances"] = []
+                    merged[repo["url"]] = entry
+                else:
+                    # 不同榜单抓取时间略有差异，保留较大的计数
+                    entry["stars"] = max(entry["stars"], repo.get("stars", 0))
+                    entry["forks"] = max(entry["forks"], repo.get("forks", 0))
+                entry["appearances"].append(appearance)
         
-        return all_repos
+        total = sum(len(entry["appearances"]) for entry in merged.values())
+        print(f"✅ 合并 {total} 条榜单记录为 {len(merged)} 个仓库")
+        return merged
+    
+    def _fetch_lists(self, pairs, max_workers, rate_key=None):
+        """并发获取多个(语言, 周期)榜单，结果顺序与pairs一致"""
+        if not pairs:
+            return []
+        if self.parse_pool is not None:
+            return self._fetch_lists_pipelined(pairs, max_workers, rate_key)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pairs))) as executor:
+            return list(executor.map(
+                lambda pair: self.get_trending(language=pair[0], since=pair[1], rate_key=rate_key), pairs))
+    
+    def _fetch_lists_pipelined(self, pairs, max_workers, rate_key=None):
+        """抓取线程只负责下载，每下载完一页立即交给进程池解析"""
+        results = [[] for _ in pairs]
+        parse_jobs = {}
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pairs))) as executor:
+            downloads = {executor.submit(self._fetch_page, language, since, rate_key): index
+                         for index, (language, since) in enumerate(pairs)}
+            
+            for download in as_completed(downloads):
+                index = downloads[download]
+                response = download.result()
+                if response is None:
+                    continue
+                
+                cached = self.http.load_parsed(response, "repos")
+                if cached is not None:
+                    results[index] = cached
+                    continue
+                
+                language, since = pairs[index]
+                job = self.parse_pool.submit(
+                    parse_trending_page, response.text, language, since, self.parser_backend)
+                parse_jobs[job] = (index, response)
+        
+        for job, (index, response) in parse_jobs.items():
+            try:
+                results[index] = job.result()
+            except Exception as e:
+                print(f"❌ 解析失败: {e}")
+                continue
+            self.http.store_parsed(response, "repos", results[index])
+        
+        print(f"✅ 进程池解析 {len(parse_jobs)} 个页面")
+        return results
     
     def save_to_file(self, data, filename_prefix="github_trending"):
         """保存数据到JSON文件"""
@@ -177,6 +206,79 @@ class GitHubTrendingCrawler:
         print(f"💾 数据已保存到: {filename}")
         return filename
 
+def parse_trending_page(html, language, since, backend=None):
+    """解析整个Trending页面，返回仓库信息列表
+
+    模块级函数，可以直接提交给进程池执行
+    """
+    repos = []
+    
+    for article in parse_trending_articles(html, backend):
+        repo_info = build_repo_info(article)
+        if repo_info:
+            repo_info["language"] = language or "all"
+            repo_info["period"] = since
+            repos.append(repo_info)
+    
+    return repos
+
+def build_repo_info(article):
+    """把解析后端抽取的原始字段整理成仓库信息"""
+    try:
+        title = article["title"]
+        repo_url = f"https://github.com{article['href']}"
+        
+        # 提取作者和仓库名
+        author, repo_name = "", ""
+        if "/" in title:
+            parts = title.split("/")
+            if len(parts) >= 2:
+                author = parts[0].strip()
+                repo_name = parts[1].strip()
+        
+        # 今日星标增长
+        stars_today_text = article["stars_today_text"] or ""
+        if stars_today_text:
+            # 提取数字
+            match = re.search(r'(\d+[,]?\d*)', stars_today_text)
+            if match:
+                stars_today_text = match.group(1).replace(',', '')
+        
+        return {
+            "title": title,
+            "author": author,
+            "repo_name": repo_name,
+            "url": repo_url,
+            "description": article["description"] or "",
+            "language": article["language"] or "Unknown",
+            "stars": parse_number(article["stars_text"] or "0"),
+            "forks": parse_number(article["forks_text"] or "0"),
+            "stars_today": stars_today_text,
+            "platform": "GitHub"
+        }
+        
+    except Exception as e:
+        print(f"解析仓库失败: {e}")
+        return None
+
+def parse_number(text):
+    """解析数字文本，如1.2k -> 1200"""
+    if not text:
+        return 0
+    
+    text = text.replace(',', '').strip()
+    
+    if 'k' in text.lower():
+        try:
+            return int(float(text.lower().replace('k', '')) * 1000)
+        except:
+            return 0
+    else:
+        try:
+            return int(text)
+        except:
+            return 0
+
 def test_github_trending():
     """测试GitHub Trending爬虫"""
     print("=" * 60)
@@ -196,7 +298,6 @@ def test_github_trending():
             print(f"     {repo['description'][:50]:50}")
             print(f"     语言: {repo['language']:10} 星标: {repo['stars']:,} 今日: +{repo['stars_today']}")
     
-    time.sleep(2)
     
     # 2. 测试Python语言
     print("\n2. 测试Python语言热门:")
@@ -222,5 +323,4 @@ def test_github_trending():
     return repos
 
 if __name__ == "__main__":
-    import os
     test_github_trending()
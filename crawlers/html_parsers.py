@@ -0,0 +1,262 @@
+"""
+HTML解析后端
+GitHub Trending和微博热搜的页面抽取，支持 selectolax / lxml / BeautifulSoup 三种后端，
+只解析需要的子树。各后端输出完全一致的原始字段，后续处理由爬虫完成。
+"""
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:
+    lxml = None
+
+# BeautifulSoup的get_text不包含这些标签里的文本，其他后端解析前先删掉以保持一致
+NON_TEXT_TAGS = ("script", "style", "template")
+
+BACKENDS = ("selectolax", "lxml", "bs4")
+
+
+def available_backends():
+    """当前环境可用的后端，按速度从快到慢"""
+    result = []
+    if HTMLParser is not None:
+        result.append("selectolax")
+    if lxml is not None:
+        result.append("lxml")
+    result.append("bs4")
+    return result
+
+
+def resolve_backend(name=None):
+    """返回要使用的后端名称，None表示自动选择最快的"""
+    backends = available_backends()
+    if name is None:
+        return backends[0]
+    if name not in backends:
+        raise ValueError(f"解析后端不可用: {name} (可用: {', '.join(backends)})")
+    return name
+
+
+def _slice_between(html, start_marker, end_marker):
+    """截取第一个start_marker到最后一个end_marker之间的片段，缩小解析范围"""
+    start = html.find(start_marker)
+    end = html.rfind(end_marker)
+    if start == -1 or end == -1 or end < start:
+        return html
+    return html[start:end + len(end_marker)]
+
+
+# ---------- GitHub Trending ----------
+
+def parse_trending_articles(html, backend=None):
+    """抽取Trending页面中每个 article.Box-row 的原始字段
+
+    Returns:
+        [{"title", "href", "description", "language", "stars_text", "forks_text", "stars_today_text"}]
+        找不到对应元素的字段为None，没有标题链接的article被跳过
+    """
+    backend = resolve_backend(backend)
+    fragment = _slice_between(html, "<article", "</article>")
+    return _TRENDING_PARSERS[backend](fragment)
+
+
+def _selectolax_tree(html):
+    tree = HTMLParser(html)
+    tree.strip_tags(list(NON_TEXT_TAGS))
+    return tree
+
+
+def _lxml_tree(html):
+    root = lxml.html.fromstring(html)
+    lxml.etree.strip_elements(root, *NON_TEXT_TAGS, with_tail=False)
+    return root
+
+
+def _lxml_text(element, strip=True):
+    """strip=True时与get_text(strip=True)一致，否则与.text一致"""
+    if strip:
+        return "".join(text.strip() for text in element.itertext())
+    return "".join(element.itertext())
+
+
+def _trending_selectolax(html):
+    articles = []
+    for article in _selectolax_tree(html).css("article.Box-row"):
+        title_elem = article.css_first("h2 a")
+        if title_elem is None:
+            continue
+
+        def text(selector):
+            node = article.css_first(selector)
+            return node.text(deep=True, separator="", strip=True) if node is not None else None
+
+        articles.append({
+            "title": title_elem.text(deep=True, separator="", strip=True),
+            "href": title_elem.attributes.get("href") or "",
+            "description": text("p"),
+            "language": text('span[itemprop="programmingLanguage"]'),
+            "stars_text": text('a[href$="/stargazers"]'),
+            "forks_text": text('a[href$="/forks"]'),
+            "stars_today_text": text("span.d-inline-block.float-sm-right")
+        })
+    return articles
+
+
+def _xpath_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _xpath_ends_with(attr, suffix):
+    return f"substring(@{attr}, string-length(@{attr}) - {len(suffix) - 1}) = '{suffix}'"
+
+
+_TRENDING_XPATHS = {
+    "description": ".//p",
+    "language": ".//span[@itemprop='programmingLanguage']",
+    "stars_text": f".//a[{_xpath_ends_with('href', '/stargazers')}]",
+    "forks_text": f".//a[{_xpath_ends_with('href', '/forks')}]",
+    "stars_today_text": f".//span[{_xpath_class('d-inline-block')} and {_xpath_class('float-sm-right')}]"
+}
+
+
+def _trending_lxml(html):
+    articles = []
+    root = _lxml_tree(html)
+    for article in root.xpath(f"//article[{_xpath_class('Box-row')}]"):
+        title_elems = article.xpath(".//h2//a")
+        if not title_elems:
+            continue
+
+        record = {
+            "title": _lxml_text(title_elems[0]),
+            "href": title_elems[0].get("href") or ""
+        }
+        for field, xpath in _TRENDING_XPATHS.items():
+            nodes = article.xpath(xpath)
+            record[field] = _lxml_text(nodes[0]) if nodes else None
+        articles.append(record)
+    return articles
+
+
+def _has_class(name):
+    """SoupStrainer的class过滤条件
+
+    直接传class_=name时，嵌套在其他标签里、带多个class的元素（如 class="td-02 extra"）会被漏掉
+    """
+    def match(value):
+        if value is None:
+            return False
+        return name in (value.split() if isinstance(value, str) else value)
+    return match
+
+
+def _trending_bs4(html):
+    articles = []
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("article", class_=_has_class("Box-row")))
+    for article in soup.select("article.Box-row"):
+        title_elem = article.select_one("h2 a")
+        if not title_elem:
+            continue
+
+        def text(selector):
+            node = article.select_one(selector)
+            return node.get_text(strip=True) if node else None
+
+        articles.append({
+            "title": title_elem.get_text(strip=True),
+            "href": title_elem.get("href", ""),
+            "description": text("p"),
+            "language": text('span[itemprop="programmingLanguage"]'),
+            "stars_text": text('a[href$="/stargazers"]'),
+            "forks_text": text('a[href$="/forks"]'),
+            "stars_today_text": text("span.d-inline-block.float-sm-right")
+        })
+    return articles
+
+
+_TRENDING_PARSERS = {
+    "selectolax": _trending_selectolax,
+    "lxml": _trending_lxml,
+    "bs4": _trending_bs4
+}
+
+
+# ---------- 微博热搜 ----------
+
+def parse_weibo_rows(html, backend=None):
+    """抽取 s.weibo.com/top/summary 中每个 td.td-02 的原始字段
+
+    Returns:
+        [{"title", "href", "hot"}]，没有链接或标题为空的行被跳过
+    """
+    backend = resolve_backend(backend)
+    return _WEIBO_PARSERS[backend](html)
+
+
+def _weibo_selectolax(html):
+    rows = []
+    for td in _selectolax_tree(html).css("td.td-02"):
+        link = td.css_first("a")
+        if link is None:
+            continue
+        title = link.text(deep=True, separator="").strip()
+        if not title:
+            continue
+        span = td.css_first("span")
+        rows.append({
+            "title": title,
+            "href": link.attributes.get("href") or "",
+            "hot": span.text(deep=True, separator="") if span is not None else ""
+        })
+    return rows
+
+
+def _weibo_lxml(html):
+    rows = []
+    root = _lxml_tree(html)
+    for td in root.xpath(f"//td[{_xpath_class('td-02')}]"):
+        links = td.xpath(".//a")
+        if not links:
+            continue
+        title = _lxml_text(links[0], strip=False).strip()
+        if not title:
+            continue
+        spans = td.xpath(".//span")
+        rows.append({
+            "title": title,
+            "href": links[0].get("href") or "",
+            "hot": _lxml_text(spans[0], strip=False) if spans else ""
+        })
+    return rows
+
+
+def _weibo_bs4(html):
+    rows = []
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("td", class_=_has_class("td-02")))
+    for td in soup.find_all("td", class_="td-02"):
+        link = td.find("a")
+        if not link or not link.text.strip():
+            continue
+        span = td.find("span")
+        rows.append({
+            "title": link.text.strip(),
+            "href": link.get("href", ""),
+            "hot": span.text if span else ""
+        })
+    return rows
+
+
+_WEIBO_PARSERS = {
+    "selectolax": _weibo_selectolax,
+    "lxml": _weibo_lxml,
+    "bs4": _weibo_bs4
+}
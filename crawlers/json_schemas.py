@@ -0,0 +1,206 @@
+"""
+各平台JSON接口的响应结构
+只声明爬虫实际读取的字段，其余字段在解码时直接跳过，见 utils/fast_json.py
+"""
+import os
+import sys
+from typing import List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.fast_json import Schema
+
+
+# ---------- B站 排行榜 api.bilibili.com/x/web-interface/ranking/v2 ----------
+
+class BilibiliOwner(Schema):
+    name: str = ""
+
+
+class BilibiliStat(Schema):
+    view: int = 0
+    danmaku: int = 0
+    like: int = 0
+    coin: int = 0
+    favorite: int = 0
+    share: int = 0
+    reply: int = 0
+
+
+class BilibiliVideo(Schema):
+    bvid: str = ""
+    title: str = ""
+    duration: int = 0
+    owner: BilibiliOwner = BilibiliOwner()
+    stat: BilibiliStat = BilibiliStat()
+
+
+class BilibiliRankingData(Schema):
+    list: List[BilibiliVideo] = []
+
+
+class BilibiliRanking(Schema):
+    code: Optional[int] = None
+    message: str = ""
+    data: Optional[BilibiliRankingData] = None
+
+
+# ---------- B站 综合热门 api.bilibili.com/x/web-interface/popular（按pn翻页） ----------
+
+class BilibiliPopularData(Schema):
+    list: List[BilibiliVideo] = []
+    no_more: bool = False
+
+
+class BilibiliPopular(Schema):
+    code: Optional[int] = None
+    message: str = ""
+    data: Optional[BilibiliPopularData] = None
+
+
+# ---------- B站 视频详情 api.bilibili.com/x/web-interface/view/detail ----------
+
+class BilibiliViewInfo(Schema):
+    bvid: str = ""
+    tname: str = ""
+    pubdate: int = 0
+    desc: str = ""
+
+
+class BilibiliTag(Schema):
+    tag_name: str = ""
+
+
+class BilibiliViewDetailData(Schema):
+    View: Optional[BilibiliViewInfo] = None
+    Tags: List[BilibiliTag] = []
+
+
+class BilibiliViewDetail(Schema):
+    code: Optional[int] = None
+    message: str = ""
+    data: Optional[BilibiliViewDetailData] = None
+
+
+# ---------- B站 热搜 app.bilibili.com/x/v2/search/trending/ranking ----------
+
+class BilibiliHotWord(Schema):
+    keyword: str = ""
+    show_name: str = ""
+    icon: str = ""
+    heat: int = 0
+
+
+class BilibiliHotSearchData(Schema):
+    list: List[BilibiliHotWord] = []
+
+
+class BilibiliHotSearch(Schema):
+    code: Optional[int] = None
+    message: str = ""
+    data: Optional[BilibiliHotSearchData] = None
+
+
+# ---------- 今日头条 热榜 www.toutiao.com/hot-event/hot-board/ ----------
+
+class ToutiaoHotItem(Schema):
+    ClusterId: int = 0
+    Title: str = ""
+    Url: str = ""
+    HotValue: int = 0  # 接口返回的是数字字符串
+    Label: str = ""
+    LabelStyle: str = ""
+    QueryWord: str = ""
+
+
+class ToutiaoHotBoard(Schema):
+    message: str = ""
+    data: List[ToutiaoHotItem] = []
+
+
+# ---------- 今日头条 信息流 www.toutiao.com/api/pc/list/feed（按max_behot_time翻页） ----------
+
+class ToutiaoVideoDetail(Schema):
+    video_watch_count: int = 0
+
+
+class ToutiaoFeedItem(Schema):
+    title: str = ""
+    item_id: str = ""
+    article_type: int = 0
+    digg_count: int = 0
+    comment_count: int = 0
+    video_detail_info: Optional[ToutiaoVideoDetail] = None
+
+
+class ToutiaoFeedCursor(Schema):
+    max_behot_time: int = 0
+
+
+class ToutiaoFeed(Schema):
+    message: str = ""
+    has_more: bool = False
+    next: Optional[ToutiaoFeedCursor] = None
+    data: List[ToutiaoFeedItem] = []
+
+
+# ---------- GitHub 仓库详情 api.github.com/repos/{owner}/{repo} ----------
+
+class GithubLicense(Schema):
+    spdx_id: Optional[str] = None
+
+
+class GithubRepo(Schema):
+    full_name: str = ""
+    topics: List[str] = []
+    created_at: str = ""
+    homepage: Optional[str] = None
+    license: Optional[GithubLicense] = None
+
+
+# ---------- 微博 热搜 weibo.com/ajax/side/hotSearch ----------
+
+class WeiboRealtimeItem(Schema):
+    word: str = ""
+    num: int = 0
+    rank: int = 0
+
+
+class WeiboHotSearchData(Schema):
+    realtime: List[WeiboRealtimeItem] = []
+
+
+class WeiboHotSearch(Schema):
+    ok: Optional[int] = None
+    data: Optional[WeiboHotSearchData] = None
+
+
+# ---------- 知乎 热榜 www.zhihu.com/api/v3/feed/topstory/hot-lists/total ----------
+
+class ZhihuHotTarget(Schema):
+    title: str = ""
+    url: str = ""
+    excerpt: str = ""
+
+
+class ZhihuHotListItem(Schema):
+    target: Optional[ZhihuHotTarget] = None
+    detail_text: str = ""
+
+
+class ZhihuHotList(Schema):
+    data: List[ZhihuHotListItem] = []
+
+
+# ---------- 知乎 热搜词 www.zhihu.com/api/v4/search/top_search ----------
+
+class ZhihuTopSearchWord(Schema):
+    query: str = ""
+    display_query: str = ""
+
+
+class ZhihuTopSearchWords(Schema):
+    words: List[ZhihuTopSearchWord] = []
+
+
+class ZhihuTopSearch(Schema):
+    top_search: Optional[ZhihuTopSearchWords] = None
@@ -1,13 +1,21 @@
 """
 今日头条热点数据收集
 """
-import requests
 import json
 from datetime import datetime
 import time
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.http_client import get_default_client
+from utils.fast_json import decode_response
+from utils.paginator import paginate
+from crawlers.json_schemas import ToutiaoFeed, ToutiaoHotBoard
 
 class ToutiaoCrawler:
-    def __init__(self):
+    def __init__(self, http_client=None):
+        self.http = http_client or get_default_client()
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "application/json, text/plain, */*",
@@ -25,26 +33,24 @@ class ToutiaoCrawler:
         print(f"[{datetime.now().strftime('%H:%M:%S')}] 获取今日头条热榜...")
         
         try:
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
+            response = self.http.get(url, platform="toutiao", params=params, headers=self.headers, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = decode_response(response, ToutiaoHotBoard)
                 
-                if data.get("message") == "success":
-                    hot_news = data.get("data", [])
-                    
+                if data.message == "success":
                     result = []
-                    for i, news in enumerate(hot_news[:limit], 1):
+                    for i, news in enumerate(data.data[:limit], 1):
                         news_info = {
                             "rank": i,
-                            "id": news.get("ClusterId", ""),
-                            "title": news.get("Title", ""),
-                            "url": news.get("Url", ""),
-                            "hot_value": news.get("HotValue", 0),
-                            "label": news.get("Label", ""),
-                            "label_style": news.get("LabelStyle", ""),
-                            "query_word": news.get("QueryWord", ""),
-                            "heat": self._format_heat(news.get("HotValue", 0)),
+                            "id": news.ClusterId,
+                            "title": news.Title,
+                            "url": news.Url,
+                            "hot_value": news.HotValue,
+                            "label": news.Label,
+                            "label_style": news.LabelStyle,
+                            "query_word": news.QueryWord,
+                            "heat": self._format_heat(news.HotValue),
                             "platform": "Toutiao"
                         }
                         result.append(news_info)
@@ -52,7 +58,8 @@ class ToutiaoCrawler:
                     print(f"✅ 获取到 {len(result)} 条热榜新闻")
                     return result
                 else:
-                    print(f"⚠️ API返回错误: {data.get('message', '未知错误')}")
+                    print(f"⚠️ API返回错误: {data.message or '未知错误'}")
+                    self.http.report_failure(url, f"message={data.message}")
             else:
                 print(f"❌ 请求失败: {response.status_code}")
                 
@@ -70,46 +77,74 @@ class ToutiaoCrawler:
         else:
             return str(hot_value)
     
-    def get_hot_video(self):
-        """获取头条热门视频（备用）"""
+    def iter_feed(self, category="pc_profile_hot", max_pages=None, max_items=None):
+        """按max_behot_time游标逐页读取信息流，逐条产出ToutiaoFeedItem
+
+        解析当前页时已在请求下一页；调用方提前停止时不再请求后续页面
+        Args:
+            max_pages: 最多请求多少页
+            max_items: 最多产出多少条
+        """
         url = "https://www.toutiao.com/api/pc/list/feed"
-        params = {
-            "category": "pc_profile_hot",
-            "max_behot_time": int(time.time()),
-            "aid": 24
-        }
-        
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] 获取头条热门视频...")
-        
+
+        def fetch(cursor):
+            params = {"category": category, "max_behot_time": cursor, "aid": 24}
+            try:
+                response = self.http.get(url, platform="toutiao", params=params, headers=self.headers, timeout=10)
+                if response.status_code != 200:
+                    print(f"❌ 信息流请求失败: {response.status_code}")
+                    return None
+                return decode_response(response, ToutiaoFeed)
+            except Exception as e:
+                print(f"❌ 信息流获取失败: {e}")
+                return None
+
+        def next_cursor(page, cursor):
+            if not page.has_more or not page.data or page.next is None:
+                return None
+            return page.next.max_behot_time or None
+
+        return paginate(fetch, next_cursor, lambda page: page.data, first_cursor=int(time.time()),
+                        max_pages=max_pages, max_items=max_items)
+
+    def iter_hot_videos(self, max_pages=None, max_items=None):
+        """逐条产出信息流中的视频"""
+        if max_items is not None and max_items <= 0:
+            return
+        feed = self.iter_feed(max_pages=max_pages)
+        count = 0
         try:
-            response = requests.get(url, params=params, headers=self.headers, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                videos = data.get("data", [])
-                
-                result = []
-                for video in videos[:10]:
-                    if video.get("article_type") == 1:  # 视频类型
-                        video_info = {
-                            "title": video.get("title", ""),
-                            "url": f"https://www.toutiao.com/video/{video.get('item_id', '')}",
-                            "play_count": video.get("video_detail_info", {}).get("video_watch_count", 0),
-                            "digg_count": video.get("digg_count", 0),
-                            "comment_count": video.get("comment_count", 0)
-                        }
-                        result.append(video_info)
-                
-                if result:
-                    print(f"✅ 获取到 {len(result)} 个热门视频")
-                return result
-            else:
-                print(f"❌ 视频请求失败: {response.status_code}")
-                
-        except Exception as e:
-            print(f"❌ 视频获取失败: {e}")
-        
-        return []
+            for video in feed:
+                if video.article_type != 1:  # 视频类型
+                    continue
+                detail = video.video_detail_info
+                yield {
+                    "title": video.title,
+                    "url": f"https://www.toutiao.com/video/{video.item_id}",
+                    "play_count": detail.video_watch_count if detail else 0,
+                    "digg_count": video.digg_count,
+                    "comment_count": video.comment_count
+                }
+                count += 1
+                if max_items is not None and count >= max_items:
+                    return
+        finally:
+            feed.close()
+
+    def get_hot_video(self, limit=10, max_pages=5):
+        """获取头条热门视频（备用）
+
+        Args:
+            limit: 视频数量，一页不够时按游标继续翻页
+            max_pages: 最多翻多少页
+        """
+        print(f"[{datetime.now().strftime('%H:%M:%S')}] 获取头条热门视频...")
+
+        result = list(self.iter_hot_videos(max_pages=max_pages, max_items=limit))
+
+        if result:
+            print(f"✅ 获取到 {len(result)} 个热门视频")
+        return result
     
     def save_to_file(self, data, filename_prefix="toutiao"):
         """保存数据到JSON文件"""
@@ -153,7 +188,6 @@ def test_toutiao():
             label = f"[{news['label']}]" if news['label'] else ""
             print(f"{news['rank']:2d}. {label}{news['title'][:30]:30}... 🔥{heat}")
     
-    time.sleep(2)
     
     # 2. 测试热门视频（可选）
     print("\n2. 测试热门视频:")
@@ -179,5 +213,4 @@ def test_toutiao():
     return hot_news
 
 if __name__ == "__main__":
-    import os
     test_toutiao()
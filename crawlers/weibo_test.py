@@ -1,15 +1,20 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 from datetime import datetime
+import os
+import sys
 
-def get_weibo_hot():
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.http_client import get_default_client
+from crawlers.html_parsers import parse_weibo_rows
+
+def get_weibo_hot(client=None, parser_backend=None):
     """微博热搜测试（相对简单）"""
     url = "https://s.weibo.com/top/summary"
     
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Cookie": "",  # 可以留空试试
+        # 不写Cookie头：访客cookie由客户端的SessionStore引导并跨运行保存，显式的Cookie头会覆盖它
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
         "Accept-Language": "zh-CN,zh;q=0.8,zh-TW;q=0.7,zh-HK;q=0.5,en-US;q=0.3,en;q=0.2"
     }
@@ -17,30 +22,20 @@ def get_weibo_hot():
     print(f"[{datetime.now().strftime('%H:%M:%S')}] 测试微博热搜...")
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = (client or get_default_client()).get(url, platform="weibo", headers=headers, timeout=10)
         
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
             # 微博热搜通常在<td>标签中
             hot_items = []
             
-            # 方法1：查找热搜列表
-            for td in soup.find_all('td', class_='td-02'):
-                link = td.find('a')
-                if link and link.text.strip():
-                    title = link.text.strip()
-                    href = link.get('href', '')
-                    
-                    # 提取热度
-                    span = td.find('span')
-                    hot = span.text if span else ''
-                    
-                    hot_items.append({
-                        'title': title,
-                        'url': f"https://s.weibo.com{href}" if href.startswith('/') else href,
-                        'hot': hot
-                    })
+            # 方法1：查找热搜列表（只解析 td.td-02）
+            for row in parse_weibo_rows(response.text, parser_backend):
+                href = row['href']
+                hot_items.append({
+                    'title': row['title'],
+                    'url': f"https://s.weibo.com{href}" if href.startswith('/') else href,
+                    'hot': row['hot']
+                })
             
             if hot_items:
                 print(f"✅ 成功获取 {len(hot_items)} 条微博热搜")
@@ -52,6 +47,7 @@ def get_weibo_hot():
                 print("⚠️ 方法1失败，尝试其他选择器...")
                 
                 # 微博可能用其他结构
+                soup = BeautifulSoup(response.text, 'html.parser')
                 for a in soup.find_all('a'):
                     href = a.get('href', '')
                     if '/weibo?q=' in href and a.text.strip():
@@ -1,12 +1,17 @@
 """
 可工作的爬虫集合 - 优先做能跑通的平台
 """
-import requests
 import json
 from datetime import datetime
-import time
+import os
+import sys
 
-def get_bilibili_hot():
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.http_client import get_default_client
+from utils.fast_json import decode_response
+from crawlers.json_schemas import BilibiliRanking
+
+def get_bilibili_hot(client=None):
     """B站热门 - 通常很稳定"""
     try:
         url = "https://api.bilibili.com/x/web-interface/ranking/v2?rid=0&type=all&page_size=20"
@@ -16,27 +21,27 @@ def get_bilibili_hot():
         }
         
         print("📺 获取B站热门视频...")
-        response = requests.get(url, headers=headers, timeout=10)
+        response = (client or get_default_client()).get(url, platform="bilibili", headers=headers, timeout=10)
         
         if response.status_code == 200:
-            data = response.json()
-            videos = data.get("data", {}).get("list", [])
+            data = decode_response(response, BilibiliRanking)
+            videos = data.data.list if data.data else []
             
             if videos:
                 print(f"✅ 获取到 {len(videos)} 个热门视频")
                 
                 hot_videos = []
                 for i, video in enumerate(videos[:10], 1):
-                    title = video.get("title", "")
-                    play = video.get("stat", {}).get("view", 0)
-                    up = video.get("owner", {}).get("name", "")
+                    title = video.title
+                    play = video.stat.view
+                    up = video.owner.name
                     
                     hot_videos.append({
                         "rank": i,
                         "title": title,
                         "play": f"{play:,}",
                         "up": up,
-                        "url": f"https://www.bilibili.com/video/{video.get('bvid', '')}"
+                        "url": f"https://www.bilibili.com/video/{video.bvid}"
                     })
                     
                     print(f"{i:2d}. {title[:30]:30}... ��{up[:10]:10} 🔥{play:,}")
@@ -50,7 +55,7 @@ def get_bilibili_hot():
     
     return []
 
-def get_douyin_trend():
+def get_douyin_trend(client=None):
     """抖音热榜/热点（通过API）"""
     try:
         # 抖音的热点API（可能需要特定header）
@@ -61,7 +66,7 @@ def get_douyin_trend():
         }
         
         print("🎵 尝试获取抖音热点...")
-        response = requests.get(url, headers=headers, timeout=10)
+        response = (client or get_default_client()).get(url, platform="douyin", headers=headers, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -88,7 +93,7 @@ def get_douyin_trend():
     
     return []
 
-def get_csdn_hot():
+def get_csdn_hot(client=None):
     """CSDN热榜 - 技术社区热点"""
     try:
         url = "https://bizapi.csdn.net/community-cloud/v1/homepage/community/hot"
@@ -97,7 +102,7 @@ def get_csdn_hot():
         }
         
         print("💻 获取CSDN热榜...")
-        response = requests.get(url, headers=headers, timeout=10)
+        response = (client or get_default_client()).get(url, platform="csdn", headers=headers, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -124,7 +129,7 @@ def get_csdn_hot():
     
     return []
 
-def get_github_trending():
+def get_github_trending(client=None):
     """GitHub Trending - 开发者热点"""
     try:
         url = "https://github.com/trending"
@@ -133,21 +138,17 @@ def get_github_trending():
         }
         
         print("🐙 获取GitHub Trending...")
-        response = requests.get(url, headers=headers, timeout=10)
+        response = (client or get_default_client()).get(url, platform="github", headers=headers, timeout=10)
         
         if response.status_code == 200:
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(response.text, 'html.parser')
+            from crawlers.html_parsers import parse_trending_articles
             
             repos = []
-            for article in soup.select('article.Box-row')[:10]:
-                title_elem = article.select_one('h2 a')
-                if title_elem:
-                    title = title_elem.get_text(strip=True)
-                    repos.append({
-                        "title": title,
-                        "url": f"https://github.com{title_elem.get('href', '')}"
-                    })
+            for article in parse_trending_articles(response.text)[:10]:
+                repos.append({
+                    "title": article["title"],
+                    "url": f"https://github.com{article['href']}"
+                })
             
             if repos:
                 print(f"✅ 获取到 {len(repos)} 个热门仓库")
@@ -176,25 +177,25 @@ def main():
     bilibili_data = get_bilibili_hot()
     if bilibili_data:
         all_data["bilibili"] = bilibili_data
-    time.sleep(2)
     
     # 运行抖音
     douyin_data = get_douyin_trend()
     if douyin_data:
         all_data["douyin"] = douyin_data
-    time.sleep(2)
     
     # 运行CSDN
     csdn_data = get_csdn_hot()
     if csdn_data:
         all_data["csdn"] = csdn_data
-    time.sleep(2)
     
     # 运行GitHub
     github_data = get_github_trending()
     if github_data:
         all_data["github"] = github_data
     
+    get_default_client().print_stats()
+    get_default_client().save_state()
+    
     # 保存数据
     if all_data:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M")
@@ -1,13 +1,172 @@
-import requests
+import codecs
 import re
 import json
 from datetime import datetime
-import time
+import os
+import sys
 
-def get_zhihu_billboard():
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.http_client import DEFAULT_DATA_DIR, get_default_client
+
+INITIAL_DATA_MARKER = '<script id="js-initialData" type="text/json">'
+SCRIPT_END = "</script>"
+
+# 数组内需要关注的字符: 方括号计深度，引号和反斜杠处理字符串
+_ARRAY_TOKEN = re.compile(r'[\[\]"\\]')
+_KEY_SEPARATOR = re.compile(r'\s*:\s*')
+
+
+class HotListExtractor:
+    """流式提取 js-initialData 中的 hotList
+
+    逐块喂入响应正文，先定位 js-initialData 脚本标签，再在脚本内查找第一个
+    非空的 "hotList" 数组，只对这一段做json解析，其余内容读过即丢。
+    state: script(找标签) -> key(找hotList) -> array(读数组) -> done / missing
+    """
+
+    def __init__(self, key="hotList", head_size=5000):
+        self.key = f'"{key}"'
+        self.head_size = head_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = ""
+        self._array_parts = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+        self.state = "script"
+        self.result = None
+        self.error = None
+        self.bytes_read = 0
+        self.head = ""
+
+    def feed(self, chunk):
+        """喂入一块字节，返回True表示已经结束，不需要继续读取"""
+        self.bytes_read += len(chunk)
+        text = self._decoder.decode(chunk)
+        if len(self.head) < self.head_size:
+            self.head += text[:self.head_size - len(self.head)]
+
+        self._pending += text
+        while True:
+            if self.state == "script":
+                index = self._pending.find(INITIAL_DATA_MARKER)
+                if index == -1:
+                    self._pending = self._pending[-(len(INITIAL_DATA_MARKER) - 1):]
+                    return False
+                self._pending = self._pending[index + len(INITIAL_DATA_MARKER):]
+                self.state = "key"
+
+            elif self.state == "key":
+                if not self._seek_key():
+                    return self.state == "missing"
+
+            elif self.state == "array":
+                if not self._scan_array():
+                    return False
+                if self.error or self.result:
+                    self.state = "done" if self.result else "missing"
+                    return True
+                # 空数组，继续找下一个hotList
+                self.state = "key"
+
+            else:
+                return True
+
+    def _seek_key(self):
+        """在脚本内查找key，找到数组开头返回True；数据不够或脚本结束返回False"""
+        pending = self._pending
+        index = pending.find(self.key)
+        end = pending.find(SCRIPT_END)
+
+        if index == -1 or (end != -1 and end < index):
+            if end != -1:
+                self.state = "missing"
+            else:
+                keep = max(len(self.key), len(SCRIPT_END)) - 1
+                self._pending = pending[-keep:]
+            return False
+
+        rest = pending[index + len(self.key):]
+        stripped = rest.lstrip()
+        if stripped and stripped[0] != ":":
+            # 只是某个值里出现了同名字符串
+            self._pending = rest
+            return True
+
+        separator = _KEY_SEPARATOR.match(rest)
+        if separator is None or separator.end() == len(rest):
+            # 数据还不够，等下一块
+            self._pending = pending[index:]
+            return False
+
+        value = rest[separator.end():]
+        if value[0] != "[":
+            self._pending = value
+            return True
+
+        self._pending = value
+        self._array_parts = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.state = "array"
+        return True
+
+    def _scan_array(self):
+        """扫描数组直到方括号配平，配平时解析并返回True"""
+        pending = self._pending
+        position = 0
+        if self._escape and pending:
+            position = 1
+            self._escape = False
+
+        while True:
+            match = _ARRAY_TOKEN.search(pending, position)
+            if match is None:
+                self._array_parts.append(pending)
+                self._pending = ""
+                return False
+
+            char = match.group()
+            position = match.end()
+            if self._in_string:
+                if char == "\\":
+                    if position < len(pending):
+                        position += 1
+                    else:
+                        self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "[":
+                self._depth += 1
+            elif char == "]":
+                self._depth -= 1
+                if self._depth == 0:
+                    break
+
+        self._array_parts.append(pending[:position])
+        self._pending = pending[position:]
+        json_str = "".join(self._array_parts)
+        self._array_parts = []
+        try:
+            self.result = json.loads(json_str) or None
+        except json.JSONDecodeError as e:
+            self.error = f"{e} | JSON片段: {json_str[:200]}"
+        return True
+
+
+def get_zhihu_billboard(client=None, rate_key=None, cancel=None, debug=False):
     """
     知乎热榜网页版爬虫
     访问 https://www.zhihu.com/billboard 提取数据
+
+    Args:
+        rate_key: 使用的限流桶，默认按主机
+        cancel: threading.Event，置位后停止读取正文并关闭响应（对冲时其他来源已胜出）
+        debug: 解析失败时把页面开头保存到 data/debug/zhihu_billboard.html
     """
     url = "https://www.zhihu.com/billboard"
     
@@ -29,99 +188,70 @@ def get_zhihu_billboard():
     print(f"[{datetime.now().strftime('%H:%M:%S')}] 开始抓取知乎热榜网页...")
     
     try:
-        # 添加延时，避免请求太快
-        time.sleep(2)
-        
-        response = requests.get(url, headers=headers, timeout=15)
+        http = client or get_default_client()
+        response = http.get(url, platform="zhihu", headers=headers, timeout=15, stream=True, rate_key=rate_key)
         print(f"状态码: {response.status_code}")
-        print(f"页面大小: {len(response.text)/1024:.1f}KB")
         
         if response.status_code == 200:
-            html = response.text
+            # 边下载边查找，拿到hotList后立即停止读取
+            extractor = HotListExtractor()
+            body = http.iter_body(response)
+            try:
+                for chunk in body:
+                    if extractor.feed(chunk) or (cancel is not None and cancel.is_set()):
+                        break
+            finally:
+                body.close()
+                response.close()
             
-            # 方法1：正则匹配JSON数据
-            # 知乎热榜数据在 <script id="js-initialData"> 标签中
-            pattern = r'<script id="js-initialData" type="text/json">(.*?)</script>'
-            matches = re.findall(pattern, html, re.DOTALL)
+            if cancel is not None and cancel.is_set() and extractor.state != "done":
+                print("⏹️ 其他来源已胜出，停止读取热榜网页")
+                return []
+            stopped = "（已提前停止）" if extractor.state == "done" else ""
+            print(f"读取大小: {extractor.bytes_read/1024:.1f}KB{stopped}")
             
-            if matches:
+            if extractor.error:
+                print(f"❌ JSON解析错误: {extractor.error}")
+            elif extractor.state == "script":
+                print("❌ 未找到热榜数据标签")
+                
+                # 尝试搜索热榜关键词
+                if '热榜' in extractor.head or 'HotList' in extractor.head:
+                    print("💡 页面包含热榜关键词，但未找到结构化数据")
+            elif extractor.state != "done":
+                print("⚠️ 未找到热榜列表结构")
+            
+            hot_list = extractor.result
+            if hot_list:
                 print("✅ 找到热榜数据")
-                json_str = matches[0]
+                print(f"🎉 成功解析到 {len(hot_list)} 条热榜数据")
                 
-                try:
-                    data = json.loads(json_str)
-                    
-                    # 知乎热榜的嵌套路径
-                    hot_list = data.get('initialState', {}).get('topstory', {}).get('hotList', [])
-                    
-                    if not hot_list:
-                        # 尝试其他可能的路径
-                        hot_list = data.get('initialState', {}).get('billboard', {}).get('hotList', [])
-                    
-                    if not hot_list:
-                        # 尝试搜索整个数据结构
-                        def find_hotlist(obj, depth=0):
-                            if depth > 3:  # 防止递归太深
-                                return None
-                            if isinstance(obj, dict):
-                                for key, value in obj.items():
-                                    if 'hot' in key.lower() and isinstance(value, list):
-                                        return value
-                                    result = find_hotlist(value, depth+1)
-                                    if result:
-                                        return result
-                            elif isinstance(obj, list):
-                                for item in obj[:5]:  # 只检查前几项
-                                    result = find_hotlist(item, depth+1)
-                                    if result:
-                                        return result
-                            return None
-                        
-                        hot_list = find_hotlist(data)
-                    
-                    if hot_list and isinstance(hot_list, list):
-                        print(f"🎉 成功解析到 {len(hot_list)} 条热榜数据")
+                # 输出前10条
+                for i, item in enumerate(hot_list[:10], 1):
+                    if isinstance(item, dict):
+                        # 提取标题
+                        target = item.get('target', {})
+                        title = target.get('title', item.get('title', '无标题'))
                         
-                        # 输出前10条
-                        for i, item in enumerate(hot_list[:10], 1):
-                            if isinstance(item, dict):
-                                # 提取标题
-                                target = item.get('target', {})
-                                title = target.get('title', item.get('title', '无标题'))
-                                
-                                # 提取热度
-                                hot = item.get('detailText', item.get('detail_text', ''))
-                                if not hot:
-                                    hot = item.get('metrics', {}).get('area', {}).get('text', '')
-                                
-                                # 提取链接
-                                link = f"https://www.zhihu.com/question/{target.get('id', '')}" if target.get('id') else ''
-                                
-                                print(f"{i:2d}. {title[:30]:30}... 热度: {hot}")
-                        
-                        return hot_list
-                    else:
-                        print("⚠️ 未找到热榜列表结构")
+                        # 提取热度
+                        hot = item.get('detailText', item.get('detail_text', ''))
+                        if not hot:
+                            hot = item.get('metrics', {}).get('area', {}).get('text', '')
                         
-                        # 保存HTML用于调试
-                        with open('zhihu_debug.html', 'w', encoding='utf-8') as f:
-                            f.write(html[:5000])
-                        print("📁 已保存HTML片段到 zhihu_debug.html")
+                        # 提取链接
+                        link = f"https://www.zhihu.com/question/{target.get('id', '')}" if target.get('id') else ''
                         
-                except json.JSONDecodeError as e:
-                    print(f"❌ JSON解析错误: {e}")
-                    print(f"JSON片段: {json_str[:200]}")
-            else:
-                print("❌ 未找到热榜数据标签")
+                        print(f"{i:2d}. {title[:30]:30}... 热度: {hot}")
                 
-                # 尝试搜索热榜关键词
-                if '热榜' in html or 'HotList' in html:
-                    print("💡 页面包含热榜关键词，但未找到结构化数据")
-                    
-                # 保存HTML用于分析
-                with open('zhihu_full.html', 'w', encoding='utf-8') as f:
-                    f.write(html)
-                print("📁 已保存完整HTML到 zhihu_full.html")
+                return hot_list
+            
+            if debug:
+                # 保存页面开头用于调试（不保存整页）
+                debug_file = os.path.join(DEFAULT_DATA_DIR, "debug", "zhihu_billboard.html")
+                os.makedirs(os.path.dirname(debug_file), exist_ok=True)
+                with open(debug_file, 'w', encoding='utf-8') as f:
+                    f.write(extractor.head)
+                print(f"📁 已保存HTML片段到 {debug_file}")
         else:
             print(f"❌ 请求失败: {response.status_code}")
             
@@ -135,7 +265,7 @@ if __name__ == "__main__":
     print("知乎热榜网页版爬虫 v1.0")
     print("=" * 60)
     
-    results = get_zhihu_billboard()
+    results = get_zhihu_billboard(debug="--debug" in sys.argv)
     
     if results:
         print(f"\n✅ 总共获取到 {len(results)} 条热榜数据")
@@ -147,3 +277,4 @@ if __name__ == "__main__":
         print("2. 尝试更换User-Agent")
         print("3. 添加必要的Cookie（如果需要）")
         print("4. 先试试其他平台（微博/B站）")
+        print("5. 加上 --debug 把页面开头保存到 data/debug/ 查看")
@@ -0,0 +1,126 @@
+"""
+知乎热榜数据源链
+知乎热榜有三个可替代来源，通过SourceChain对冲执行，取最先返回有效数据的一个:
+  api_v3      www.zhihu.com/api/v3/feed/topstory/hot-lists/total
+  top_search  www.zhihu.com/api/v4/search/top_search（只有热搜词）
+  billboard   www.zhihu.com/billboard 网页中的hotList
+各来源的结果统一为 {"rank", "title", "url", "hot", "excerpt", "source"}。
+三个来源都在www.zhihu.com，对冲请求使用单独的限流预算HEDGE_RATE_KEY，
+否则会在同一个突发为1的主机桶里排队，stagger失去作用。
+"""
+import os
+import re
+import sys
+from urllib.parse import quote
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.http_client import get_default_client
+from utils.fast_json import decode_response
+from utils.source_chain import SourceChain
+from crawlers.json_schemas import ZhihuHotList, ZhihuTopSearch
+from crawlers.zhihu_billboard import get_zhihu_billboard
+
+HOT_LIST_URL = "https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total"
+TOP_SEARCH_URL = "https://www.zhihu.com/api/v4/search/top_search"
+HEDGE_RATE_KEY = "zhihu_hedge"
+
+
+def _question_url(url):
+    """api.zhihu.com/questions/123 -> www.zhihu.com/question/123"""
+    match = re.search(r"/questions?/(\d+)", url or "")
+    return f"https://www.zhihu.com/question/{match.group(1)}" if match else (url or "")
+
+
+def _hot_item(rank, title, url, hot="", excerpt="", source=""):
+    return {
+        "rank": rank,
+        "title": title,
+        "url": url,
+        "hot": hot,
+        "excerpt": excerpt,
+        "source": source
+    }
+
+
+def fetch_hot_list_api(client=None, limit=50, rate_key=None):
+    """v3热榜接口"""
+    response = (client or get_default_client()).get(
+        HOT_LIST_URL, platform="zhihu", params={"limit": limit}, timeout=10, rate_key=rate_key)
+    if response.status_code != 200:
+        print(f"❌ 知乎热榜接口状态码: {response.status_code}")
+        return []
+
+    items = []
+    for item in decode_response(response, ZhihuHotList).data:
+        if item.target is None or not item.target.title:
+            continue
+        items.append(_hot_item(len(items) + 1, item.target.title, _question_url(item.target.url),
+                               item.detail_text, item.target.excerpt, "api_v3"))
+    return items
+
+
+def fetch_top_search(client=None, rate_key=None):
+    """热搜词接口，没有热度和摘要"""
+    response = (client or get_default_client()).get(TOP_SEARCH_URL, platform="zhihu", timeout=8, rate_key=rate_key)
+    if response.status_code != 200:
+        print(f"❌ 知乎热搜词接口状态码: {response.status_code}")
+        return []
+
+    data = decode_response(response, ZhihuTopSearch)
+    words = data.top_search.words if data.top_search else []
+    items = []
+    for word in words:
+        title = word.display_query or word.query
+        if title:
+            items.append(_hot_item(len(items) + 1, title,
+                                   f"https://www.zhihu.com/search?type=content&q={quote(word.query or title)}",
+                                   source="top_search"))
+    return items
+
+
+def fetch_billboard(client=None, rate_key=None, cancel=None):
+    """热榜网页，兼容新旧两种hotList结构"""
+    items = []
+    for entry in get_zhihu_billboard(client=client, rate_key=rate_key, cancel=cancel) or []:
+        if not isinstance(entry, dict):
+            continue
+        # 置顶/广告条目的target和各Area字段可能为null
+        target = entry.get("target") or {}
+        title = ((target.get("titleArea") or {}).get("text") or target.get("title") or entry.get("title", ""))
+        if not title:
+            continue
+        hot = ((target.get("metricsArea") or {}).get("text") or entry.get("detailText")
+               or entry.get("detail_text", ""))
+        url = (target.get("link") or {}).get("url") or (
+            f"https://www.zhihu.com/question/{target['id']}" if target.get("id") else "")
+        excerpt = (target.get("excerptArea") or {}).get("text") or target.get("excerpt", "")
+        items.append(_hot_item(len(items) + 1, title, url, hot, excerpt, "billboard"))
+    return items
+
+
+def get_zhihu_hot(client=None, stagger=1.0, state_file=None):
+    """知乎热榜，三个来源对冲执行
+
+    Args:
+        stagger: 排名靠前的来源多少秒内没有结果就启动下一个，0表示同时启动
+        state_file: 来源排名文件，默认DEFAULT_DATA_DIR/source_chains.json
+    Returns:
+        (热榜条目列表, 报告)，全部来源失败时列表为空
+    """
+    client = client or get_default_client()
+    chain = SourceChain("zhihu_hot", [
+        ("api_v3", lambda: fetch_hot_list_api(client, rate_key=HEDGE_RATE_KEY)),
+        ("billboard", lambda: fetch_billboard(client, rate_key=HEDGE_RATE_KEY, cancel=chain.cancelled)),
+        ("top_search", lambda: fetch_top_search(client, rate_key=HEDGE_RATE_KEY))
+    ], state_file=state_file, stagger=stagger)
+
+    items, report = chain.run()
+    return items or [], report
+
+
+if __name__ == "__main__":
+    hot_items, chain_report = get_zhihu_hot()
+    for hot_item in hot_items[:10]:
+        print(f"{hot_item['rank']:2d}. {hot_item['title'][:30]:30} {hot_item['hot']}")
+    get_default_client().print_stats()
+    get_default_client().save_state()
@@ -1,8 +1,12 @@
-import requests
 import json
 from datetime import datetime
+import os
+import sys
 
-def test_zhihu():
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.http_client import get_default_client
+
+def test_zhihu(client=None):
     """测试知乎热榜API"""
     url = "https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total"
     params = {"limit": 5}
@@ -10,7 +14,7 @@ def test_zhihu():
     
     try:
         print(f"[{datetime.now().strftime('%H:%M:%S')}] 开始测试知乎热榜...")
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = (client or get_default_client()).get(url, platform="zhihu", params=params, headers=headers, timeout=10)
         data = response.json()
         
         if "data" in data:
@@ -9,6 +9,9 @@ echo "时间: $(date)"
 echo "📊 收集热点数据..."
 python hotspot_collector.py
 
+# 归档前几天的快照（需要pyarrow，未安装时跳过）
+python processors/archive.py --compact
+
 # 2. 生成报告
 echo "📝 生成日报..."
 python generate_report.py
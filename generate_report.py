@@ -7,31 +7,25 @@ import os
 from datetime import datetime
 import re
 
+from utils.delta_store import load_snapshot
+from utils.snapshot_index import SnapshotIndex
+
 class ReportGenerator:
     def __init__(self, reports_dir="reports"):
         self.reports_dir = reports_dir
         os.makedirs(reports_dir, exist_ok=True)
     
-    def find_latest_data(self, data_dir="data"):
-        """查找最新的数据文件"""
-        data_files = []
-        for f in os.listdir(data_dir):
-            if f.startswith("hotspot_daily_") and f.endswith(".json"):
-                data_files.append(os.path.join(data_dir, f))
-        
-        if not data_files:
+    def find_latest_data(self, data_dir="data", day=None):
+        """查找最新的数据文件（或某天最新的），读取快照清单的LATEST指针"""
+        data_file = SnapshotIndex(data_dir).resolve(day)
+        if not data_file:
             print("❌ 没有找到数据文件")
-            return None
-        
-        # 按修改时间排序
-        data_files.sort(key=lambda x: os.path.getmtime(x), reverse=True)
-        return data_files[0]
+        return data_file
     
     def load_data(self, data_file):
-        """加载数据文件"""
+        """加载数据文件（也支持增量存储的快照引用）"""
         try:
-            with open(data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_snapshot(data_file)
         except Exception as e:
             print(f"❌ 加载数据失败: {e}")
             return None
@@ -152,10 +146,14 @@ class ReportGenerator:
         print(f"📄 日报已生成: {filename}")
         return filename
     
-    def generate_and_save(self, data_file=None):
-        """生成并保存日报"""
+    def generate_and_save(self, data_file=None, day=None):
+        """生成并保存日报
+
+        Args:
+            day: 使用某天（YYYY-MM-DD）最新的快照，默认最新快照
+        """
         if not data_file:
-            data_file = self.find_latest_data()
+            data_file = self.find_latest_data(day=day)
             if not data_file:
                 return None
         
@@ -191,8 +189,14 @@ class ReportGenerator:
             return None
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="热点日报生成器")
+    parser.add_argument("--date", default=None, help="使用某天的最新快照 (YYYY-MM-DD)")
+    args = parser.parse_args()
+    
     generator = ReportGenerator()
-    report_file = generator.generate_and_save()
+    report_file = generator.generate_and_save(day=args.date)
     
     if report_file:
         print(f"\n🚀 日报生成成功！")
@@ -6,6 +6,9 @@ import os
 from datetime import datetime
 import re
 
+from utils.delta_store import load_snapshot
+from utils.snapshot_index import SnapshotIndex
+
 class EnhancedReportGenerator:
     def __init__(self, reports_dir="reports"):
         self.reports_dir = reports_dir
@@ -13,8 +16,7 @@ class EnhancedReportGenerator:
     
     def generate_enhanced_report(self, data_file):
         """生成增强版日报"""
-        with open(data_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_snapshot(data_file)
         
         timestamp = datetime.fromisoformat(data.get("timestamp", datetime.now().isoformat()))
         
@@ -111,11 +113,8 @@ class EnhancedReportGenerator:
 
 if __name__ == "__main__":
     # 找到最新数据文件
-    data_files = [f for f in os.listdir('data') if f.startswith('hotspot_daily_')]
-    if data_files:
-        data_files.sort(reverse=True)
-        latest_file = os.path.join('data', data_files[0])
-        
+    latest_file = SnapshotIndex("data").resolve()
+    if latest_file:
         generator = EnhancedReportGenerator()
         report_file = generator.generate_enhanced_report(latest_file)
         
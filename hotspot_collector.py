@@ -1,6 +1,7 @@
 """
 热点日报主收集器 - 使用B站和GitHub
 """
+import asyncio
 import json
 import time
 from datetime import datetime
@@ -12,23 +13,77 @@ sys.path.append('.')
 try:
     from crawlers.bilibili import BilibiliCrawler
     from crawlers.github_trending import GitHubTrendingCrawler
+    from processors.enrichment import EnrichmentCache, Enricher
+    from utils.adaptive_timeout import AdaptiveTimeouts
+    from utils.async_engine import gather_endpoints
+    from utils.circuit_breaker import CircuitBreaker
+    from utils.delta_store import DeltaStore
+    from utils.deadline import deadline_scope, remaining_time
+    from utils.history_store import HistoryStore
+    from utils.http_client import HttpClient
+    from utils.proxy_pool import ProxyPool, load_proxy_list
+    from utils.response_cache import ResponseCache
+    from utils.session_store import SessionStore
+    from utils.snapshot_index import SnapshotIndex
+    from utils.stream_writer import StreamWriter, load_stream
     print("✅ 爬虫模块导入成功")
 except ImportError as e:
     print(f"❌ 模块导入失败: {e}")
     sys.exit(1)
 
 class HotspotCollector:
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", http_client=None, http2=False, proxies=None, enrich=False, history=True, delta=False,
+                 stream=False, gzip_output=False):
+        """
+        Args:
+            stream: 各平台结果一到就逐条写入运行文件（NDJSON）并fsync，崩溃后可用resume续采
+            gzip_output: 流式模式下gzip压缩运行文件
+            delta: 快照按 关键帧+增量 保存到 data_dir/deltas/，只记录名次和指标的变化，适合高频采集
+            history: 每次收集同时写入SQLite历史库（data_dir/history.db）
+            enrich: 为GitHub仓库和B站视频补充详情（按条目缓存，连续上榜的条目不重复请求）；
+                会给快照增加字段，并占用GitHub未认证接口每小时60次的配额，默认关闭
+            http2: 使用HTTP/2传输（需要httpx[http2]，未安装时退回HTTP/1.1）
+            proxies: 代理地址列表，设置后请求经代理池发出
+        """
+        if delta and (stream or gzip_output):
+            raise ValueError("增量存储和流式写入不能同时使用")
         self.data_dir = data_dir
         os.makedirs(data_dir, exist_ok=True)
         
+        # 所有爬虫共享同一个连接池和响应缓存
+        self.http = http_client or HttpClient(
+            cache=ResponseCache(os.path.join(data_dir, "http_cache")),
+            circuit_breaker=CircuitBreaker(os.path.join(data_dir, "circuit_state.json")),
+            adaptive_timeouts=AdaptiveTimeouts(os.path.join(data_dir, "latency_history.json")),
+            http2=http2,
+            session_store=SessionStore(os.path.join(data_dir, "sessions.json")),
+            proxy_pool=ProxyPool(proxies) if proxies else None
+        )
+        
         # 初始化可用的爬虫
-        self.bilibili_crawler = BilibiliCrawler()
-        self.github_crawler = GitHubTrendingCrawler()
+        self.bilibili_crawler = BilibiliCrawler(http_client=self.http)
+        self.github_crawler = GitHubTrendingCrawler(http_client=self.http)
+        self.enricher = Enricher(
+            http_client=self.http,
+            cache=EnrichmentCache(os.path.join(data_dir, "enrichment_cache.json"))
+        ) if enrich else None
+        self.history = HistoryStore(os.path.join(data_dir, "history.db")) if history else None
+        self.snapshots = SnapshotIndex(data_dir)
+        self.deltas = DeltaStore(os.path.join(data_dir, "deltas")) if delta else None
+        self.stream = StreamWriter(data_dir, compress=gzip_output) if stream or gzip_output else None
         print("📦 爬虫初始化完成")
     
-    def collect_all(self):
-        """收集所有可用平台数据"""
+    def collect_all(self, concurrent=False, deadline=None, resume=False):
+        """收集所有可用平台数据
+
+        Args:
+            concurrent: True时使用异步并发模式，所有平台和接口同时请求
+            deadline: 整体时间预算（秒），设置后自动使用并发模式
+            resume: 流式模式下沿用上次未完成的运行文件，跳过其中已成功的平台
+        """
+        if concurrent or deadline is not None:
+            return asyncio.run(self.collect_all_async(deadline=deadline, resume=resume))
+
         print("=" * 60)
         print("🔥 热点日报数据收集器 v1.0")
         print(f"开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -39,126 +94,325 @@ class HotspotCollector:
             "platforms": {},
             "data": {}
         }
+        done = self._start_stream(all_data, resume)
         
         # 1. 收集B站数据
-        print("\n[1/2] 收集B站数据...")
-        bilibili_results = self._collect_bilibili()
-        if bilibili_results:
-            all_data["platforms"]["bilibili"] = {
-                "name": "Bilibili",
-                "status": "success"
-            }
-            all_data["data"]["bilibili"] = bilibili_results
-        time.sleep(2)
+        if "bilibili" not in done:
+            print("\n[1/2] 收集B站数据...")
+            bilibili_results = self._collect_bilibili()
+            if bilibili_results:
+                self._add_platform(all_data, "bilibili", {
+                    "name": "Bilibili",
+                    "status": "success"
+                }, bilibili_results)
         
         # 2. 收集GitHub数据
-        print("\n[2/2] 收集GitHub数据...")
-        github_results = self._collect_github()
-        if github_results:
-            all_data["platforms"]["github"] = {
-                "name": "GitHub Trending", 
-                "status": "success"
-            }
-            all_data["data"]["github"] = github_results
+        if "github" not in done:
+            print("\n[2/2] 收集GitHub数据...")
+            github_results = self._collect_github()
+            if github_results:
+                self._add_platform(all_data, "github", {
+                    "name": "GitHub Trending", 
+                    "status": "success"
+                }, github_results)
         
         # 统计和保存
         return self._finish_collection(all_data)
     
+    async def collect_all_async(self, deadline=None, resume=False):
+        """异步并发收集所有平台数据
+
+        各平台及其子接口同时发起，同一主机的请求间隔由HttpClient限流器保证，
+        总耗时接近最慢的单个接口。返回值与collect_all相同。
+
+        Args:
+            deadline: 整体时间预算（秒）。每个请求的超时不超过剩余预算，
+                到时未完成的平台标记为"timeout"，已到达的数据照常保存
+            resume: 同collect_all
+        """
+        print("=" * 60)
+        print("🔥 热点日报数据收集器 v1.0 (并发模式)")
+        print(f"开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        if deadline is not None:
+            print(f"时间预算: {deadline}秒")
+        print("=" * 60)
+        
+        all_data = {
+            "timestamp": datetime.now().isoformat(),
+            "platforms": {},
+            "data": {}
+        }
+        done = self._start_stream(all_data, resume)
+        jobs = {platform_id: job for platform_id, job in self._endpoint_jobs().items() if platform_id not in done}
+        
+        builders = {
+            "bilibili": ("Bilibili", lambda r: self._build_bilibili_result(r["videos"], r["hot_search"])),
+            "github": ("GitHub Trending", lambda r: self._build_github_result(r["repos"]))
+        }
+        
+        start = time.monotonic()
+        # 详情补全也在预算内完成，预算用完时跳过
+        with deadline_scope(deadline):
+            results, report = await gather_endpoints(jobs, timeout=deadline)
+            print(f"\n⏱️ 并发收集耗时: {time.monotonic() - start:.2f}秒")
+            
+            for platform_id, (name, build) in builders.items():
+                if platform_id in done:
+                    continue
+                platform_results = build(results[platform_id])
+                timed_out = report[platform_id]["timed_out"]
+                if timed_out:
+                    status = "timeout"
+                    print(f"  ⏰ {name} 超出时间预算: {', '.join(timed_out)}")
+                elif platform_results:
+                    status = "success"
+                else:
+                    continue
+                
+                info = {
+                    "name": name,
+                    "status": status,
+                    "latency": report[platform_id]["latency"]
+                }
+                if deadline is not None:
+                    info["deadline"] = "missed" if timed_out else "met"
+                # 超时平台中按时到达的部分照常保存
+                self._add_platform(all_data, platform_id, info, platform_results)
+        elapsed = time.monotonic() - start
+        
+        if deadline is not None:
+            all_data["deadline"] = {
+                "budget": deadline,
+                "elapsed": round(elapsed, 3),
+                "timed_out": [p for p, info in all_data["platforms"].items() if info["status"] == "timeout"]
+            }
+        
+        return self._finish_collection(all_data)
+    
+    def _start_stream(self, all_data, resume):
+        """流式模式下开始写运行文件，返回续采时已完成的平台"""
+        if not self.stream:
+            return {}
+        all_data["timestamp"], done = self.stream.start(all_data["timestamp"], resume=resume)
+        all_data["platforms"].update(done)
+        for platform_id in done:
+            print(f"⏭️ 续采: 跳过已完成的平台 {platform_id}")
+        print(f"📝 流式写入: {self.stream.path}")
+        return done
+    
+    def _add_platform(self, all_data, platform_id, info, results):
+        """登记一个平台的结果并立即补全详情；流式模式下写入运行文件，不在内存中保留条目"""
+        all_data["platforms"][platform_id] = info
+        if results:
+            self._enrich({platform_id: results})
+        if not self.stream:
+            if results:
+                all_data["data"][platform_id] = results
+            return
+        self.stream.write_platform(platform_id, info, results)
+    
+    def _endpoint_jobs(self):
+        """并发模式下的接口列表: {平台: {接口名: 调用}}"""
+        return {
+            "bilibili": {
+                "videos": lambda: self.bilibili_crawler.get_ranking(rid=0, page_size=10),
+                "hot_search": self.bilibili_crawler.get_hot_search
+            },
+            "github": {
+                "repos": lambda: self.github_crawler.get_trending(since="daily")
+            }
+        }
+    
     def _collect_bilibili(self):
         """收集B站数据"""
         try:
             print("  📺 获取热门视频...")
             videos = self.bilibili_crawler.get_ranking(rid=0, page_size=10)
-            time.sleep(1)
             
             print("  �� 获取热搜词...")
             hot_search = self.bilibili_crawler.get_hot_search()
             
-            if videos or hot_search:
-                return {
-                    "videos": videos[:5] if videos else [],  # 只取前5
-                    "hot_search": hot_search[:5] if hot_search else []
-                }
+            return self._build_bilibili_result(videos, hot_search)
         except Exception as e:
             print(f"  ❌ B站收集失败: {e}")
         return None
     
+    def _build_bilibili_result(self, videos, hot_search):
+        """整理B站结果"""
+        if videos or hot_search:
+            return {
+                "videos": videos[:5] if videos else [],  # 只取前5
+                "hot_search": hot_search[:5] if hot_search else []
+            }
+        return None
+    
     def _collect_github(self):
         """收集GitHub数据"""
         try:
             print("  💻 获取GitHub热门仓库...")
             repos = self.github_crawler.get_trending(since="daily")
             
-            if repos:
-                return {
-                    "repos": repos[:5]  # 只取前5
-                }
+            return self._build_github_result(repos)
         except Exception as e:
             print(f"  ❌ GitHub收集失败: {e}")
         return None
     
+    def _build_github_result(self, repos):
+        """整理GitHub结果"""
+        if repos:
+            return {
+                "repos": repos[:5]  # 只取前5
+            }
+        return None
+    
+    def _enrich(self, data):
+        """补全已收集条目的详情，失败的条目保持原样；整体时间预算用完时跳过"""
+        if not self.enricher:
+            return
+        left = remaining_time()
+        if left is not None and left <= 0:
+            print(f"  ⏰ 时间预算已用完，跳过详情补全: {', '.join(data)}")
+            return
+        try:
+            if data.get("github"):
+                self.enricher.enrich_github(data["github"]["repos"])
+            if data.get("bilibili"):
+                self.enricher.enrich_bilibili(data["bilibili"]["videos"])
+        except Exception as e:
+            print(f"⚠️ 详情补全失败: {e}")
+    
+    def _report_enrichment(self):
+        """打印详情补全统计并保存缓存"""
+        if not self.enricher:
+            return
+        try:
+            self.enricher.print_stats()
+            self.enricher.save()
+        except Exception as e:
+            print(f"⚠️ 详情缓存保存失败: {e}")
+    
     def _finish_collection(self, all_data):
         """完成收集流程"""
         print("\n" + "=" * 60)
         print("📊 数据收集统计")
         print("=" * 60)
         
-        # 计算统计数据
+        self._report_enrichment()
+        
+        # 计算统计数据（流式模式下条目已写入运行文件，只保留了各类别的条目数）
+        if self.stream:
+            counts = self.stream.counts
+        else:
+            counts = {platform_id: {kind: len(records) for kind, records in data.items()}
+                      for platform_id, data in all_data["data"].items()}
         total_items = 0
         platform_count = 0
         
         for platform_id, platform_info in all_data["platforms"].items():
-            if platform_info["status"] == "success":
+            # 超时的平台只要有部分数据也计入统计
+            if platform_id in counts:
                 platform_count += 1
-                data = all_data["data"].get(platform_id, {})
+                data = counts[platform_id]
                 
                 if platform_id == "bilibili":
-                    video_count = len(data.get("videos", []))
-                    hot_count = len(data.get("hot_search", []))
+                    video_count = data.get("videos", 0)
+                    hot_count = data.get("hot_search", 0)
                     total_items += video_count + hot_count
                     print(f"  📺 Bilibili: {video_count}视频 + {hot_count}热搜")
                 
                 elif platform_id == "github":
-                    repo_count = len(data.get("repos", []))
+                    repo_count = data.get("repos", 0)
                     total_items += repo_count
                     print(f"  💻 GitHub: {repo_count}个仓库")
         
         all_data["summary"] = {
             "total_items": total_items,
             "platform_count": platform_count,
-            "collection_time": datetime.now().isoformat()
+            "collection_time": datetime.now().isoformat(),
+            "connections": self.http.connection_stats(),
+            "throttle": self.http.throttle_stats(),
+            "http_cache": self.http.cache_stats(),
+            "bodies": self.http.body_stats(),
+            "timeouts": self.http.timeout_stats(),
+            "circuits": self.http.circuit_stats(),
+            "proxies": self.http.proxy_stats(),
+            "sessions": self.http.session_stats(),
+            "enrichment": self.enricher.stats() if self.enricher else {}
         }
+        self.http.print_stats()
+        self.http.save_state()
         
         # 保存数据
         if total_items > 0:
             filename = self._save_data(all_data)
             
             print(f"\n💾 数据已保存: {filename}")
+            if self.history:
+                try:
+                    payload = load_stream(filename) if self.stream else all_data
+                    self.history.save_snapshot(payload, source=os.path.basename(filename))
+                    print(f"🗃️ 已写入历史库: {self.history.db_path}")
+                except Exception as e:
+                    print(f"⚠️ 写入历史库失败: {e}")
             print(f"🎯 成功收集 {platform_count} 个平台，共 {total_items} 条数据")
             print("=" * 60)
             
             return filename
         else:
+            if self.stream:
+                self.stream.close()
             print("\n❌ 没有收集到任何数据")
             return None
     
     def _save_data(self, data):
-        """保存数据到文件"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-        filename = f"{self.data_dir}/hotspot_daily_{timestamp}.json"
+        """保存数据到当天目录 data/YYYY/MM/DD/（增量模式下追加到 data/deltas/，流式模式下为NDJSON），并登记到快照清单"""
+        if self.deltas:
+            kind, size, reference = self.deltas.append(data)
+            filename = os.path.join(self.deltas.root, reference)
+            print(f"🧮 增量存储: {'关键帧' if kind == 'keyframe' else '增量'} {size/1024:.1f}KB")
+            self.snapshots.record(filename, data, bytes_written=size)
+            return filename
+        
+        filename = self.snapshots.path_for(data["timestamp"])
+        if self.stream:
+            # 条目已逐个平台写入，只需补上summary等字段后原子改名
+            for key, value in data.items():
+                if key not in ("timestamp", "platforms", "data"):
+                    self.stream.write_meta(key, value)
+            filename = self.stream.finalize(filename[:-len(".json")] + self.stream.suffix)
+            self.snapshots.record(filename, dict(data, data=self.stream.counts))
+            return filename
         
-        with open(filename, "w", encoding="utf-8") as f:
+        tmp_path = filename + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, filename)
         
+        self.snapshots.record(filename, data)
         return filename
 
 if __name__ == "__main__":
-    collector = HotspotCollector()
-    data_file = collector.collect_all()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="热点日报数据收集器")
+    parser.add_argument("--async", dest="concurrent", action="store_true", help="并发收集所有平台")
+    parser.add_argument("--deadline", type=float, default=None, help="整体时间预算（秒），隐含--async")
+    parser.add_argument("--http2", action="store_true", help="使用HTTP/2传输（需要httpx[http2]）")
+    parser.add_argument("--proxies", default=None, help="代理列表文件（每行一个）或逗号分隔的代理地址")
+    parser.add_argument("--enrich", action="store_true", help="补充仓库/视频详情（未设置GITHUB_TOKEN时每小时限60次GitHub请求）")
+    parser.add_argument("--delta", action="store_true", help="快照按关键帧+增量保存，适合高频采集")
+    parser.add_argument("--stream", action="store_true", help="各平台结果到达即写入NDJSON运行文件")
+    parser.add_argument("--gzip", action="store_true", help="流式写入时gzip压缩，隐含--stream")
+    parser.add_argument("--resume", action="store_true", help="续采上次未完成的运行，隐含--stream")
+    args = parser.parse_args()
+    
+    collector = HotspotCollector(http2=args.http2, proxies=load_proxy_list(args.proxies), enrich=args.enrich,
+                                 delta=args.delta, stream=args.stream or args.resume, gzip_output=args.gzip)
+    data_file = collector.collect_all(concurrent=args.concurrent, deadline=args.deadline, resume=args.resume)
     
     if data_file:
         print("🎉 数据收集完成！下一步：")
-        print("1. 查看数据: cat data/hotspot_daily_*.json | head -100")
+        print(f"1. 查看数据: head -100 {data_file}")
         print("2. 生成日报: python generate_report.py")
     else:
         print("❌ 数据收集失败，请检查爬虫")
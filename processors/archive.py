@@ -0,0 +1,315 @@
+"""
+列式历史归档（可选，依赖 pandas + pyarrow）
+每天结束后把当天的全部快照按平台压缩成一个Parquet（或Feather）文件:
+    data/archive/YYYY/MM/DD/{平台}.parquet
+列有固定类型（名次、标题、热度、平台特有指标、采集时间），分析时只读需要的列，
+几个月的数据几秒内即可载入，不必逐个解析成千上万个JSON文件。
+运行: python processors/archive.py --compact   （压缩今天以前所有未归档的日期）
+"""
+import json
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.delta_store import load_snapshot
+from utils.history_store import item_fields, iter_records, normalize_time
+from utils.snapshot_index import SnapshotIndex
+
+try:
+    import pandas as pd
+    import pyarrow  # noqa: F401  Parquet/Feather读写需要
+except ImportError:
+    pd = None
+
+FORMATS = {"parquet": ".parquet", "feather": ".feather"}
+
+# 各平台共有的列
+BASE_COLUMNS = {
+    "captured_at": "datetime",
+    "kind": "category",
+    "rank": "Int32",
+    "item_key": "string",
+    "title": "string",
+    "url": "string",
+    "heat": "Float64"
+}
+
+# 平台特有的指标列
+METRIC_COLUMNS = {
+    "bilibili": {
+        "up": "string",
+        "duration": "Int32",
+        "view": "Int64",
+        "danmaku": "Int64",
+        "like": "Int64",
+        "coin": "Int64",
+        "favorite": "Int64",
+        "share": "Int64",
+        "reply": "Int64"
+    },
+    "github": {
+        "language": "category",
+        "stars": "Int64",
+        "forks": "Int64",
+        "stars_today": "Int64"
+    },
+    "toutiao": {
+        "hot_value": "Int64",
+        "label": "category"
+    },
+    "weibo": {
+        "hot": "string"
+    },
+    "zhihu": {
+        "hot": "string"
+    }
+}
+
+# 归档当天目录下的汇总文件，存在即表示该日已归档
+DAY_SUMMARY_FILE = "summary.json"
+
+
+def archive_available():
+    """是否安装了pandas和pyarrow"""
+    return pd is not None
+
+
+def columns_for(platform):
+    columns = dict(BASE_COLUMNS)
+    columns.update(METRIC_COLUMNS.get(platform, {}))
+    return columns
+
+
+def _typed_frame(rows, columns):
+    frame = pd.DataFrame(rows, columns=list(columns))
+    for name, dtype in columns.items():
+        if dtype == "datetime":
+            frame[name] = pd.to_datetime(frame[name])
+        elif dtype in ("Int32", "Int64", "Float64"):
+            frame[name] = pd.to_numeric(frame[name], errors="coerce").astype(dtype)
+        elif dtype == "category":
+            frame[name] = frame[name].astype("string").astype("category")
+        else:
+            frame[name] = frame[name].astype(dtype)
+    return frame
+
+
+class HistoryArchive:
+    """按天、按平台的列式归档
+
+    Args:
+        data_dir: 数据目录（快照位于 data_dir/YYYY/MM/DD/）
+        archive_dir: 归档目录，默认 data_dir/archive
+        file_format: "parquet" 或 "feather"
+    """
+
+    def __init__(self, data_dir="data", archive_dir=None, file_format="parquet"):
+        if not archive_available():
+            raise ImportError("列式归档需要安装 pandas 和 pyarrow")
+        if file_format not in FORMATS:
+            raise ValueError(f"不支持的归档格式: {file_format}")
+        self.data_dir = data_dir
+        self.archive_dir = archive_dir or os.path.join(data_dir, "archive")
+        self.file_format = file_format
+        self.snapshots = SnapshotIndex(data_dir)
+
+    def day_dir(self, day):
+        return os.path.join(self.archive_dir, f"{day.year:04d}", f"{day.month:02d}", f"{day.day:02d}")
+
+    def path_for(self, day, platform):
+        return os.path.join(self.day_dir(day), f"{platform}{FORMATS[self.file_format]}")
+
+    def compact_day(self, day):
+        """把某天的快照压缩为每个平台一个列式文件，返回汇总（含与原始JSON的大小对比）
+
+        没有读到任何条目时不写汇总、返回None，该日保持未归档，之后可以重试
+        """
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+
+        rows = {}
+        json_bytes = 0
+        sources = self.snapshots.snapshots_on(day)
+        # 增量存储的引用没有单独的文件，大小取清单中登记的写入字节数
+        delta_bytes = {os.path.join(self.data_dir, entry["path"]): entry["bytes"]
+                       for entry in self.snapshots.entries_on(day)}
+        for path in sources:
+            try:
+                payload = load_snapshot(path)
+                json_bytes += delta_bytes.get(path, 0) if "#" in path else os.path.getsize(path)
+            except Exception as e:
+                print(f"⚠️ 跳过无法读取的快照 {path}: {e}")
+                continue
+            captured_at = normalize_time(payload.get("timestamp"))
+            positions = {}
+            for platform, kind, record in iter_records(payload):
+                position = positions[(platform, kind)] = positions.get((platform, kind), 0) + 1
+                row = {name: record.get(name) for name in METRIC_COLUMNS.get(platform, {})}
+                row.update(item_fields(record, position))
+                row.update({"captured_at": captured_at, "kind": kind})
+                rows.setdefault(platform, []).append(row)
+
+        if not rows:
+            print(f"⏭️ {day.isoformat()}: 没有可归档的快照（找到 {len(sources)} 个），暂不标记为已归档")
+            return None
+
+        os.makedirs(self.day_dir(day), exist_ok=True)
+        files = {}
+        archive_bytes = 0
+        for platform, platform_rows in rows.items():
+            frame = _typed_frame(platform_rows, columns_for(platform))
+            path = self.path_for(day, platform)
+            tmp_path = path + ".tmp"
+            if self.file_format == "parquet":
+                frame.to_parquet(tmp_path, index=False, compression="zstd")
+            else:
+                frame.to_feather(tmp_path, compression="zstd")
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+            archive_bytes += size
+            files[platform] = {"rows": len(frame), "bytes": size}
+
+        summary = {
+            "date": day.isoformat(),
+            "format": self.file_format,
+            "snapshots": len(sources),
+            "json_bytes": json_bytes,
+            "archive_bytes": archive_bytes,
+            "platforms": files
+        }
+        with open(os.path.join(self.day_dir(day), DAY_SUMMARY_FILE), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        ratio = json_bytes / archive_bytes if archive_bytes else 0
+        print(f"🗜️ {day.isoformat()}: {len(sources)} 个快照 → {len(files)} 个{self.file_format}文件 | "
+              f"JSON {json_bytes/1024:.1f}KB → {archive_bytes/1024:.1f}KB ({ratio:.1f}x)")
+        return summary
+
+    def _snapshot_days(self):
+        """数据目录中有快照的日期（只遍历 年/月/日 三层目录）"""
+        days = []
+        for year in sorted(os.listdir(self.data_dir)) if os.path.isdir(self.data_dir) else []:
+            if not (year.isdigit() and len(year) == 4):
+                continue
+            for month in sorted(os.listdir(os.path.join(self.data_dir, year))):
+                if not month.isdigit():
+                    continue
+                for day in sorted(os.listdir(os.path.join(self.data_dir, year, month))):
+                    if not day.isdigit():
+                        continue
+                    try:
+                        days.append(date(int(year), int(month), int(day)))
+                    except ValueError:
+                        continue
+        return days
+
+    def compact_pending(self, before=None):
+        """压缩before（默认今天）之前所有尚未归档的日期，返回各天汇总"""
+        before = before or date.today()
+        summaries = []
+        for day in self._snapshot_days():
+            if day >= before or os.path.exists(os.path.join(self.day_dir(day), DAY_SUMMARY_FILE)):
+                continue
+            summary = self.compact_day(day)
+            if summary is not None:
+                summaries.append(summary)
+        if not summaries:
+            print("✅ 没有待归档的日期")
+        return summaries
+
+    def load(self, platform, start=None, end=None, columns=None, kind=None):
+        """读取某平台在日期范围内的归档为DataFrame
+
+        Args:
+            start / end: 起止日期（含两端），默认所有已归档日期
+            columns: 只读取这些列，None读取全部
+            kind: 只保留某类条目（如 videos / hot_search）
+        """
+        read_columns = None
+        if columns is not None:
+            read_columns = list(dict.fromkeys(list(columns) + (["kind"] if kind else [])))
+
+        days = self._archived_days(start, end)
+        frames = []
+        for day in days:
+            path = self.path_for(day, platform)
+            if not os.path.exists(path):
+                continue
+            if self.file_format == "parquet":
+                frames.append(pd.read_parquet(path, columns=read_columns))
+            else:
+                frames.append(pd.read_feather(path, columns=read_columns))
+        if not frames:
+            return _typed_frame([], {name: dtype for name, dtype in columns_for(platform).items()
+                                     if read_columns is None or name in read_columns})
+
+        frame = pd.concat(frames, ignore_index=True)
+        if kind:
+            frame = frame[frame["kind"] == kind]
+            if columns is not None and "kind" not in columns:
+                frame = frame.drop(columns=["kind"])
+        return frame.reset_index(drop=True)
+
+    def _archived_days(self, start, end):
+        if start is None or end is None:
+            days = [day for day in self._snapshot_days()
+                    if os.path.exists(os.path.join(self.day_dir(day), DAY_SUMMARY_FILE))]
+            if start is not None:
+                days = [day for day in days if day >= _as_date(start)]
+            if end is not None:
+                days = [day for day in days if day <= _as_date(end)]
+            return days
+        start, end = _as_date(start), _as_date(end)
+        return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+    def disk_usage(self):
+        """所有已归档日期的原始JSON与归档大小对比"""
+        usage = {"days": 0, "snapshots": 0, "json_bytes": 0, "archive_bytes": 0}
+        for day in self._snapshot_days():
+            path = os.path.join(self.day_dir(day), DAY_SUMMARY_FILE)
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                summary = json.load(f)
+            usage["days"] += 1
+            usage["snapshots"] += summary["snapshots"]
+            usage["json_bytes"] += summary["json_bytes"]
+            usage["archive_bytes"] += summary["archive_bytes"]
+        return usage
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="列式历史归档")
+    parser.add_argument("--data-dir", default="data", help="数据目录")
+    parser.add_argument("--format", default="parquet", choices=sorted(FORMATS), help="归档格式")
+    parser.add_argument("--compact", action="store_true", help="压缩今天以前所有未归档的日期")
+    parser.add_argument("--date", default=None, help="只压缩某天 (YYYY-MM-DD)，已归档的会重新生成")
+    args = parser.parse_args()
+
+    if not archive_available():
+        print("⏭️ 未安装 pyarrow，跳过归档 (pip install pyarrow)")
+        sys.exit(0)
+
+    archive = HistoryArchive(args.data_dir, file_format=args.format)
+    if args.date:
+        archive.compact_day(args.date)
+    elif args.compact:
+        archive.compact_pending()
+
+    usage = archive.disk_usage()
+    if usage["days"]:
+        ratio = usage["json_bytes"] / usage["archive_bytes"] if usage["archive_bytes"] else 0
+        print(f"💽 已归档 {usage['days']} 天 / {usage['snapshots']} 个快照: "
+              f"JSON {usage['json_bytes']/1024/1024:.2f}MB → 归档 {usage['archive_bytes']/1024/1024:.2f}MB "
+              f"({ratio:.1f}x)")
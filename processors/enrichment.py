@@ -0,0 +1,298 @@
+"""
+热点条目详情补全
+榜单只给出有限字段，这里按条目补充详情：GitHub仓库的topics、创建时间、许可证、主页，
+B站视频的标签、分区、发布时间和简介。
+详情按仓库全名 / bvid 缓存在数据目录，连续多天上榜的条目只在第一次请求。
+"""
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.http_client import get_default_client
+from utils.fast_json import decode_response
+from crawlers.json_schemas import BilibiliViewDetail, GithubRepo
+
+# 各类详情的缓存有效期（秒）
+DEFAULT_TTLS = {
+    "github": 7 * 86400,
+    "bilibili": 3 * 86400
+}
+
+# GraphQL一次查询的仓库数
+GITHUB_BATCH_SIZE = 50
+
+GITHUB_API_HEADERS = {
+    "Accept": "application/vnd.github+json"
+}
+
+GITHUB_GRAPHQL_FIELDS = """
+    nameWithOwner
+    createdAt
+    homepageUrl
+    licenseInfo { spdxId }
+    repositoryTopics(first: 20) { nodes { topic { name } } }
+"""
+
+
+class EnrichmentCache:
+    """按条目键（github:owner/repo、bilibili:BV号）缓存详情
+
+    Args:
+        state_file: 缓存文件
+        ttls: {类别: 有效期秒数}，覆盖DEFAULT_TTLS
+    """
+
+    def __init__(self, state_file="data/enrichment_cache.json", ttls=None):
+        self.state_file = state_file
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ 详情缓存文件损坏，已重置: {e}")
+            return {}
+
+    def _expired(self, kind, entry, now):
+        return entry["fetched_at"] + self.ttls.get(kind, 0) <= now
+
+    def get(self, kind, item_id):
+        """未过期时返回缓存的详情，否则None"""
+        with self._lock:
+            entry = self._entries.get(f"{kind}:{item_id}")
+        if entry is None or self._expired(kind, entry, time.time()):
+            return None
+        return entry["data"]
+
+    def put(self, kind, item_id, data):
+        with self._lock:
+            self._entries[f"{kind}:{item_id}"] = {"fetched_at": time.time(), "data": data}
+
+    def save(self):
+        """丢弃过期条目后原子写入"""
+        now = time.time()
+        with self._lock:
+            self._entries = {key: entry for key, entry in self._entries.items()
+                             if not self._expired(key.split(":", 1)[0], entry, now)}
+            directory = os.path.dirname(self.state_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.state_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.state_file)
+
+
+class Enricher:
+    """补全榜单条目的详情字段
+
+    GitHub有token时用GraphQL每次查询GITHUB_BATCH_SIZE个仓库，否则逐个调用REST接口
+    （未认证每小时60次）；B站没有批量详情接口，逐个bvid请求。
+    请求并发不超过max_workers，各主机的请求间隔仍由HttpClient限流器保证。
+
+    Args:
+        http_client: 共享的HttpClient
+        cache: EnrichmentCache实例
+        max_workers: 并发请求数上限
+        github_token: GitHub token，默认读取环境变量GITHUB_TOKEN
+    """
+
+    def __init__(self, http_client=None, cache=None, max_workers=4, github_token=None):
+        self.http = http_client or get_default_client()
+        self.cache = cache or EnrichmentCache()
+        self.max_workers = max_workers
+        self.github_token = github_token if github_token is not None else os.environ.get("GITHUB_TOKEN", "")
+        self._lock = threading.Lock()
+        # {类别: {cached, fetched, failed, requests}}
+        self._stats = {}
+
+    def _count(self, kind, key, amount=1):
+        with self._lock:
+            entry = self._stats.setdefault(kind, {"cached": 0, "fetched": 0, "failed": 0, "requests": 0})
+            entry[key] += amount
+
+    def _split_cached(self, kind, items, id_of):
+        """已缓存的条目直接补全，返回需要请求的 {条目ID: [条目]}"""
+        missing = {}
+        for item in items:
+            item_id = id_of(item)
+            if not item_id:
+                continue
+            details = self.cache.get(kind, item_id)
+            if details is not None:
+                item.update(details)
+                self._count(kind, "cached")
+            else:
+                missing.setdefault(item_id, []).append(item)
+        return missing
+
+    def _apply(self, kind, missing, fetched):
+        for item_id, items in missing.items():
+            details = fetched.get(item_id)
+            if details is None:
+                self._count(kind, "failed")
+                continue
+            self.cache.put(kind, item_id, details)
+            self._count(kind, "fetched")
+            for item in items:
+                item.update(details)
+
+    @staticmethod
+    def _map(executor, func, args):
+        """executor.map，每个调用带上当前上下文的副本（整体截止时间等contextvars在线程中同样生效）"""
+        contexts = [contextvars.copy_context() for _ in args]
+        return executor.map(lambda context, arg: context.run(func, arg), contexts, args)
+
+    # ---------- GitHub ----------
+
+    def enrich_github(self, repos):
+        """为仓库补充topics / created_at / license / homepage，原地修改并返回repos"""
+        missing = self._split_cached("github", repos, lambda repo: self._github_full_name(repo))
+        if not missing:
+            return repos
+
+        names = list(missing)
+        if self.github_token:
+            batches = [names[i:i + GITHUB_BATCH_SIZE] for i in range(0, len(names), GITHUB_BATCH_SIZE)]
+            fetch = self._fetch_github_batch
+        else:
+            batches = [[name] for name in names]
+            fetch = self._fetch_github_rest
+
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            for result in self._map(executor, fetch, batches):
+                fetched.update(result)
+        self._apply("github", missing, fetched)
+        return repos
+
+    @staticmethod
+    def _github_full_name(repo):
+        if repo.get("author") and repo.get("repo_name"):
+            return f"{repo['author']}/{repo['repo_name']}"
+        url = repo.get("url", "")
+        if url.startswith("https://github.com/"):
+            return url[len("https://github.com/"):].strip("/")
+        return ""
+
+    def _github_headers(self):
+        headers = dict(GITHUB_API_HEADERS)
+        if self.github_token:
+            headers["Authorization"] = f"Bearer {self.github_token}"
+        return headers
+
+    def _fetch_github_rest(self, names):
+        full_name = names[0]
+        url = f"https://api.github.com/repos/{full_name}"
+        self._count("github", "requests")
+        try:
+            response = self.http.get(url, platform="github", headers=self._github_headers(), timeout=10)
+            if response.status_code != 200:
+                print(f"⚠️ 仓库详情请求失败 {full_name}: {response.status_code}")
+                return {}
+            repo = decode_response(response, GithubRepo)
+            return {full_name: {
+                "topics": repo.topics,
+                "created_at": repo.created_at,
+                "license": repo.license.spdx_id if repo.license else None,
+                "homepage": repo.homepage or ""
+            }}
+        except Exception as e:
+            print(f"⚠️ 仓库详情获取失败 {full_name}: {e}")
+            return {}
+
+    def _fetch_github_batch(self, names):
+        """一次GraphQL查询多个仓库，每个仓库用别名r0, r1...区分"""
+        parts = []
+        for index, full_name in enumerate(names):
+            owner, _, name = full_name.partition("/")
+            parts.append(f"r{index}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) "
+                         f"{{{GITHUB_GRAPHQL_FIELDS}}}")
+        query = "query {\n" + "\n".join(parts) + "\n}"
+
+        self._count("github", "requests")
+        try:
+            response = self.http.post("https://api.github.com/graphql", platform="github",
+                                      headers=self._github_headers(), json={"query": query}, timeout=15)
+            if response.status_code != 200:
+                print(f"⚠️ GraphQL请求失败: {response.status_code}")
+                return {}
+            data = response.json().get("data") or {}
+        except Exception as e:
+            print(f"⚠️ GraphQL查询失败: {e}")
+            return {}
+
+        result = {}
+        for index, full_name in enumerate(names):
+            repo = data.get(f"r{index}")
+            if not repo:
+                continue
+            result[full_name] = {
+                "topics": [node["topic"]["name"] for node in repo["repositoryTopics"]["nodes"]],
+                "created_at": repo["createdAt"],
+                "license": (repo.get("licenseInfo") or {}).get("spdxId"),
+                "homepage": repo.get("homepageUrl") or ""
+            }
+        return result
+
+    # ---------- B站 ----------
+
+    def enrich_bilibili(self, videos):
+        """为视频补充tags / tname / pubdate / desc，原地修改并返回videos"""
+        missing = self._split_cached("bilibili", videos, lambda video: video.get("bvid"))
+        if not missing:
+            return videos
+
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as executor:
+            for result in self._map(executor, self._fetch_bilibili_detail, list(missing)):
+                fetched.update(result)
+        self._apply("bilibili", missing, fetched)
+        return videos
+
+    def _fetch_bilibili_detail(self, bvid):
+        url = "https://api.bilibili.com/x/web-interface/view/detail"
+        self._count("bilibili", "requests")
+        try:
+            response = self.http.get(url, platform="bilibili", params={"bvid": bvid}, timeout=10)
+            if response.status_code != 200:
+                print(f"⚠️ 视频详情请求失败 {bvid}: {response.status_code}")
+                return {}
+            data = decode_response(response, BilibiliViewDetail)
+            if data.code != 0 or data.data is None or data.data.View is None:
+                print(f"⚠️ 视频详情返回错误 {bvid}: {data.message or '未知错误'}")
+                return {}
+            view = data.data.View
+            return {bvid: {
+                "tags": [tag.tag_name for tag in data.data.Tags],
+                "tname": view.tname,
+                "pubdate": view.pubdate,
+                "desc": view.desc
+            }}
+        except Exception as e:
+            print(f"⚠️ 视频详情获取失败 {bvid}: {e}")
+            return {}
+
+    def stats(self):
+        """{类别: {cached, fetched, failed, requests}}"""
+        with self._lock:
+            return {kind: dict(entry) for kind, entry in self._stats.items()}
+
+    def print_stats(self):
+        for kind, entry in self.stats().items():
+            print(f"🧩 {kind} 详情: 缓存命中 {entry['cached']} | 新获取 {entry['fetched']} | "
+                  f"失败 {entry['failed']} | 请求 {entry['requests']} 次")
+
+    def save(self):
+        self.cache.save()
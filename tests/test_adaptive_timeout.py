@@ -0,0 +1,23 @@
+"""自适应超时: 样本不足时沿用爬虫的timeout，没有传timeout时使用有限的兜底值"""
+from utils.adaptive_timeout import AdaptiveTimeouts
+
+KEY = "api.bilibili.com/x/web-interface/ranking/v2"
+
+
+def test_too_few_samples_keeps_caller_timeout(tmp_path):
+    timeouts = AdaptiveTimeouts(str(tmp_path / "latency.json"))
+    assert timeouts.timeout_for(KEY, 10) == 10
+
+
+def test_too_few_samples_without_timeout_uses_fallback(tmp_path):
+    timeouts = AdaptiveTimeouts(str(tmp_path / "latency.json"), fallback=(2.0, 6.0))
+    timeouts.record(KEY, 0.2)
+    assert timeouts.timeout_for(KEY) == (2.0, 6.0)
+    assert timeouts.stats()[KEY]["timeout"] == (2.0, 6.0)
+
+
+def test_enough_samples_use_history(tmp_path):
+    timeouts = AdaptiveTimeouts(str(tmp_path / "latency.json"), min_samples=3)
+    for seconds in (0.5, 0.6, 2.0):
+        timeouts.record(KEY, seconds)
+    assert timeouts.timeout_for(KEY) == (1.8, 3.0)
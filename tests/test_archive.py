@@ -0,0 +1,116 @@
+"""列式归档: 类型化的列往返读写、跳过已归档日期、增量存储的快照"""
+import json
+import os
+from datetime import date
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from processors.archive import DAY_SUMMARY_FILE, HistoryArchive
+from utils.delta_store import DeltaStore
+from utils.snapshot_index import SnapshotIndex
+
+
+def make_payload(hour, views):
+    return {
+        "timestamp": f"2026-10-01T{hour:02d}:00:00",
+        "data": {
+            "bilibili": {"videos": [{"title": f"视频{n}", "bvid": f"BV{n}", "view": view, "rank": n + 1}
+                                    for n, view in enumerate(views)]}
+        },
+        "summary": {"total_items": len(views)}
+    }
+
+
+def test_delta_snapshots_are_archived_from_manifest(tmp_path):
+    data_dir = str(tmp_path)
+    deltas = DeltaStore(os.path.join(data_dir, "deltas"), fsync=False)
+    index = SnapshotIndex(data_dir)
+    for hour, views in ((8, [100, 50]), (9, [120, 60])):
+        payload = make_payload(hour, views)
+        _, size, reference = deltas.append(payload)
+        index.record(os.path.join(deltas.root, reference), payload, bytes_written=size)
+
+    # 当天目录里只有LATEST指针
+    assert os.listdir(index.day_dir(date(2026, 10, 1))) == ["LATEST"]
+    archive = HistoryArchive(data_dir)
+    summary = archive.compact_day("2026-10-01")
+    assert summary["snapshots"] == 2
+    assert summary["json_bytes"] > 0
+    frame = archive.load("bilibili")
+    assert list(frame["view"]) == [100, 50, 120, 60]
+
+
+def test_day_without_snapshots_is_not_marked_archived(tmp_path):
+    index = SnapshotIndex(str(tmp_path))
+    os.makedirs(index.day_dir(date(2026, 10, 1)))
+    archive = HistoryArchive(str(tmp_path))
+    assert archive.compact_pending(before=date(2026, 10, 2)) == []
+    assert not os.path.exists(os.path.join(archive.day_dir(date(2026, 10, 1)), DAY_SUMMARY_FILE))
+
+
+def save_snapshot(index, timestamp, data):
+    payload = {"timestamp": timestamp, "data": data}
+    path = index.path_for(timestamp)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    index.record(path, payload)
+    return path
+
+
+def github_repos(stars_today):
+    return {"repos": [
+        {"title": "a/one", "url": "https://github.com/a/one", "language": "Python", "stars": 1200,
+         "forks": 30, "stars_today": stars_today},
+        {"title": "b/two", "url": "https://github.com/b/two", "language": None, "stars": "n/a", "forks": 2}
+    ]}
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_round_trip_keeps_column_types(tmp_path, file_format):
+    index = SnapshotIndex(str(tmp_path))
+    save_snapshot(index, "2026-10-01T08:00:00", {"github": github_repos("15"), **make_payload(8, [100])["data"]})
+    save_snapshot(index, "2026-10-01T20:00:00", {"github": github_repos(40)})
+    archive = HistoryArchive(str(tmp_path), file_format=file_format)
+    summary = archive.compact_day(date(2026, 10, 1))
+    assert summary["platforms"]["github"]["rows"] == 4
+    assert summary["platforms"]["bilibili"]["rows"] == 1
+
+    frame = archive.load("github")
+    assert str(frame["rank"].dtype) == "Int32"
+    assert str(frame["stars"].dtype) == "Int64"
+    assert str(frame["language"].dtype) == "category"
+    assert str(frame["title"].dtype) == "string"
+    assert str(frame["captured_at"].dtype).startswith("datetime64")
+    assert list(frame["rank"]) == [1, 2, 1, 2]
+    assert list(frame["stars_today"].fillna(-1)) == [15, -1, 40, -1]
+    # 无法转换为数字的值记为缺失，不影响整列类型
+    assert frame["stars"].isna().tolist() == [False, True, False, True]
+    assert list(frame["captured_at"].dt.hour) == [8, 8, 20, 20]
+
+    subset = archive.load("github", start="2026-10-01", end="2026-10-01", columns=["title", "stars"])
+    assert list(subset.columns) == ["title", "stars"]
+    videos = archive.load("bilibili", columns=["view"], kind="videos")
+    assert list(videos.columns) == ["view"] and list(videos["view"]) == [100]
+    assert archive.load("github", kind="missing").empty
+
+
+def test_archived_days_are_skipped(tmp_path):
+    index = SnapshotIndex(str(tmp_path))
+    save_snapshot(index, "2026-10-01T08:00:00", make_payload(8, [100])["data"])
+    save_snapshot(index, "2026-10-02T08:00:00", make_payload(8, [200])["data"])
+    save_snapshot(index, "2026-10-03T08:00:00", make_payload(8, [300])["data"])
+    archive = HistoryArchive(str(tmp_path))
+
+    # before当天及以后的日期还在采集，不归档
+    assert [s["date"] for s in archive.compact_pending(before=date(2026, 10, 3))] == ["2026-10-01", "2026-10-02"]
+    archived = archive.path_for(date(2026, 10, 1), "bilibili")
+    os.utime(archived, ns=(0, 0))
+
+    assert archive.compact_pending(before=date(2026, 10, 3)) == []
+    assert os.stat(archived).st_mtime_ns == 0
+    assert [s["date"] for s in archive.compact_pending(before=date(2026, 10, 4))] == ["2026-10-03"]
+    assert archive.disk_usage()["days"] == 3
+    assert list(archive.load("bilibili")["view"]) == [100, 200, 300]
@@ -0,0 +1,65 @@
+"""并发引擎: 截止时间传到接口线程，超时后排队的接口不再执行"""
+import asyncio
+import threading
+import time
+
+from utils.async_engine import gather_endpoints
+from utils.deadline import deadline_scope, remaining_time
+
+
+def test_timeout_bounds_endpoint_threads():
+    finished = threading.Event()
+    seen = []
+
+    def slow():
+        # 模拟受截止时间约束的请求: 预算用完就退出
+        seen.append(remaining_time())
+        while remaining_time() > 0:
+            time.sleep(0.01)
+        finished.set()
+
+    results, report = asyncio.run(gather_endpoints({"slow": {"list": slow}, "fast": {"list": lambda: 1}},
+                                                   timeout=0.2))
+    assert results == {"slow": {"list": None}, "fast": {"list": 1}}
+    assert report["slow"]["timed_out"] == ["list"]
+    assert seen and 0 < seen[0] <= 0.2
+    assert finished.wait(1)
+
+
+def test_queued_endpoints_cancelled_after_timeout():
+    calls = []
+
+    def slow():
+        calls.append("slow")
+        while remaining_time() > 0:
+            time.sleep(0.01)
+
+    results, report = asyncio.run(gather_endpoints({"a": {"slow": slow}, "b": {"queued": lambda: calls.append("queued")}},
+                                                   max_workers=1, timeout=0.1))
+    time.sleep(0.3)
+    assert calls == ["slow"]
+    assert report["b"]["timed_out"] == ["queued"]
+
+
+def test_nested_scope_keeps_outer_deadline():
+    with deadline_scope(0.5):
+        with deadline_scope(60):
+            assert remaining_time() <= 0.5
+
+
+def test_endpoint_that_swallows_deadline_is_reported_timed_out():
+    def crawler():
+        # 爬虫捕获了截短后的超时，返回空结果
+        while remaining_time() > 0:
+            time.sleep(0.01)
+        return []
+
+    async def collect():
+        # 外层预算更紧，接口线程在asyncio.wait超时之前就已结束
+        with deadline_scope(0.1):
+            return await gather_endpoints({"slow": {"list": crawler}, "fast": {"list": lambda: [1]}}, timeout=5)
+
+    results, report = asyncio.run(collect())
+    assert results == {"slow": {"list": []}, "fast": {"list": [1]}}
+    assert report["slow"]["timed_out"] == ["list"]
+    assert report["fast"]["timed_out"] == []
@@ -0,0 +1,104 @@
+"""正文读取上限: Content-Length超限不读正文、读取中超限即中止、Content-Type不符、提前停止的统计"""
+import io
+
+import pytest
+import requests
+
+from utils.body_reader import BodyReader, BodyRejected
+
+API = "https://api.example.com/data"
+PAGE = "https://www.example.com/page"
+RULES = [
+    ("https://api.example.com/", 100, ("application/json",)),
+    ("https://www.example.com/", 1000, None)
+]
+
+
+def make_response(body, content_type="application/json", content_length=True, status=200, url=API):
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.raw = io.BytesIO(body)
+    response.headers["Content-Type"] = content_type
+    if content_length:
+        response.headers["Content-Length"] = str(len(body))
+    return response
+
+
+def make_reader():
+    return BodyReader(rules=RULES, default_max_bytes=50, chunk_size=16)
+
+
+def test_body_within_limit_is_read():
+    reader = make_reader()
+    response = make_response(b'{"code":0}')
+    reader.read(response, API)
+    assert response.json() == {"code": 0}
+    assert response.body_stats["aborted"] is None
+    assert response.body_stats["bytes"] == 10
+    assert reader.stats()["api.example.com"]["requests"] == 1
+
+
+def test_declared_length_over_limit_rejected_before_reading():
+    reader = make_reader()
+    response = make_response(b"x" * 101)
+    with pytest.raises(BodyRejected):
+        reader.read(response, API)
+    assert response.body_stats["aborted"] == "too_large"
+    assert response.body_stats["bytes"] == 0
+    assert response.body_stats["saved_bytes"] == 101
+    assert response.raw.closed
+
+
+def test_undeclared_length_aborts_once_limit_is_passed():
+    reader = make_reader()
+    response = make_response(b"x" * 1000, content_length=False)
+    with pytest.raises(BodyRejected):
+        reader.read(response, API)
+    stats = response.body_stats
+    assert stats["aborted"] == "too_large"
+    # 超过上限的那一块读完就停，不会读完整个正文
+    assert 100 < stats["bytes"] <= 100 + reader.chunk_size
+    assert reader.stats()["api.example.com"]["aborted"] == 1
+
+
+def test_wrong_content_type_rejected_only_for_200():
+    reader = make_reader()
+    with pytest.raises(BodyRejected):
+        reader.read(make_response(b"<html>captcha</html>", content_type="text/html; charset=utf-8"), API)
+    assert reader.recent()[-1]["aborted"] == "content_type"
+
+    error_page = make_response(b"<html>busy</html>", content_type="text/html", status=503)
+    reader.read(error_page, API)
+    assert error_page.content == b"<html>busy</html>"
+
+
+def test_rule_matched_by_request_url_after_redirect():
+    reader = make_reader()
+    response = make_response(b"<html></html>", content_type="text/html", url="https://captcha.example.com/")
+    with pytest.raises(BodyRejected):
+        reader.read(response, API)
+
+
+def test_unmatched_url_uses_default_limit_without_type_check():
+    reader = make_reader()
+    assert reader.rule_for("https://other.example.com/") == (50, None)
+    assert reader.rule_for(PAGE) == (1000, None)
+    response = make_response(b"y" * 51, content_type="image/png", url="https://other.example.com/")
+    with pytest.raises(BodyRejected):
+        reader.read(response, "https://other.example.com/")
+
+
+def test_stopping_iteration_early_is_recorded():
+    reader = make_reader()
+    response = make_response(b"z" * 500, content_type="text/html", url=PAGE)
+    reader.begin(response, PAGE)
+    body = reader.iter_body(response)
+    first = next(body)
+    body.close()
+
+    stats = response.body_stats
+    assert len(first) == reader.chunk_size
+    assert stats["aborted"] == "stopped"
+    assert stats["peak_buffer"] == reader.chunk_size
+    assert stats["saved_bytes"] == 500 - stats["wire_bytes"] > 0
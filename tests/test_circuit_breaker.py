@@ -0,0 +1,130 @@
+"""熔断器: 连续失败打开、冷却后半开探测、探测名额不会泄漏"""
+import time
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from utils.deadline import DeadlineExceeded, deadline_scope
+from utils.http_client import HttpClient
+
+KEY = "api.example.com/x"
+URL = "https://api.example.com/x"
+
+
+def make_breaker(tmp_path, **kwargs):
+    kwargs.setdefault("failure_threshold", 2)
+    kwargs.setdefault("cooldown", 60)
+    return CircuitBreaker(str(tmp_path / "circuit.json"), **kwargs)
+
+
+def expire_cooldown(breaker, key=KEY):
+    breaker._states[key]["opened_at"] = time.time() - breaker._states[key]["cooldown"] - 1
+
+
+def test_opens_after_threshold_and_skips(tmp_path):
+    breaker = make_breaker(tmp_path)
+    breaker.record_failure(KEY, "HTTP 500")
+    breaker.before_request(KEY)
+    breaker.record_failure(KEY, "HTTP 500")
+    assert breaker._states[KEY]["state"] == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(KEY)
+    assert breaker.stats()[KEY]["skipped"] == 1
+
+
+def test_state_persists(tmp_path):
+    breaker = make_breaker(tmp_path)
+    breaker.record_failure(KEY)
+    breaker.record_failure(KEY)
+    with pytest.raises(CircuitOpenError):
+        make_breaker(tmp_path).before_request(KEY)
+
+
+def test_half_open_allows_single_probe(tmp_path):
+    breaker = make_breaker(tmp_path)
+    breaker.record_failure(KEY)
+    breaker.record_failure(KEY)
+    expire_cooldown(breaker)
+    breaker.before_request(KEY)
+    assert breaker._states[KEY]["state"] == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(KEY)
+
+    breaker.record_success(KEY)
+    assert breaker._states[KEY]["state"] == CLOSED
+    breaker.before_request(KEY)
+
+
+def test_failed_probe_doubles_cooldown(tmp_path):
+    breaker = make_breaker(tmp_path)
+    breaker.record_failure(KEY)
+    breaker.record_failure(KEY)
+    expire_cooldown(breaker)
+    breaker.before_request(KEY)
+    breaker.record_failure(KEY, "HTTP 503")
+    assert breaker._states[KEY]["state"] == OPEN
+    assert breaker._states[KEY]["cooldown"] == 120
+
+
+def test_released_probe_can_be_retried(tmp_path):
+    breaker = make_breaker(tmp_path)
+    breaker.record_failure(KEY)
+    breaker.record_failure(KEY)
+    expire_cooldown(breaker)
+    breaker.before_request(KEY)
+    breaker.release_probe(KEY)
+    breaker.before_request(KEY)
+
+
+class StubAdapter(BaseAdapter):
+    def __init__(self, status=200):
+        super().__init__()
+        self.status = status
+        self.calls = 0
+
+    def send(self, request, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = self.status
+        response.url = request.url
+        response.request = request
+        response._content = b"{}"
+        response.headers["Content-Type"] = "application/json"
+        return response
+
+    def close(self):
+        pass
+
+
+def make_client(tmp_path, adapter):
+    breaker = make_breaker(tmp_path)
+    client = HttpClient(circuit_breaker=breaker, rate_limiter=False, body_reader=False)
+    client.session.mount("https://", adapter)
+    return client, breaker
+
+
+def test_probe_released_when_deadline_exhausted(tmp_path):
+    adapter = StubAdapter()
+    client, breaker = make_client(tmp_path, adapter)
+    breaker.record_failure(KEY)
+    breaker.record_failure(KEY)
+    expire_cooldown(breaker)
+
+    with deadline_scope(0):
+        with pytest.raises(DeadlineExceeded):
+            client.get(URL)
+    assert adapter.calls == 0
+
+    # 探测名额已释放，下一次请求照常探测并恢复
+    assert client.get(URL).status_code == 200
+    assert breaker._states[KEY]["state"] == CLOSED
+
+
+def test_client_records_failure_status(tmp_path):
+    client, breaker = make_client(tmp_path, StubAdapter(status=503))
+    client.get(URL)
+    client.get(URL)
+    with pytest.raises(CircuitOpenError):
+        client.get(URL)
@@ -0,0 +1,149 @@
+"""增量存储: 差异与应用互逆，任意时刻的快照可以重建"""
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+from utils.delta_store import (DeltaStore, apply_board, apply_dict_diff, diff_board, diff_dict,
+                               join_boards, load_snapshot, split_boards)
+
+
+def make_snapshots(count=30, seed=1):
+    rng = random.Random(seed)
+    pool = [{"bvid": f"BV{i:04d}", "title": f"视频{i}", "stat": {"view": rng.randint(1, 10 ** 6)},
+             "owner": {"name": f"up{i % 7}"}} for i in range(60)]
+    order = rng.sample(range(60), 20)
+    start = datetime(2026, 10, 1, 8, 0)
+    snapshots = []
+    for n in range(count):
+        # 上榜、下榜、名次变化、指标变化
+        order[rng.randrange(20)] = rng.choice([i for i in range(60) if i not in order])
+        i, j = rng.randrange(20), rng.randrange(20)
+        order[i], order[j] = order[j], order[i]
+        for k in rng.sample(order, 5):
+            pool[k]["stat"]["view"] += rng.randint(1, 100)
+        if n == 10:
+            del pool[order[0]]["owner"]
+        data = {
+            "bilibili": {"videos": [dict(json.loads(json.dumps(pool[v])), rank=r + 1) for r, v in enumerate(order)]},
+            "weibo": {"hot_search": [{"title": "同名"}, {"title": "同名"}, {"title": f"x{n % 3}"}]},
+            "github": {} if n == 12 else {"repos": [{"url": "https://github.com/a/b", "stars": n}]}
+        }
+        snapshots.append({"timestamp": (start + timedelta(minutes=15 * n)).isoformat(), "data": data,
+                          "summary": {"total_items": 24, "n": n}})
+    return snapshots
+
+
+def test_diff_dict_round_trip():
+    cases = [
+        ({"a": 1, "b": {"c": 2}}, {"a": 1, "b": {"c": 3, "d": [1]}}),
+        ({"owner": {"name": "x"}}, {}),
+        ({"a": 1}, {"a": {"b": 2}}),
+        ({"a": {"b": 2}}, {"a": 1}),
+        ({"a": {"b": 1}}, {"a": {}}),
+        ({}, {"a": 1}),
+    ]
+    for old, new in cases:
+        changes = diff_dict(old, new)
+        assert apply_dict_diff(json.loads(json.dumps(old)), changes or {}) == new
+
+
+def test_diff_board_round_trip():
+    rng = random.Random(3)
+    for _ in range(200):
+        old = [{"bvid": f"BV{i}", "v": rng.randint(0, 3)} for i in rng.sample(range(15), rng.randint(0, 10))]
+        new = [{"bvid": f"BV{i}", "v": rng.randint(0, 3)} for i in rng.sample(range(15), rng.randint(0, 10))]
+        delta = diff_board(old, new)
+        assert apply_board(json.loads(json.dumps(old)), delta or {}) == new
+        assert (delta is None) == (old == new)
+
+
+def test_split_join_round_trip():
+    for snapshot in make_snapshots(15):
+        assert join_boards(*split_boards(snapshot)) == snapshot
+
+
+def test_rebuild_every_snapshot(tmp_path):
+    snapshots = make_snapshots()
+    store = DeltaStore(str(tmp_path), keyframe_interval=8, fsync=False)
+    kinds = [store.append(snapshot)[0] for snapshot in snapshots]
+    assert kinds.count("keyframe") == 4
+
+    fresh = DeltaStore(str(tmp_path))
+    for snapshot in snapshots:
+        assert fresh.rebuild(snapshot["timestamp"]) == snapshot
+    assert fresh.rebuild() == snapshots[-1]
+    assert fresh.rebuild("2026-10-01T07:00:00") is None
+
+
+def test_load_snapshot_reference(tmp_path):
+    snapshots = make_snapshots(5)
+    store = DeltaStore(str(tmp_path), fsync=False)
+    references = [store.append(snapshot)[2] for snapshot in snapshots]
+    assert load_snapshot(os.path.join(str(tmp_path), references[2])) == snapshots[2]
+
+
+def test_torn_tail_is_truncated_before_append(tmp_path):
+    snapshots = make_snapshots(6)
+    store = DeltaStore(str(tmp_path), fsync=False)
+    for snapshot in snapshots[:4]:
+        store.append(snapshot)
+    segment = os.path.join(str(tmp_path), store.segments()[-1])
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write('{"type":"delta","t":"2026-10-01T09:')
+
+    # 新进程续写
+    store = DeltaStore(str(tmp_path), fsync=False)
+    for snapshot in snapshots[4:]:
+        store.append(snapshot)
+
+    fresh = DeltaStore(str(tmp_path))
+    for snapshot in snapshots:
+        assert fresh.rebuild(snapshot["timestamp"]) == snapshot
+
+
+def test_torn_keyframe_starts_new_segment(tmp_path):
+    snapshots = make_snapshots(3)
+    os.makedirs(str(tmp_path), exist_ok=True)
+    with open(os.path.join(str(tmp_path), "20261001_070000.ndjson"), "w", encoding="utf-8") as f:
+        f.write('{"type":"keyframe","t":"2026-10-01T07:00:00","boa')
+
+    store = DeltaStore(str(tmp_path), fsync=False)
+    assert store.append(snapshots[0])[0] == "keyframe"
+    store.append(snapshots[1])
+    assert store.segments() == ["20261001_080000.ndjson"]
+    assert DeltaStore(str(tmp_path)).rebuild() == snapshots[1]
+
+
+def test_delta_lines_do_not_depend_on_hash_seed(tmp_path):
+    import subprocess
+    import sys
+
+    script = (
+        "import sys, json; sys.path.insert(0, sys.argv[2]); sys.path.insert(0, sys.argv[3])\n"
+        "from test_delta_store import make_snapshots\n"
+        "from utils.delta_store import DeltaStore\n"
+        "store = DeltaStore(sys.argv[1], fsync=False)\n"
+        "for n, snapshot in enumerate(make_snapshots(8)):\n"
+        "    snapshot['data']['extra%d' % (n % 3)] = {'items': [{'title': str(n)}]}\n"
+        "    store.append(snapshot)\n"
+    )
+    tests_dir = os.path.dirname(os.path.abspath(__file__))
+    outputs = []
+    for seed in ("1", "2", "3"):
+        root = tmp_path / seed
+        subprocess.run([sys.executable, "-c", script, str(root), tests_dir, os.path.dirname(tests_dir)],
+                       check=True, env={**os.environ, "PYTHONHASHSEED": seed})
+        outputs.append([(root / name).read_bytes() for name in sorted(os.listdir(root))])
+    assert outputs[0] == outputs[1] == outputs[2]
+
+
+def test_rebuilt_board_order_matches_head(tmp_path):
+    store = DeltaStore(str(tmp_path), fsync=False)
+    for n, snapshot in enumerate(make_snapshots(3)):
+        if n:
+            # 新出现的平台排在最前面
+            snapshot["data"] = {"zhihu": {"hot": [{"title": "x"}]}, **snapshot["data"]}
+        store.append(snapshot)
+    reopened = DeltaStore(str(tmp_path), fsync=False)
+    assert list(reopened._load_head()[2]) == list(store._head[2])
@@ -0,0 +1,143 @@
+"""详情补全: 缓存命中/未命中、有效期、GraphQL批量解析、无token时走REST"""
+import json
+
+import requests
+
+from processors.enrichment import Enricher, EnrichmentCache
+
+
+def make_response(payload, status=200):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(payload).encode("utf-8")
+    return response
+
+
+class StubClient:
+    """按URL返回预设响应，记录每次请求"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(("GET", url, kwargs))
+        return self.handler("GET", url, kwargs)
+
+    def post(self, url, **kwargs):
+        self.calls.append(("POST", url, kwargs))
+        return self.handler("POST", url, kwargs)
+
+
+def rest_repo(method, url, kwargs):
+    full_name = url[len("https://api.github.com/repos/"):]
+    if full_name == "gone/repo":
+        return make_response({"message": "Not Found"}, status=404)
+    return make_response({"full_name": full_name, "topics": ["cli"], "created_at": "2020-01-01T00:00:00Z",
+                          "homepage": None, "license": {"spdx_id": "MIT"}})
+
+
+def graphql_node(name, topics, license_id):
+    return {"nameWithOwner": name, "createdAt": "2021-06-01T00:00:00Z", "homepageUrl": None,
+            "licenseInfo": {"spdxId": license_id} if license_id else None,
+            "repositoryTopics": {"nodes": [{"topic": {"name": topic}} for topic in topics]}}
+
+
+def test_cache_miss_fetches_then_hit_skips_request(tmp_path):
+    cache = EnrichmentCache(str(tmp_path / "cache.json"))
+    client = StubClient(rest_repo)
+    enricher = Enricher(http_client=client, cache=cache, github_token="")
+
+    repos = [{"author": "a", "repo_name": "one"}, {"url": "https://github.com/a/one"}]
+    enricher.enrich_github(repos)
+    assert len(client.calls) == 1
+    assert repos[0]["topics"] == repos[1]["topics"] == ["cli"]
+    assert repos[0]["license"] == "MIT"
+    assert repos[0]["homepage"] == ""
+
+    enricher.enrich_github([{"author": "a", "repo_name": "one"}])
+    assert len(client.calls) == 1
+    assert enricher.stats()["github"] == {"cached": 1, "fetched": 1, "failed": 0, "requests": 1}
+
+
+def test_rest_fallback_without_token(tmp_path):
+    client = StubClient(rest_repo)
+    enricher = Enricher(http_client=client, cache=EnrichmentCache(str(tmp_path / "cache.json")),
+                        github_token="")
+    repos = [{"author": "a", "repo_name": "one"}, {"author": "gone", "repo_name": "repo"}]
+    enricher.enrich_github(repos)
+
+    assert sorted(url for _, url, _ in client.calls) == [
+        "https://api.github.com/repos/a/one", "https://api.github.com/repos/gone/repo"]
+    assert all(method == "GET" and "Authorization" not in kwargs["headers"] for method, _, kwargs in client.calls)
+    assert repos[0]["created_at"] == "2020-01-01T00:00:00Z"
+    assert "topics" not in repos[1]
+    assert enricher.stats()["github"]["failed"] == 1
+
+
+def test_graphql_batch_parsing(tmp_path):
+    def handler(method, url, kwargs):
+        assert method == "POST" and url == "https://api.github.com/graphql"
+        assert kwargs["headers"]["Authorization"] == "Bearer token"
+        assert 'r0: repository(owner: "a", name: "one")' in kwargs["json"]["query"]
+        return make_response({"data": {
+            "r0": graphql_node("a/one", ["rust", "cli"], "Apache-2.0"),
+            "r1": None,
+            "r2": graphql_node("c/three", [], None)
+        }})
+
+    client = StubClient(handler)
+    enricher = Enricher(http_client=client, cache=EnrichmentCache(str(tmp_path / "cache.json")),
+                        github_token="token")
+    repos = [{"author": "a", "repo_name": "one"}, {"author": "b", "repo_name": "two"},
+             {"author": "c", "repo_name": "three"}]
+    enricher.enrich_github(repos)
+
+    assert len(client.calls) == 1
+    assert repos[0] == {"author": "a", "repo_name": "one", "topics": ["rust", "cli"],
+                        "created_at": "2021-06-01T00:00:00Z", "license": "Apache-2.0", "homepage": ""}
+    assert "topics" not in repos[1]
+    assert repos[2]["license"] is None and repos[2]["topics"] == []
+    assert enricher.stats()["github"] == {"cached": 0, "fetched": 2, "failed": 1, "requests": 1}
+
+
+def test_expired_entries_are_refetched_and_dropped_on_save(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr("processors.enrichment.time.time", lambda: now[0])
+    state_file = str(tmp_path / "cache.json")
+    cache = EnrichmentCache(state_file, ttls={"github": 60})
+    cache.put("github", "a/one", {"topics": ["old"]})
+    cache.put("bilibili", "BV1", {"tags": ["keep"]})
+    assert cache.get("github", "a/one") == {"topics": ["old"]}
+
+    now[0] += 60
+    assert cache.get("github", "a/one") is None
+    assert cache.get("bilibili", "BV1") == {"tags": ["keep"]}
+    cache.save()
+    with open(state_file, encoding="utf-8") as f:
+        assert list(json.load(f)) == ["bilibili:BV1"]
+
+    client = StubClient(rest_repo)
+    enricher = Enricher(http_client=client, cache=EnrichmentCache(state_file, ttls={"github": 60}),
+                        github_token="")
+    repos = [{"author": "a", "repo_name": "one"}]
+    enricher.enrich_github(repos)
+    assert len(client.calls) == 1
+    assert repos[0]["topics"] == ["cli"]
+
+
+def test_bilibili_detail_error_code_not_cached(tmp_path):
+    def handler(method, url, kwargs):
+        if kwargs["params"]["bvid"] == "BV1":
+            return make_response({"code": 0, "data": {"View": {"bvid": "BV1", "tname": "科技", "pubdate": 1,
+                                                               "desc": "简介"}, "Tags": [{"tag_name": "AI"}]}})
+        return make_response({"code": -404, "message": "啥都木有"})
+
+    cache = EnrichmentCache(str(tmp_path / "cache.json"))
+    enricher = Enricher(http_client=StubClient(handler), cache=cache)
+    videos = [{"bvid": "BV1"}, {"bvid": "BV2"}]
+    enricher.enrich_bilibili(videos)
+
+    assert videos[0] == {"bvid": "BV1", "tags": ["AI"], "tname": "科技", "pubdate": 1, "desc": "简介"}
+    assert videos[1] == {"bvid": "BV2"}
+    assert cache.get("bilibili", "BV2") is None
@@ -0,0 +1,199 @@
+"""fast_json各后端对同一输入的解码结果必须一致，覆盖json_schemas中每个接口的响应结构"""
+import json
+from typing import List, Optional
+
+import pytest
+
+from crawlers import json_schemas
+from crawlers.json_schemas import BilibiliRanking, BilibiliViewDetail, BilibiliHotSearch
+from utils.fast_json import Schema, SchemaError, available_backends, decode, to_builtins
+
+BACKENDS = available_backends()
+
+
+class Inner(Schema):
+    count: int = 0
+
+
+class Record(Schema):
+    flag: bool = False
+    number: int = 0
+    ratio: float = 0.0
+    name: str = ""
+    inner: Inner = Inner()
+    maybe: Optional[Inner] = None
+    items: List[Inner] = []
+
+
+class Required(Schema):
+    number: int
+
+
+def decode_all(payload, schema):
+    data = json.dumps(payload).encode("utf-8")
+    results = {}
+    for backend in BACKENDS:
+        try:
+            results[backend] = to_builtins(decode(data, schema, backend))
+        except SchemaError:
+            results[backend] = SchemaError
+    return results
+
+
+def assert_same(payload, schema):
+    results = decode_all(payload, schema)
+    values = list(results.values())
+    assert all(value == values[0] for value in values), results
+    return values[0]
+
+
+@pytest.mark.parametrize("payload, expected", [
+    ({"number": "123"}, 123),
+    ({"number": 5.0}, 5),
+    ({"number": 7}, 7),
+    ({"number": None}, 0),
+    ({}, 0),
+])
+def test_int_conversion_agrees(payload, expected):
+    assert assert_same(payload, Record)["number"] == expected
+
+
+@pytest.mark.parametrize("payload", [
+    {"flag": 1},
+    {"flag": "true"},
+    {"number": "1e3"},
+    {"number": 1.5},
+    {"number": True},
+    {"ratio": False},
+    {"name": 3},
+    {"items": {}},
+])
+def test_invalid_values_rejected_by_every_backend(payload):
+    assert set(decode_all(payload, Record).values()) == {SchemaError}
+
+
+def test_float_accepts_numbers_and_numeric_strings():
+    assert assert_same({"ratio": "2.5"}, Record)["ratio"] == 2.5
+    assert assert_same({"ratio": 2}, Record)["ratio"] == 2.0
+
+
+def test_null_and_missing_fields_take_defaults():
+    result = assert_same({"inner": None, "items": None, "flag": None, "maybe": None}, Record)
+    assert result == {"flag": False, "number": 0, "ratio": 0.0, "name": "", "inner": {"count": 0},
+                      "maybe": None, "items": []}
+
+
+def test_defaults_are_not_shared_between_records():
+    for backend in BACKENDS:
+        first = decode(b"{}", Record, backend)
+        second = decode(b"{}", Record, backend)
+        first.items.append(Inner(count=1))
+        assert second.items == []
+        assert first.inner is not second.inner
+
+
+def test_required_field_missing_or_null():
+    assert set(decode_all({}, Required).values()) == {SchemaError}
+    assert set(decode_all({"number": None}, Required).values()) == {SchemaError}
+
+
+def test_malformed_json():
+    for backend in BACKENDS:
+        with pytest.raises(SchemaError):
+            decode(b"{not json", Record, backend)
+
+
+def test_one_incomplete_video_keeps_the_list():
+    payload = {"code": 0, "data": {"list": [
+        {"bvid": "BV1", "title": "完整", "owner": {"name": "up"}, "stat": {"view": "10"}},
+        {"bvid": "BV2", "title": "缺owner"},
+        {"bvid": "BV3", "owner": None, "stat": None},
+    ]}}
+    result = assert_same(payload, BilibiliRanking)
+    videos = result["data"]["list"]
+    assert [video["bvid"] for video in videos] == ["BV1", "BV2", "BV3"]
+    assert videos[0]["stat"]["view"] == 10
+    assert videos[1]["owner"] == {"name": ""}
+    assert videos[2]["stat"]["view"] == 0
+
+
+def test_null_tags_and_heat():
+    detail = assert_same({"code": 0, "data": {"View": {"bvid": "BV1"}, "Tags": None}}, BilibiliViewDetail)
+    assert detail["data"]["Tags"] == []
+    hot = assert_same({"code": 0, "data": {"list": [{"keyword": "k", "heat": None}]}}, BilibiliHotSearch)
+    assert hot["data"]["list"][0]["heat"] == 0
+
+
+# 各接口的典型响应（含接口实际会出现的多余字段、数字字符串和null）
+API_PAYLOADS = {
+    "BilibiliRanking": {"code": 0, "message": "0", "ttl": 1, "data": {"note": "", "list": [
+        {"aid": 1, "bvid": "BV1xx", "title": "标题", "duration": "245", "pic": "http://i0/x.jpg",
+         "owner": {"mid": 7, "name": "UP主", "face": ""},
+         "stat": {"view": 123456, "danmaku": 789, "like": "1000", "coin": 5, "favorite": 6, "share": 7,
+                  "reply": 8, "his_rank": 1}}]}},
+    "BilibiliPopular": {"code": 0, "message": "0", "data": {"no_more": True, "list": [
+        {"bvid": "BV2yy", "title": "热门", "duration": 60, "owner": {"name": "up"}, "stat": {"view": 1.0}}]}},
+    "BilibiliViewDetail": {"code": 0, "message": "0", "data": {
+        "View": {"bvid": "BV1xx", "tname": "科技", "pubdate": 1734480000, "desc": "简介", "pages": []},
+        "Tags": [{"tag_id": 1, "tag_name": "AI"}, {"tag_name": "编程"}], "Related": []}},
+    "BilibiliHotSearch": {"code": 0, "data": {"trackid": "x", "list": [
+        {"keyword": "关键词", "show_name": "显示名", "icon": "http://i0/hot.png", "heat": "520", "position": 1}]}},
+    "ToutiaoHotBoard": {"status": "success", "message": "success", "data": [
+        {"ClusterId": 7449000000000000000, "Title": "头条", "Url": "https://www.toutiao.com/trending/1/",
+         "HotValue": "32156789", "Label": "hot", "LabelStyle": None, "QueryWord": "头条", "Image": {}}],
+        "fixed_top_data": []},
+    "ToutiaoFeed": {"message": "success", "has_more": True, "next": {"max_behot_time": 1734480000},
+                    "data": [{"title": "资讯", "item_id": "7449", "article_type": 0, "digg_count": "12",
+                              "comment_count": 3, "video_detail_info": None},
+                             {"title": "视频", "item_id": "7450", "video_detail_info": {"video_watch_count": 99}}]},
+    "GithubRepo": {"id": 1, "full_name": "a/one", "topics": ["cli", "rust"], "created_at": "2020-01-01T00:00:00Z",
+                   "homepage": None, "license": {"key": "mit", "spdx_id": "MIT"}, "owner": {"login": "a"}},
+    "WeiboHotSearch": {"ok": 1, "data": {"hotgov": {"word": "置顶"}, "realtime": [
+        {"word": "热搜", "num": 1234567, "rank": 0, "label_name": "热"}, {"word": "无热度", "num": None}]}},
+    "ZhihuHotList": {"data": [{"type": "hot_list_feed", "target": {"title": "问题", "url": "https://api.zhihu.com/q/1",
+                                                                   "excerpt": None, "answer_count": 3},
+                               "detail_text": "100 万热度"}, {"target": None}],
+                     "paging": {"is_end": True}},
+    "ZhihuTopSearch": {"top_search": {"words": [{"query": "搜索词", "display_query": "展示词"}]}}
+}
+
+
+@pytest.mark.parametrize("name", sorted(API_PAYLOADS))
+def test_api_schemas_agree_across_backends(name):
+    assert assert_same(API_PAYLOADS[name], getattr(json_schemas, name))
+
+
+def test_api_schema_values():
+    ranking = assert_same(API_PAYLOADS["BilibiliRanking"], BilibiliRanking)["data"]["list"][0]
+    assert (ranking["duration"], ranking["stat"]["like"]) == (245, 1000)
+    assert "aid" not in ranking and "his_rank" not in ranking["stat"]
+    board = assert_same(API_PAYLOADS["ToutiaoHotBoard"], json_schemas.ToutiaoHotBoard)["data"][0]
+    assert board["HotValue"] == 32156789 and board["LabelStyle"] == ""
+    feed = assert_same(API_PAYLOADS["ToutiaoFeed"], json_schemas.ToutiaoFeed)
+    assert feed["next"]["max_behot_time"] == 1734480000
+    assert [item["video_detail_info"] for item in feed["data"]] == [None, {"video_watch_count": 99}]
+    weibo = assert_same(API_PAYLOADS["WeiboHotSearch"], json_schemas.WeiboHotSearch)["data"]["realtime"]
+    assert [item["num"] for item in weibo] == [1234567, 0]
+    zhihu = assert_same(API_PAYLOADS["ZhihuHotList"], json_schemas.ZhihuHotList)["data"]
+    assert zhihu[0]["target"]["excerpt"] == "" and zhihu[1]["target"] is None
+
+
+def test_every_api_schema_has_a_sample():
+    top_level = set(API_PAYLOADS)
+    used = set()
+    for name in top_level:
+        used.update(_nested_schemas(getattr(json_schemas, name)))
+    declared = {name for name, value in vars(json_schemas).items()
+                if isinstance(value, type) and issubclass(value, Schema) and value is not Schema}
+    assert declared <= used | top_level, declared - used - top_level
+
+
+def _nested_schemas(schema):
+    names = set()
+    for _, annotation, _ in schema._fields:
+        for candidate in (annotation, *getattr(annotation, "__args__", ())):
+            for inner in (candidate, *getattr(candidate, "__args__", ())):
+                if isinstance(inner, type) and issubclass(inner, Schema):
+                    names.add(inner.__name__)
+                    names.update(_nested_schemas(inner))
+    return names
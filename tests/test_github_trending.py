@@ -0,0 +1,58 @@
+"""GitHub Trending矩阵: 按仓库URL合并去重、appearances计数、限流桶透传"""
+from crawlers.github_trending import GitHubTrendingCrawler
+
+
+def repo(name, stars, forks=1, stars_today="5"):
+    return {"title": name, "url": f"https://github.com/{name}", "stars": stars, "forks": forks,
+            "stars_today": stars_today, "language": "Python", "period": "daily", "platform": "GitHub"}
+
+
+class FakeLists(GitHubTrendingCrawler):
+    def __init__(self, lists):
+        super().__init__(http_client=object(), parser_backend=None)
+        self.lists = lists
+        self.calls = []
+
+    def _fetch_lists(self, pairs, max_workers, rate_key=None):
+        self.calls.append((pairs, rate_key))
+        return [self.lists.get(pair, []) for pair in pairs]
+
+
+def test_matrix_merges_by_url_and_counts_appearances():
+    crawler = FakeLists({
+        ("", "daily"): [repo("a/one", 100), repo("b/two", 50)],
+        ("", "weekly"): [repo("b/two", 55, forks=9, stars_today="300"), repo("a/one", 90)],
+        ("python", "daily"): [repo("a/one", 101)]
+    })
+    merged = crawler.get_trending_matrix(["", "python"], ("daily", "weekly"), rate_key="github_matrix")
+
+    assert list(merged) == ["https://github.com/a/one", "https://github.com/b/two"]
+    one = merged["https://github.com/a/one"]
+    assert one["stars"] == 101
+    assert "period" not in one and "stars_today" not in one
+    assert one["appearances"] == [
+        {"language": "all", "period": "daily", "rank": 1, "stars_today": "5"},
+        {"language": "all", "period": "weekly", "rank": 2, "stars_today": "5"},
+        {"language": "python", "period": "daily", "rank": 1, "stars_today": "5"}
+    ]
+    two = merged["https://github.com/b/two"]
+    assert (two["stars"], two["forks"]) == (55, 9)
+    assert [(a["period"], a["rank"], a["stars_today"]) for a in two["appearances"]] == [
+        ("daily", 2, "5"), ("weekly", 1, "300")]
+    assert crawler.calls[0][1] == "github_matrix"
+    assert len(crawler.calls[0][0]) == 4
+
+
+def test_rate_key_reaches_http_client():
+    class RecordingClient:
+        def __init__(self):
+            self.rate_keys = []
+
+        def get(self, url, rate_key=None, **kwargs):
+            self.rate_keys.append(rate_key)
+            raise OSError("offline")
+
+    client = RecordingClient()
+    crawler = GitHubTrendingCrawler(http_client=client)
+    assert crawler.get_trending_matrix(["", "go"], ("daily",), max_workers=2, rate_key="github_matrix") == {}
+    assert client.rate_keys == ["github_matrix", "github_matrix"]
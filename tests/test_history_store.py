@@ -0,0 +1,64 @@
+"""历史库: 各种快照结构的解析、时间归一化、JSON / NDJSON 导入"""
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from utils.history_store import HistoryStore, iter_records, normalize_time
+from utils.stream_writer import StreamWriter
+
+
+def test_iter_records_shapes():
+    collector = {"data": {"bilibili": {"videos": [{"bvid": "BV1"}], "hot_search": [{"keyword": "k"}]}}}
+    assert [(p, k) for p, k, _ in iter_records(collector)] == [("bilibili", "videos"), ("bilibili", "hot_search")]
+
+    flat = {"data": {"weibo": [{"word": "w"}]}}
+    assert [(p, k) for p, k, _ in iter_records(flat)] == [("weibo", "items")]
+
+    single = {"platform": "zhihu", "data": [{"title": "t"}]}
+    assert [(p, k) for p, k, _ in iter_records(single)] == [("zhihu", "items")]
+
+    per_crawler = {"platform": "bilibili", "data": {"ranking": [{"bvid": "BV1"}], "hot_search": [{"keyword": "k"}]}}
+    assert [(p, k) for p, k, _ in iter_records(per_crawler)] == [("bilibili", "ranking"), ("bilibili", "hot_search")]
+
+
+def test_normalize_time_converts_aware_to_local():
+    local = datetime(2026, 10, 1, 12, 0, 30, 500)
+    assert normalize_time(local) == "2026-10-01T12:00:30"
+    assert normalize_time("2026-10-01T12:00:30.123") == "2026-10-01T12:00:30"
+
+    aware = local.astimezone(timezone(timedelta(hours=-7)))
+    assert normalize_time(aware) == "2026-10-01T12:00:30"
+    assert normalize_time(aware.isoformat()) == "2026-10-01T12:00:30"
+
+
+def write_stream(data_dir, final_path, compress, timestamp):
+    writer = StreamWriter(data_dir, compress=compress, fsync=False)
+    writer.start(timestamp)
+    writer.write_platform("github", {"name": "GitHub", "status": "success"},
+                          {"repos": [{"url": "https://github.com/a/b", "stars": 1}]})
+    return writer.finalize(final_path)
+
+
+def test_import_json_and_stream_snapshots(tmp_path):
+    data_dir = str(tmp_path / "data")
+    day_dir = os.path.join(data_dir, "2026", "10", "01")
+    os.makedirs(day_dir)
+    with open(os.path.join(day_dir, "hotspot_daily_20261001_0800.json"), "w", encoding="utf-8") as f:
+        json.dump({"timestamp": "2026-10-01T08:00:00",
+                   "data": {"bilibili": {"videos": [{"bvid": "BV1"}, {"bvid": "BV2"}]}}}, f)
+    write_stream(data_dir, os.path.join(day_dir, "hotspot_daily_20261001_0900.ndjson"), False,
+                 "2026-10-01T09:00:00")
+    write_stream(data_dir, os.path.join(day_dir, "hotspot_daily_20261001_1000.ndjson.gz"), True,
+                 "2026-10-01T10:00:00")
+    # 未完成的运行文件不导入
+    unfinished = StreamWriter(data_dir, fsync=False)
+    unfinished.start("2026-10-01T11:00:00")
+    unfinished.close()
+
+    store = HistoryStore(str(tmp_path / "history.db"))
+    assert store.import_json_files(data_dir) == (3, 4)
+    assert [row["captured_at"][11:16] for row in store.snapshots()] == ["08:00", "09:00", "10:00"]
+    assert len(store.query("github")) == 2
+    # 再次导入时跳过
+    assert store.import_json_files(data_dir) == (0, 0)
+    store.close()
@@ -0,0 +1,97 @@
+"""HTML解析后端: 各后端对同一页面的抽取结果必须一致"""
+import pytest
+
+from crawlers.html_parsers import available_backends, parse_trending_articles, parse_weibo_rows, resolve_backend
+
+BACKENDS = available_backends()
+
+TRENDING_PAGE = """
+<html><head><script>var trending = "Box-row";</script></head><body>
+<header><a href="/owner/fake/stargazers">999</a></header>
+<article class="Box-row">
+  <h2 class="h3 lh-condensed">
+    <a href="/owner0/repo-0" class="Link">
+      <svg class="octicon"></svg>
+      <span class="text-normal">owner0 /</span>
+      repo-0
+    </a>
+  </h2>
+  <p class="col-9">
+    A &amp; B <g-emoji>🚀</g-emoji> with  spaces<script>track()</script>
+  </p>
+  <div class="f6">
+    <span class="d-inline-block ml-0 mr-3"><span itemprop="programmingLanguage">Python</span></span>
+    <a href="/owner0/repo-0/stargazers" class="Link"><svg></svg> 12,345</a>
+    <a href="/owner0/repo-0/forks" class="Link"><svg></svg> 1.2k</a>
+    <span class="d-inline-block float-sm-right"><svg></svg> 321 stars today</span>
+  </div>
+</article>
+<article class="Box-row">
+  <h2><a href="/owner1/repo-1">owner1 / repo-1</a></h2>
+  <div><a href="/owner1/repo-1/stargazers">7</a></div>
+</article>
+<article class="Box-row"><h2>没有链接</h2></article>
+<div><article class="Box-row extra">
+  <h2><span><a href="/owner2/repo-2"><style>.x{}</style>owner2 / repo-2</a></span></h2>
+  <span class="float-sm-right">不匹配</span>
+</article></div>
+<footer><a href="/about">about</a></footer>
+</body></html>
+"""
+
+WEIBO_PAGE = """
+<table><tbody>
+<tr><td class="td-01">1</td><td class="td-02"><a href="/weibo?q=%23话题一%23">  话题一  </a><span> 1234567</span></td></tr>
+<tr><td class="td-02 extra"><a href="/weibo?q=二">话题<em>二</em></a></td></tr>
+<tr><td class="td-02"><a href="/weibo?q=empty">   </a><span>9</span></td></tr>
+<tr><td class="td-02"><span>没有链接</span></td></tr>
+<tr><td class="td-03"><a href="/weibo?q=other">不是td-02</a></td></tr>
+<tr><td class="td-02"><a>无href</a><span>剧集 88</span></td></tr>
+</tbody></table>
+"""
+
+
+def parse_all(parser, html):
+    return {backend: parser(html, backend=backend) for backend in BACKENDS}
+
+
+def assert_same(parser, html):
+    results = parse_all(parser, html)
+    values = list(results.values())
+    assert all(value == values[0] for value in values), results
+    return values[0]
+
+
+def test_trending_backends_agree():
+    articles = assert_same(parse_trending_articles, TRENDING_PAGE)
+    assert [article["href"] for article in articles] == ["/owner0/repo-0", "/owner1/repo-1", "/owner2/repo-2"]
+    first = articles[0]
+    assert first["title"] == "owner0 /repo-0"
+    assert first["description"] == "A & B🚀with  spaces"
+    assert (first["language"], first["stars_text"], first["forks_text"], first["stars_today_text"]) == (
+        "Python", "12,345", "1.2k", "321 stars today")
+    assert articles[1] == {"title": "owner1 / repo-1", "href": "/owner1/repo-1", "description": None,
+                           "language": None, "stars_text": "7", "forks_text": None, "stars_today_text": None}
+    assert articles[2]["title"] == "owner2 / repo-2"
+    assert articles[2]["stars_today_text"] is None
+
+
+def test_weibo_backends_agree():
+    rows = assert_same(parse_weibo_rows, WEIBO_PAGE)
+    assert rows == [
+        {"title": "话题一", "href": "/weibo?q=%23话题一%23", "hot": " 1234567"},
+        {"title": "话题二", "href": "/weibo?q=二", "hot": ""},
+        {"title": "无href", "href": "", "hot": "剧集 88"}
+    ]
+
+
+def test_page_without_matches():
+    assert set(map(len, parse_all(parse_trending_articles, "<html><body>busy</body></html>").values())) == {0}
+    assert set(map(len, parse_all(parse_weibo_rows, "<html></html>").values())) == {0}
+
+
+def test_backend_selection():
+    assert resolve_backend() == BACKENDS[0]
+    assert resolve_backend("bs4") == "bs4"
+    with pytest.raises(ValueError):
+        resolve_backend("html5lib")
@@ -0,0 +1,99 @@
+"""HTTP/2适配器: 未安装httpx时退回HTTP/1.1、带代理的请求交给HTTP/1.1适配器、响应和异常转换"""
+import pytest
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+import utils.http_client as http_client_module
+from utils.http_client import HttpClient
+from utils.http2_adapter import Http2Adapter, http2_available, httpx
+
+
+class RecordingAdapter(BaseAdapter):
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self.sent.append((request.url, proxies))
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"http1"
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def make_adapter(handler, fallback=None):
+    adapter = Http2Adapter(fallback=fallback)
+    adapter.client.close()
+    adapter.client = httpx.Client(transport=httpx.MockTransport(handler))
+    return adapter
+
+
+def prepare(url="https://api.example.com/x", headers=None):
+    return requests.Request("GET", url, headers=headers or {}).prepare()
+
+
+def test_client_keeps_http1_pool_without_httpx(monkeypatch):
+    monkeypatch.setattr(http_client_module, "http2_available", lambda: False)
+    client = HttpClient(rate_limiter=False, http2=True)
+    assert isinstance(client.session.get_adapter("https://example.com/"), HTTPAdapter)
+    assert client.enable_http2(["https://"]) is None
+
+
+@pytest.mark.skipif(not http2_available(), reason="需要httpx[http2]")
+def test_client_mounts_http2_only_on_given_prefixes():
+    client = HttpClient(rate_limiter=False, http2=["https://api.example.com/"])
+    assert isinstance(client.session.get_adapter("https://api.example.com/x"), Http2Adapter)
+    assert isinstance(client.session.get_adapter("https://www.example.com/"), HTTPAdapter)
+
+
+@pytest.mark.skipif(not http2_available(), reason="需要httpx[http2]")
+def test_proxied_request_goes_to_fallback():
+    fallback = RecordingAdapter()
+    adapter = make_adapter(lambda request: pytest.fail("不应经过httpx"), fallback=fallback)
+    proxies = {"https": "http://127.0.0.1:8080"}
+    response = adapter.send(prepare(), proxies=proxies)
+    assert response.content == b"http1"
+    assert fallback.sent == [("https://api.example.com/x", proxies)]
+
+
+@pytest.mark.skipif(not http2_available(), reason="需要httpx[http2]")
+def test_response_converted_and_hop_by_hop_headers_dropped():
+    seen = {}
+
+    def handler(request):
+        seen.update(request.headers)
+        return httpx.Response(200, headers={"Content-Type": "application/json; charset=utf-8",
+                                            "Set-Cookie": "sid=1; Path=/"}, content=b'{"code":0}')
+
+    fallback = RecordingAdapter()
+    adapter = make_adapter(handler, fallback=fallback)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    response = session.get("https://api.example.com/x", headers={"Keep-Alive": "timeout=5", "X-Test": "1"})
+
+    assert fallback.sent == []
+    assert "keep-alive" not in {name.lower() for name in seen}
+    assert seen["x-test"] == "1"
+    assert response.json() == {"code": 0}
+    assert response.encoding == "utf-8"
+    assert session.cookies.get("sid") == "1"
+    assert adapter.connection_stats()["api.example.com"]["requests"] == 1
+
+
+@pytest.mark.skipif(not http2_available(), reason="需要httpx[http2]")
+@pytest.mark.parametrize("error, expected", [
+    ("ConnectTimeout", requests.ConnectTimeout),
+    ("ReadTimeout", requests.ReadTimeout),
+    ("ConnectError", requests.ConnectionError),
+])
+def test_transport_errors_mapped_to_requests(error, expected):
+    def handler(request):
+        raise getattr(httpx, error)("boom", request=request)
+
+    adapter = make_adapter(handler)
+    with pytest.raises(expected):
+        adapter.send(prepare(), timeout=(1, 2))
@@ -0,0 +1,121 @@
+"""游标分页: 各停止条件、预取在解析当前页时进行、提前停止不再请求、预取线程继承截止时间"""
+import threading
+
+import pytest
+
+from utils.deadline import deadline_scope, remaining_time
+from utils.paginator import paginate
+
+
+class Feed:
+    """页号即游标，每页3条，last之后没有更多"""
+
+    def __init__(self, last=5, per_page=3, loop_at=None, fail_at=None):
+        self.last = last
+        self.per_page = per_page
+        self.loop_at = loop_at
+        self.fail_at = fail_at
+        self.fetched = []
+        self.lock = threading.Lock()
+
+    def fetch(self, cursor):
+        with self.lock:
+            self.fetched.append(cursor)
+        if cursor == self.fail_at:
+            return None
+        return {"page": cursor, "items": [f"{cursor}-{i}" for i in range(self.per_page)]}
+
+    def next_cursor(self, page, cursor):
+        if page["page"] == self.loop_at:
+            return 1
+        return page["page"] + 1 if page["page"] < self.last else None
+
+    @staticmethod
+    def parse(page):
+        return page["items"]
+
+
+def run(feed, **kwargs):
+    return list(paginate(feed.fetch, feed.next_cursor, feed.parse, first_cursor=1, **kwargs))
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_reads_until_no_next_cursor(prefetch):
+    feed = Feed(last=3)
+    assert run(feed, prefetch=prefetch) == ["1-0", "1-1", "1-2", "2-0", "2-1", "2-2", "3-0", "3-1", "3-2"]
+    assert feed.fetched == [1, 2, 3]
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_max_pages(prefetch):
+    feed = Feed()
+    assert len(run(feed, max_pages=2, prefetch=prefetch)) == 6
+    assert feed.fetched == [1, 2]
+
+
+def test_max_items_without_prefetch_requests_only_needed_pages():
+    feed = Feed()
+    assert run(feed, max_items=4, prefetch=False) == ["1-0", "1-1", "1-2", "2-0"]
+    assert feed.fetched == [1, 2]
+
+
+def test_max_items_on_page_boundary_does_not_fetch_more():
+    feed = Feed()
+    assert len(run(feed, max_items=3, prefetch=False)) == 3
+    assert feed.fetched == [1]
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_repeated_cursor_stops(prefetch):
+    feed = Feed(loop_at=2)
+    assert len(run(feed, prefetch=prefetch)) == 6
+    assert feed.fetched == [1, 2]
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_failed_page_ends_pagination(prefetch):
+    feed = Feed(fail_at=3)
+    assert len(run(feed, prefetch=prefetch)) == 6
+    assert feed.fetched == [1, 2, 3]
+
+
+def test_next_page_is_fetched_while_current_page_is_parsed():
+    feed = Feed(last=2)
+    second_fetched = threading.Event()
+    fetch = feed.fetch
+
+    def tracked_fetch(cursor):
+        page = fetch(cursor)
+        if cursor == 2:
+            second_fetched.set()
+        return page
+
+    records = paginate(tracked_fetch, feed.next_cursor, feed.parse, first_cursor=1)
+    assert next(records) == "1-0"
+    # 第一页还没读完，第二页已经在后台请求
+    assert second_fetched.wait(2)
+    assert len(list(records)) == 5
+
+
+def test_closing_early_stops_further_requests():
+    feed = Feed()
+    records = paginate(feed.fetch, feed.next_cursor, feed.parse, first_cursor=1)
+    assert next(records) == "1-0"
+    records.close()
+    # 最多预取了下一页
+    assert feed.fetched in ([1], [1, 2])
+
+
+def test_prefetch_thread_keeps_deadline():
+    feed = Feed(last=2)
+    seen = []
+    fetch = feed.fetch
+
+    def tracked_fetch(cursor):
+        seen.append((cursor, remaining_time()))
+        return fetch(cursor)
+
+    with deadline_scope(30):
+        list(paginate(tracked_fetch, feed.next_cursor, feed.parse, first_cursor=1))
+    assert [cursor for cursor, _ in seen] == [1, 2]
+    assert all(left is not None and 0 < left <= 30 for _, left in seen)
@@ -0,0 +1,17 @@
+"""解析进程池: 工作进程不通过fork当前进程启动"""
+import threading
+
+from utils.parse_pool import ParsePool
+
+
+def test_workers_not_forked_while_threads_run():
+    stop = threading.Event()
+    worker = threading.Thread(target=stop.wait)
+    worker.start()
+    try:
+        with ParsePool(max_workers=1) as pool:
+            assert pool.start_method in ("forkserver", "spawn")
+            assert pool.submit(sorted, [3, 1, 2]).result(timeout=60) == [1, 2, 3]
+    finally:
+        stop.set()
+        worker.join()
@@ -0,0 +1,133 @@
+"""代理池: 被屏蔽时换代理，候选用完时直连或返回平台的真实响应"""
+import io
+from datetime import timedelta
+
+import pytest
+import requests
+
+from utils.proxy_pool import ProxyPool
+
+
+def make_response(status):
+    response = requests.Response()
+    response.status_code = status
+    response.elapsed = timedelta(milliseconds=50)
+    response.raw = io.BytesIO(b"")
+    return response
+
+
+def make_send(statuses, calls):
+    """statuses: {代理地址或None: 状态码或异常}"""
+    def send(proxies):
+        proxy = proxies["https"] if proxies else None
+        calls.append(proxy)
+        result = statuses[proxy]
+        if isinstance(result, Exception):
+            raise result
+        return make_response(result)
+    return send
+
+
+def test_blocked_proxy_falls_over_to_next():
+    pool = ProxyPool(["http://a:1", "http://b:1"], probe_interval=0, allow_direct=False)
+    calls = []
+    response = pool.send("bilibili", make_send({"http://a:1": 429, "http://b:1": 200}, calls))
+    assert response.status_code == 200
+    assert sorted(calls) == ["http://a:1", "http://b:1"]
+
+
+def test_single_blocked_proxy_returns_platform_response():
+    pool = ProxyPool(["http://a:1"], probe_interval=0, allow_direct=False)
+    calls = []
+    response = pool.send("bilibili", make_send({"http://a:1": 403}, calls))
+    assert response.status_code == 403
+    assert response.proxy == "http://a:1"
+    assert calls == ["http://a:1"]
+
+
+def test_blocked_proxies_exhausted_goes_direct():
+    pool = ProxyPool(["http://a:1", "http://b:1"], probe_interval=0, allow_direct=True)
+    calls = []
+    response = pool.send("bilibili", make_send({"http://a:1": 403, "http://b:1": 429, None: 200}, calls))
+    assert response.status_code == 200
+    assert response.proxy is None
+    assert calls[-1] is None
+    assert pool.direct == 1
+
+
+def test_transport_errors_without_direct_raise():
+    pool = ProxyPool(["http://a:1"], probe_interval=0, allow_direct=False)
+    error = requests.exceptions.ProxyError("refused")
+    with pytest.raises(requests.exceptions.ProxyError):
+        pool.send("bilibili", make_send({"http://a:1": error}, []))
+
+
+def test_deadline_stops_without_scoring_the_proxy():
+    from utils.deadline import DeadlineExceeded
+
+    pool = ProxyPool(["http://a:1", "http://b:1"], probe_interval=0, allow_direct=False)
+    calls = []
+    with pytest.raises(DeadlineExceeded):
+        pool.send("bilibili", make_send({"http://a:1": DeadlineExceeded("budget"), "http://b:1": 200}, calls))
+    assert calls == ["http://a:1"]
+    assert pool.stats() == {}
+    assert pool.acquire("bilibili") is not None
+
+
+def _client_with_adapter(pool, adapter):
+    from utils.http_client import HttpClient
+
+    client = HttpClient(rate_limiter=False, body_reader=False, proxy_pool=pool)
+    client.session.mount("https://", adapter)
+    return client
+
+
+class TimingAdapter(requests.adapters.BaseAdapter):
+    """记录每次尝试的超时；connect_error时模拟耗时0.1秒的连接失败，否则睡满超时后抛ConnectTimeout"""
+
+    def __init__(self, connect_error=False):
+        super().__init__()
+        self.connect_error = connect_error
+        self.timeouts = []
+
+    def send(self, request, timeout=None, **kwargs):
+        import time
+        self.timeouts.append(timeout)
+        if self.connect_error:
+            time.sleep(0.1)
+            raise requests.ConnectionError("reset")
+        time.sleep(timeout[1] if isinstance(timeout, tuple) else timeout)
+        raise requests.exceptions.ConnectTimeout("timed out")
+
+    def close(self):
+        pass
+
+
+def test_each_proxy_attempt_gets_the_remaining_budget():
+    from utils.deadline import deadline_scope
+
+    pool = ProxyPool(["http://a:1", "http://b:1", "http://c:1"], probe_interval=0, allow_direct=False)
+    adapter = TimingAdapter(connect_error=True)
+    client = _client_with_adapter(pool, adapter)
+    with deadline_scope(5):
+        with pytest.raises(requests.ConnectionError):
+            client.get("https://api.bilibili.com/x", platform="bilibili", timeout=30)
+    assert len(adapter.timeouts) == 3
+    assert adapter.timeouts[0] <= 5
+    assert adapter.timeouts[0] > adapter.timeouts[1] > adapter.timeouts[2]
+
+
+def test_budget_truncated_timeout_is_not_a_proxy_failure():
+    import time
+    from utils.deadline import DeadlineExceeded, deadline_scope
+
+    pool = ProxyPool(["http://a:1", "http://b:1"], probe_interval=0, allow_direct=False)
+    adapter = TimingAdapter()
+    client = _client_with_adapter(pool, adapter)
+    started = time.monotonic()
+    with deadline_scope(0.2):
+        with pytest.raises(DeadlineExceeded):
+            client.get("https://api.bilibili.com/x", platform="bilibili", timeout=30)
+    assert time.monotonic() - started < 0.5
+    assert len(adapter.timeouts) == 1
+    assert pool.stats() == {}
@@ -0,0 +1,141 @@
+"""令牌桶限流: 突发容量、预约等待、按主机/平台/专用预算分桶"""
+import pytest
+
+from utils.rate_limiter import RateLimiter, TokenBucket
+
+
+def test_bucket_allows_burst_then_reserves_in_order():
+    bucket = TokenBucket(rate=2.0, burst=3)
+    waits = [bucket.reserve() for _ in range(6)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    # 之后每个请求比前一个多等 1/rate 秒
+    assert waits[3] == pytest.approx(0.5, abs=0.01)
+    assert waits[4] == pytest.approx(1.0, abs=0.01)
+    assert waits[5] == pytest.approx(1.5, abs=0.01)
+
+
+def test_bucket_key_prefers_host_then_platform():
+    limiter = RateLimiter(budgets={"bilibili": (1.0, 1)})
+    assert limiter.bucket_key("api.bilibili.com", "bilibili") == "api.bilibili.com"
+    assert limiter.bucket_key("s.bilibili.com", "bilibili") == "bilibili"
+    assert limiter.bucket_key("example.com", None) == "example.com"
+
+
+class FakeClock:
+    """假时钟: sleep只推进时间"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_limiter(budgets, **kwargs):
+    clock = FakeClock()
+    return RateLimiter(budgets=budgets, clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_acquire_paces_requests_at_budget_rate():
+    limiter, clock = make_limiter({"host": (2.0, 3)})
+    for _ in range(9):
+        limiter.acquire("host")
+    # 前3个立即放行，其余6个每0.5秒一个
+    assert clock.now == pytest.approx(3.0)
+    stats = limiter.stats()["host"]
+    assert (stats["requests"], stats["throttled"]) == (9, 6)
+
+
+def test_bucket_refills_while_idle():
+    limiter, clock = make_limiter({"host": (1.0, 2)})
+    limiter.acquire("host")
+    limiter.acquire("host")
+    clock.sleep(10)
+    started = clock.now
+    assert limiter.acquire("host") == 0.0
+    assert limiter.acquire("host") == 0.0
+    assert clock.now == started
+
+
+def test_sweep_never_exceeds_host_rate():
+    limiter, clock = make_limiter({"api.bilibili.com": (1.0, 2), "bilibili_sweep": (3.0, 12)})
+    for _ in range(36):
+        limiter.acquire("bilibili_sweep")
+    # 专用预算再宽松，总速率也不超过主机的每秒1个
+    assert clock.now == pytest.approx(34.0)
+
+
+def test_sweep_and_other_requests_share_host_budget():
+    limiter, clock = make_limiter({"api.bilibili.com": (1.0, 2), "bilibili_sweep": (3.0, 12)})
+    for n in range(20):
+        limiter.acquire("bilibili_sweep" if n % 2 else "api.bilibili.com")
+    assert clock.now == pytest.approx(18.0)
+    assert limiter.stats()["api.bilibili.com"]["requests"] == 20
+    assert limiter.stats()["bilibili_sweep"]["requests"] == 10
+
+
+def test_sweep_budget_can_be_tighter_than_host():
+    limiter, clock = make_limiter({"api.bilibili.com": (1.0, 2), "bilibili_sweep": (0.5, 1)})
+    for _ in range(5):
+        limiter.acquire("bilibili_sweep")
+    assert clock.now == pytest.approx(8.0)
+
+
+def test_unparented_key_is_independent():
+    limiter, clock = make_limiter({"www.zhihu.com": (0.5, 1), "zhihu_hedge": (0.5, 3)})
+    limiter.acquire("www.zhihu.com")
+    for _ in range(3):
+        limiter.acquire("zhihu_hedge")
+    assert clock.now == 0.0
+
+
+def test_default_sweep_parent_is_the_host():
+    assert RateLimiter().parents["bilibili_sweep"] == "api.bilibili.com"
+
+
+def test_http_client_routes_rate_key(tmp_path):
+    import requests
+    from requests.adapters import BaseAdapter
+    from utils.http_client import HttpClient
+
+    class StubAdapter(BaseAdapter):
+        def send(self, request, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            response.request = request
+            response._content = b"{}"
+            return response
+
+        def close(self):
+            pass
+
+    limiter = RateLimiter(budgets={"bilibili_sweep": (1000.0, 50), "api.bilibili.com": (1000.0, 50)})
+    client = HttpClient(rate_limiter=limiter, body_reader=False)
+    client.session.mount("https://", StubAdapter())
+    client.get("https://api.bilibili.com/x/web-interface/ranking/v2", platform="bilibili", rate_key="bilibili_sweep")
+    client.get("https://api.bilibili.com/x/web-interface/ranking/v2", platform="bilibili")
+    stats = limiter.stats()
+    assert stats["bilibili_sweep"]["requests"] == 1
+    # 扫描请求同时计入主机预算
+    assert stats["api.bilibili.com"]["requests"] == 2
+
+
+def test_acquire_beyond_deadline_raises_without_taking_token():
+    import time
+    from utils.deadline import DeadlineExceeded, deadline_scope
+
+    limiter = RateLimiter(budgets={"slow": (0.1, 1)})
+    limiter.acquire("slow")
+    bucket = limiter._get_bucket("slow")
+    tokens = bucket.tokens
+    started = time.monotonic()
+    with deadline_scope(1):
+        with pytest.raises(DeadlineExceeded):
+            limiter.acquire("slow")
+    # 没有睡满10秒，也没有预约令牌
+    assert time.monotonic() - started < 0.5
+    assert bucket.tokens == pytest.approx(tokens, abs=0.01)
+    assert limiter.stats()["slow"]["requests"] == 1
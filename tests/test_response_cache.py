@@ -0,0 +1,81 @@
+"""响应缓存: 查找时计未命中、命中不写索引、正文原子写入、B站错误响应不缓存"""
+import io
+import json
+import os
+
+import requests
+
+from utils.response_cache import ResponseCache
+
+RANKING = "https://api.bilibili.com/x/web-interface/ranking/v2?rid=0"
+
+
+def make_response(body, status=200):
+    response = requests.Response()
+    response.status_code = status
+    response.url = RANKING
+    response._content = body
+    response.raw = io.BytesIO(b"")
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+
+def index_mtime(cache):
+    return os.stat(os.path.join(cache.cache_dir, cache.INDEX_FILE)).st_mtime_ns
+
+
+def test_miss_counted_at_lookup_even_without_store(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    key, entry = cache.lookup(RANKING)
+    assert entry is None
+    # 请求失败或非200，没有store，仍然算一次未命中
+    assert cache.stats()["miss"] == 1
+    assert cache.stats()["stored"] == 0
+
+
+def test_hit_updates_index_only_on_save(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    key, _ = cache.lookup(RANKING)
+    cache.store(key, RANKING, make_response(b'{"code":0,"data":{"list":[]}}'), 300)
+    os.utime(os.path.join(cache.cache_dir, cache.INDEX_FILE), ns=(0, 0))
+
+    key, entry = cache.lookup(RANKING)
+    assert cache.is_fresh(entry)
+    response = cache.build_response(key, entry, "hit")
+    assert response.content == b'{"code":0,"data":{"list":[]}}'
+    assert index_mtime(cache) == 0
+
+    cache.save()
+    assert index_mtime(cache) != 0
+    with open(os.path.join(cache.cache_dir, cache.INDEX_FILE), encoding="utf-8") as f:
+        assert json.load(f)[key]["last_access"] >= entry["last_access"]
+    assert cache.stats()["hit"] == 1
+    assert cache.stats()["miss"] == 1
+
+
+def test_body_written_without_tmp_leftovers(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    key, _ = cache.lookup(RANKING)
+    cache.store(key, RANKING, make_response(b'{"code":0}'), 300)
+    cache.store(key, RANKING, make_response(b'{"code":0,"v":2}'), 300)
+    assert sorted(os.listdir(tmp_path)) == sorted([f"{key}.body", cache.INDEX_FILE])
+    with open(cache._body_path(key), "rb") as f:
+        assert f.read() == b'{"code":0,"v":2}'
+
+
+def test_bilibili_error_code_not_cached(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    key, _ = cache.lookup(RANKING)
+    response = make_response(b'{"code":-412,"message":"request was banned"}')
+    cache.store(key, RANKING, response, 300)
+    assert cache.lookup(RANKING)[1] is None
+    assert getattr(response, "cache_key", None) is None
+    assert cache.stats()["stored"] == 0
+
+
+def test_code_check_falls_back_to_full_parse(tmp_path):
+    assert ResponseCache.is_cacheable(RANKING, b'{"ttl":1,"code":0}')
+    assert not ResponseCache.is_cacheable(RANKING, b'{"ttl":1,"code":-352}')
+    assert not ResponseCache.is_cacheable(RANKING, b'<html>busy</html>')
+    # 其他平台不检查正文
+    assert ResponseCache.is_cacheable("https://github.com/trending", b"<html></html>")
@@ -0,0 +1,73 @@
+"""会话引导: 在熔断和限流之后进行，超时受整体预算约束"""
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from utils.deadline import deadline_scope
+from utils.http_client import HttpClient
+from utils.rate_limiter import RateLimiter
+from utils.session_store import SessionStore
+
+URL = "https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total"
+
+
+class StubAdapter(BaseAdapter):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.request = request
+        response._content = b"{}"
+        return response
+
+    def close(self):
+        pass
+
+
+class RecordingLimiter(RateLimiter):
+    def __init__(self, events):
+        super().__init__()
+        self.events = events
+
+    def acquire(self, key):
+        self.events.append("acquire")
+        return 0.0
+
+
+def make_client(tmp_path, events, timeouts, **kwargs):
+    def bootstrap(session, timeout):
+        events.append("bootstrap")
+        timeouts.append(timeout)
+        return 2
+
+    store = SessionStore(str(tmp_path / "sessions.json"), bootstraps={"zhihu": (("d_c0",), bootstrap)})
+    client = HttpClient(session_store=store, body_reader=False, rate_limiter=RecordingLimiter(events), **kwargs)
+    client.session.mount("https://", StubAdapter())
+    return client
+
+
+def test_bootstrap_runs_after_rate_limiter(tmp_path):
+    events, timeouts = [], []
+    client = make_client(tmp_path, events, timeouts)
+    client.get(URL, platform="zhihu")
+    client.get(URL, platform="zhihu")
+    assert events == ["acquire", "bootstrap", "acquire"]
+    assert timeouts == [10]
+
+
+def test_open_circuit_skips_bootstrap(tmp_path):
+    events, timeouts = [], []
+    breaker = CircuitBreaker(str(tmp_path / "circuit.json"), failure_threshold=1)
+    breaker.record_failure(breaker.endpoint_key(URL), "HTTP 403")
+    client = make_client(tmp_path, events, timeouts, circuit_breaker=breaker)
+    with pytest.raises(CircuitOpenError):
+        client.get(URL, platform="zhihu")
+    assert events == []
+
+
+def test_bootstrap_timeout_clamped_to_deadline(tmp_path):
+    events, timeouts = [], []
+    client = make_client(tmp_path, events, timeouts)
+    with deadline_scope(2):
+        client.get(URL, platform="zhihu")
+    assert 0 < timeouts[0] <= 2
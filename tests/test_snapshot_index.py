@@ -0,0 +1,100 @@
+"""快照清单: LATEST指针不回退、旧版平铺快照的解析与迁移、清单记录与损坏行"""
+import json
+import os
+
+from utils.snapshot_index import LATEST_FILE, MANIFEST_FILE, SnapshotIndex
+
+
+def make_payload(timestamp, platforms=("bilibili",), total=3):
+    return {"timestamp": timestamp, "data": {name: {} for name in platforms}, "summary": {"total_items": total}}
+
+
+def save(index, timestamp, **kwargs):
+    payload = make_payload(timestamp, **kwargs)
+    path = index.path_for(timestamp)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    return path, index.record(path, payload)
+
+
+def write_legacy(data_dir, name, timestamp):
+    with open(os.path.join(data_dir, name), "w", encoding="utf-8") as f:
+        json.dump(make_payload(timestamp), f)
+
+
+def test_snapshots_saved_by_day_and_pointers_updated(tmp_path):
+    index = SnapshotIndex(str(tmp_path))
+    first, _ = save(index, "2025-12-17T08:00:00")
+    second, entry = save(index, "2025-12-18T09:30:15.123456", platforms=("github", "bilibili"), total=7)
+
+    assert second == os.path.join(str(tmp_path), "2025", "12", "18", "hotspot_daily_20251218_0930.json")
+    assert entry == {"path": os.path.join("2025", "12", "18", "hotspot_daily_20251218_0930.json"),
+                     "captured_at": "2025-12-18T09:30:15", "platforms": ["bilibili", "github"],
+                     "items": 7, "bytes": os.path.getsize(second)}
+    assert index.latest() == entry
+    assert index.resolve() == second
+    assert index.resolve("2025-12-17") == first
+    assert os.path.exists(os.path.join(index.day_dir("2025-12-18"), LATEST_FILE))
+
+
+def test_backfilled_snapshot_does_not_move_pointer_back(tmp_path):
+    index = SnapshotIndex(str(tmp_path))
+    newest, _ = save(index, "2025-12-18T12:00:00")
+    older, _ = save(index, "2025-12-18T06:00:00")
+    assert index.resolve() == newest
+    assert index.resolve("2025-12-18") == newest
+    assert [entry["captured_at"] for entry in index.entries()] == ["2025-12-18T12:00:00", "2025-12-18T06:00:00"]
+    assert index.snapshots_on("2025-12-18") == [older, newest]
+
+
+def test_legacy_snapshots_resolved_without_pointer(tmp_path):
+    write_legacy(str(tmp_path), "hotspot_daily_20251217_2300.json", "2025-12-17T23:00:00")
+    write_legacy(str(tmp_path), "hotspot_daily_20251218_0800.json", "2025-12-18T08:00:00")
+    write_legacy(str(tmp_path), "hotspot_daily_20251218_0900.json", "2025-12-18T09:00:00")
+    index = SnapshotIndex(str(tmp_path))
+
+    assert index.resolve() == os.path.join(str(tmp_path), "hotspot_daily_20251218_0900.json")
+    assert index.resolve("2025-12-17") == os.path.join(str(tmp_path), "hotspot_daily_20251217_2300.json")
+    assert index.resolve("2025-12-16") is None
+
+
+def test_missing_snapshot_falls_back_to_legacy(tmp_path):
+    index = SnapshotIndex(str(tmp_path))
+    path, _ = save(index, "2025-12-18T10:00:00")
+    os.remove(path)
+    write_legacy(str(tmp_path), "hotspot_daily_20251218_0800.json", "2025-12-18T08:00:00")
+    assert index.resolve() == os.path.join(str(tmp_path), "hotspot_daily_20251218_0800.json")
+
+
+def test_migrate_moves_legacy_files_and_records_them(tmp_path):
+    write_legacy(str(tmp_path), "hotspot_daily_20251217_2300.json", "2025-12-17T23:00:00")
+    write_legacy(str(tmp_path), "hotspot_daily_20251218_0800.json", "2025-12-18T08:00:00")
+    index = SnapshotIndex(str(tmp_path))
+
+    assert index.migrate_legacy() == 2
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("hotspot_daily_")]
+    assert index.resolve() == os.path.join(str(tmp_path), "2025", "12", "18", "hotspot_daily_20251218_0800.json")
+    assert len(list(index.entries())) == 2
+
+
+def test_delta_references_listed_from_manifest(tmp_path):
+    index = SnapshotIndex(str(tmp_path))
+    daily, _ = save(index, "2025-12-18T08:00:00")
+    segment = os.path.join(str(tmp_path), "deltas", "20251218_0900.ndjson")
+    os.makedirs(os.path.dirname(segment))
+    open(segment, "w").close()
+    reference = segment + "#2025-12-18T09:00:00"
+    index.record(reference, make_payload("2025-12-18T09:00:00"), bytes_written=120)
+
+    assert index.snapshots_on("2025-12-18") == [daily, reference]
+    assert index.resolve() == reference
+    assert [entry["bytes"] for entry in index.entries_on("2025-12-18")] == [os.path.getsize(daily), 120]
+    assert index.entries_on("2025-12-17") == []
+
+
+def test_truncated_manifest_line_is_skipped(tmp_path):
+    index = SnapshotIndex(str(tmp_path))
+    save(index, "2025-12-18T08:00:00")
+    with open(os.path.join(str(tmp_path), MANIFEST_FILE), "a", encoding="utf-8") as f:
+        f.write('{"path": "2025/12/18/hotspot_daily_2025')
+    assert [entry["captured_at"] for entry in index.entries()] == ["2025-12-18T08:00:00"]
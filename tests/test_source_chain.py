@@ -0,0 +1,116 @@
+"""数据源链: 胜者选择、对冲间隔、排名持久化、落选来源的取消"""
+import json
+import threading
+import time
+
+from utils.source_chain import SourceChain
+
+
+def make_chain(tmp_path, sources, **kwargs):
+    return SourceChain("zhihu_hot", sources, state_file=str(tmp_path / "chains.json"), **kwargs)
+
+
+def test_first_valid_result_wins_and_invalid_falls_through(tmp_path):
+    def broken():
+        raise ValueError("boom")
+
+    chain = make_chain(tmp_path, [("a", broken), ("b", lambda: []), ("c", lambda: [1])], stagger=5)
+    started = time.monotonic()
+    result, report = chain.run()
+    assert result == [1]
+    assert report["winner"] == "c"
+    assert [attempt["status"] for attempt in report["attempts"]] == ["failed", "invalid", "won"]
+    # 失败和无效结果立即启动下一个来源，不等stagger
+    assert time.monotonic() - started < 1
+
+
+def test_fast_primary_never_launches_backup(tmp_path):
+    calls = []
+    chain = make_chain(tmp_path, [("a", lambda: calls.append("a") or [1]),
+                                  ("b", lambda: calls.append("b") or [2])], stagger=1)
+    result, report = chain.run()
+    assert result == [1]
+    assert calls == ["a"]
+    assert report["attempts"][1]["status"] == "skipped"
+
+
+def test_slow_primary_launches_backup_after_stagger(tmp_path):
+    launched = {}
+    release = threading.Event()
+
+    def slow():
+        launched["a"] = time.monotonic()
+        release.wait(2)
+        return [1]
+
+    def backup():
+        launched["b"] = time.monotonic()
+        return [2]
+
+    chain = make_chain(tmp_path, [("a", slow), ("b", backup)], stagger=0.2)
+    result, report = chain.run()
+    release.set()
+    assert result == [2]
+    assert report["winner"] == "b"
+    assert report["attempts"][0]["status"] == "abandoned"
+    assert 0.15 <= launched["b"] - launched["a"] < 1
+
+
+def test_loser_sees_cancel_and_late_result_is_closed(tmp_path):
+    closed = threading.Event()
+    release = threading.Event()
+
+    class Streamed(list):
+        def close(self):
+            closed.set()
+
+    def slow():
+        release.wait(2)
+        return Streamed([1])
+
+    chain = make_chain(tmp_path, [("a", slow), ("b", lambda: [2])], stagger=0.05)
+    result, _ = chain.run()
+    assert result == [2]
+    assert chain.cancelled.is_set()
+    release.set()
+    assert closed.wait(2)
+
+
+def test_ranking_persists_across_runs(tmp_path):
+    sources = [("a", lambda: []), ("b", lambda: [2])]
+    make_chain(tmp_path, sources, stagger=5).run()
+
+    with open(tmp_path / "chains.json", encoding="utf-8") as f:
+        state = json.load(f)["zhihu_hot"]
+    assert state["b"] == {"score": 1.0, "wins": 1, "failures": 0}
+    assert state["a"]["failures"] == 1
+
+    chain = make_chain(tmp_path, sources, stagger=5)
+    assert [name for name, _ in chain.ranked_sources()] == ["b", "a"]
+
+
+def test_default_state_file_is_under_project_data(tmp_path):
+    from utils.http_client import DEFAULT_DATA_DIR
+    chain = SourceChain("zhihu_hot", [])
+    assert chain.state_file.startswith(DEFAULT_DATA_DIR)
+
+
+def test_zhihu_hedge_uses_its_own_rate_budget(tmp_path):
+    import requests
+    from crawlers.zhihu_hot import HEDGE_RATE_KEY, get_zhihu_hot
+
+    class RecordingClient:
+        def __init__(self):
+            self.rate_keys = []
+
+        def get(self, url, rate_key=None, **kwargs):
+            self.rate_keys.append(rate_key)
+            response = requests.Response()
+            response.status_code = 503
+            return response
+
+    client = RecordingClient()
+    items, report = get_zhihu_hot(client=client, stagger=0.05, state_file=str(tmp_path / "chains.json"))
+    assert items == []
+    assert report["winner"] is None
+    assert client.rate_keys == [HEDGE_RATE_KEY] * 3
@@ -0,0 +1,101 @@
+"""流式运行文件: 写入还原、续采跳过已成功的平台、截断的尾部"""
+import os
+
+import pytest
+
+from utils.stream_writer import RUN_FILE, StreamWriter, is_stream_file, load_stream
+
+BILIBILI = {"videos": [{"title": "视频1", "view": 10}, {"title": "视频2", "view": 5}], "hot_search": []}
+GITHUB = {"repos": [{"name": "a/b", "stars": 3}]}
+
+
+def run_path(data_dir, compress):
+    return os.path.join(data_dir, RUN_FILE + (".ndjson.gz" if compress else ".ndjson"))
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_write_and_finalize_round_trip(tmp_path, compress):
+    writer = StreamWriter(str(tmp_path), compress=compress, fsync=False)
+    timestamp, done = writer.start("2026-10-18T08:00:00")
+    assert (timestamp, done) == ("2026-10-18T08:00:00", {})
+    writer.write_platform("bilibili", {"name": "Bilibili", "status": "success"}, BILIBILI)
+    writer.write_platform("weibo", {"name": "微博", "status": "failed"}, None)
+    writer.write_meta("summary", {"total_items": 3})
+    final_path = writer.finalize(str(tmp_path / ("snapshot" + writer.suffix)))
+
+    assert is_stream_file(final_path)
+    assert not os.path.exists(run_path(tmp_path, compress))
+    payload = load_stream(final_path)
+    assert payload["timestamp"] == "2026-10-18T08:00:00"
+    assert payload["data"] == {"bilibili": BILIBILI}
+    assert payload["platforms"]["weibo"]["status"] == "failed"
+    assert payload["summary"] == {"total_items": 3}
+    assert writer.counts == {"bilibili": {"videos": 2, "hot_search": 0}}
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_resume_skips_successful_platforms(tmp_path, compress):
+    writer = StreamWriter(str(tmp_path), compress=compress, fsync=False)
+    writer.start("2026-10-18T08:00:00")
+    writer.write_platform("bilibili", {"name": "Bilibili", "status": "success"}, BILIBILI)
+    writer.write_platform("weibo", {"name": "微博", "status": "failed"}, None)
+    writer.close()
+
+    resumed = StreamWriter(str(tmp_path), compress=compress, fsync=False)
+    timestamp, done = resumed.start("2026-10-18T09:00:00", resume=True)
+    # 沿用原运行的时间戳，失败的平台需要重采
+    assert timestamp == "2026-10-18T08:00:00"
+    assert list(done) == ["bilibili"]
+    resumed.write_platform("github", {"name": "GitHub", "status": "success"}, GITHUB)
+    payload = load_stream(resumed.finalize(str(tmp_path / ("snapshot" + resumed.suffix))))
+    assert payload["data"] == {"bilibili": BILIBILI, "github": GITHUB}
+    assert "weibo" not in payload["platforms"]
+
+
+def test_resume_switches_compression(tmp_path):
+    writer = StreamWriter(str(tmp_path), fsync=False)
+    writer.start("2026-10-18T08:00:00")
+    writer.write_platform("github", {"name": "GitHub", "status": "success"}, GITHUB)
+    writer.close()
+
+    resumed = StreamWriter(str(tmp_path), compress=True, fsync=False)
+    _, done = resumed.start("2026-10-18T09:00:00", resume=True)
+    resumed.close()
+    assert list(done) == ["github"]
+    assert not os.path.exists(run_path(tmp_path, False))
+    assert load_stream(run_path(tmp_path, True))["data"] == {"github": GITHUB}
+
+
+def test_start_without_resume_discards_old_run(tmp_path):
+    writer = StreamWriter(str(tmp_path), fsync=False)
+    writer.start("2026-10-18T08:00:00")
+    writer.write_platform("github", {"name": "GitHub", "status": "success"}, GITHUB)
+    writer.close()
+
+    fresh = StreamWriter(str(tmp_path), fsync=False)
+    timestamp, done = fresh.start("2026-10-18T09:00:00")
+    fresh.close()
+    assert (timestamp, done) == ("2026-10-18T09:00:00", {})
+    assert load_stream(fresh.path)["data"] == {}
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_torn_tail_keeps_completed_platforms(tmp_path, compress):
+    writer = StreamWriter(str(tmp_path), compress=compress, fsync=False)
+    writer.start("2026-10-18T08:00:00")
+    writer.write_platform("github", {"name": "GitHub", "status": "success"}, GITHUB)
+    complete = os.path.getsize(writer.path)
+    writer.write_platform("bilibili", {"name": "Bilibili", "status": "success"}, BILIBILI)
+    writer.close()
+
+    # 模拟写bilibili时崩溃: 截掉最后一个平台的后半段
+    with open(writer.path, "r+b") as f:
+        f.truncate(complete + (os.path.getsize(writer.path) - complete) // 2)
+    assert load_stream(writer.path)["data"] == {"github": GITHUB}
+
+    resumed = StreamWriter(str(tmp_path), compress=compress, fsync=False)
+    _, done = resumed.start("2026-10-18T09:00:00", resume=True)
+    resumed.write_platform("bilibili", {"name": "Bilibili", "status": "success"}, BILIBILI)
+    payload = load_stream(resumed.finalize(str(tmp_path / ("snapshot" + resumed.suffix))))
+    assert list(done) == ["github"]
+    assert payload["data"] == {"github": GITHUB, "bilibili": BILIBILI}
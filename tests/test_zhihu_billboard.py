@@ -0,0 +1,67 @@
+"""知乎热榜流式提取: 任意切块结果一致、跳过空数组和同名字符串、读到数组结尾即停止"""
+import json
+
+import pytest
+
+from crawlers.zhihu_billboard import HotListExtractor
+
+HOT_LIST = [
+    {"target": {"title": "标题一 \"引号\" [方括号]", "id": 1}, "detailText": "100 万热度"},
+    {"target": {"title": "反斜杠 \\ 结尾\\", "id": 2}, "detailText": "50 万热度"}
+]
+
+INITIAL_DATA = {"initialState": {
+    "note": "文本里出现 \"hotList\" 字样",
+    "topstory": {"hotList": []},
+    "billboard": {"hotList": HOT_LIST}
+}}
+
+PAGE = ("<html><head><title>知乎热榜</title></head><body>"
+        '<script id="js-initialData" type="text/json">'
+        + json.dumps(INITIAL_DATA, ensure_ascii=False)
+        + "</script>" + "<div>尾部内容</div>" * 200 + "</body></html>").encode("utf-8")
+
+
+def feed_in_chunks(data, size):
+    extractor = HotListExtractor()
+    for start in range(0, len(data), size):
+        if extractor.feed(data[start:start + size]):
+            break
+    return extractor
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 4096, len(PAGE)])
+def test_any_chunking_gives_the_same_list(size):
+    extractor = feed_in_chunks(PAGE, size)
+    assert extractor.state == "done"
+    assert extractor.error is None
+    assert extractor.result == HOT_LIST
+
+
+def test_stops_before_reading_the_rest_of_the_page():
+    extractor = feed_in_chunks(PAGE, 256)
+    assert extractor.bytes_read < len(PAGE)
+    assert PAGE.index(b"</script>") <= extractor.bytes_read
+
+
+def test_script_without_hot_list_is_missing():
+    page = ('<script id="js-initialData" type="text/json">{"hotList": [], "other": 1}</script>'
+            '<script>var hotList = [1];</script>').encode("utf-8")
+    extractor = feed_in_chunks(page, 5)
+    assert extractor.state == "missing"
+    assert extractor.result is None
+
+
+def test_page_without_initial_data_keeps_head():
+    page = ("<html>热榜" + "x" * 10000 + "</html>").encode("utf-8")
+    extractor = feed_in_chunks(page, 100)
+    assert extractor.state == "script"
+    assert extractor.head.startswith("<html>热榜")
+    assert len(extractor.head) == extractor.head_size
+
+
+def test_malformed_array_reports_error():
+    page = b'<script id="js-initialData" type="text/json">{"hotList": [{"a": 1,}]}</script>'
+    extractor = feed_in_chunks(page, 4)
+    assert extractor.state == "missing"
+    assert "JSON" in extractor.error
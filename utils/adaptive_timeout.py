@@ -0,0 +1,139 @@
+"""
+按接口的自适应超时
+记录每个接口(主机+路径)最近的响应耗时（到收到响应头为止），
+样本足够后由p50/p99推出连接和读取超时，代替爬虫里写死的timeout。
+历史保存在数据目录，跨运行生效。
+"""
+import json
+import math
+import os
+import threading
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, p):
+    """最近秩法百分位，sorted_values需已排序"""
+    if not sorted_values:
+        return None
+    index = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+class AdaptiveTimeouts:
+    """根据历史耗时推算超时
+
+    读取超时 = p99 × read_factor，连接超时 = p50 × connect_factor（p50已包含建连、
+    TLS握手和服务器处理，几倍p50足够覆盖正常握手），都限制在下限和上限之间。
+    超时的请求以所用超时值计入样本，让偏慢的接口下次得到更长的时间（不超过上限）。
+
+    Args:
+        state_file: 历史持久化文件
+        window: 每个接口保留最近多少个样本
+        min_samples: 样本少于此数时使用爬虫传入的默认timeout
+        fallback: 样本不足且爬虫没有传timeout时使用的(连接, 读取)超时，避免请求无限等待
+        connect_floor / connect_ceiling: 连接超时的下限和上限（秒）
+        read_floor / read_ceiling: 读取超时的下限和上限（秒）
+        connect_factor / read_factor: 百分位到超时的放大倍数
+    """
+
+    def __init__(self, state_file="data/latency_history.json", window=100, min_samples=5,
+                 connect_floor=1.0, connect_ceiling=10.0, read_floor=2.0, read_ceiling=30.0,
+                 connect_factor=3.0, read_factor=1.5, fallback=(5.0, 15.0)):
+        self.state_file = state_file
+        self.window = window
+        self.min_samples = min_samples
+        self.connect_floor = connect_floor
+        self.connect_ceiling = connect_ceiling
+        self.read_floor = read_floor
+        self.read_ceiling = read_ceiling
+        self.connect_factor = connect_factor
+        self.read_factor = read_factor
+        self.fallback = fallback
+
+        self._lock = threading.Lock()
+        self._history = self._load()
+        # 本次运行中各接口选用的超时
+        self._chosen = {}
+
+    @staticmethod
+    def endpoint_key(url):
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path}"
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ 耗时历史文件损坏，已重置: {e}")
+            return {}
+
+    def save(self):
+        """原子写入历史文件"""
+        with self._lock:
+            directory = os.path.dirname(self.state_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.state_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._history, f, ensure_ascii=False)
+            os.replace(tmp_path, self.state_file)
+
+    def _entry(self, key):
+        return self._history.setdefault(key, {"samples": [], "timeouts": 0})
+
+    def percentiles(self, key):
+        """返回 (p50, p95, p99, 样本数)，没有样本时百分位为None"""
+        with self._lock:
+            samples = sorted(self._history.get(key, {}).get("samples", []))
+        return percentile(samples, 50), percentile(samples, 95), percentile(samples, 99), len(samples)
+
+    def timeout_for(self, key, default=None):
+        """返回本次请求使用的timeout
+
+        样本足够时返回(连接, 读取)元组，否则原样返回default；default为None时返回fallback
+        """
+        p50, p95, p99, count = self.percentiles(key)
+        if count < self.min_samples:
+            timeout = default if default is not None else self.fallback
+            chosen = {"source": "default", "timeout": timeout}
+        else:
+            connect = min(max(p50 * self.connect_factor, self.connect_floor), self.connect_ceiling)
+            read = min(max(p99 * self.read_factor, self.read_floor), self.read_ceiling)
+            # 服务器处理慢的接口p50偏大，建连不应比等响应还久
+            connect = min(connect, read)
+            timeout = (round(connect, 2), round(read, 2))
+            chosen = {"source": "history", "timeout": timeout}
+
+        chosen.update({"p50": p50, "p95": p95, "p99": p99, "samples": count})
+        with self._lock:
+            self._chosen[key] = chosen
+        return timeout
+
+    def record(self, key, seconds):
+        """记录一次成功请求的耗时"""
+        with self._lock:
+            samples = self._entry(key)["samples"]
+            samples.append(round(seconds, 3))
+            del samples[:-self.window]
+
+    def record_timeout(self, key, seconds):
+        """记录一次超时，seconds为当时使用的超时值"""
+        with self._lock:
+            entry = self._entry(key)
+            entry["timeouts"] += 1
+            if seconds:
+                entry["samples"].append(round(seconds, 3))
+                del entry["samples"][:-self.window]
+
+    def stats(self):
+        """本次运行用到的接口: {接口: {source, timeout, p50, p95, p99, samples, timeouts}}"""
+        with self._lock:
+            result = {}
+            for key, chosen in self._chosen.items():
+                entry = dict(chosen)
+                entry["timeouts"] = self._history.get(key, {}).get("timeouts", 0)
+                result[key] = entry
+            return result
@@ -0,0 +1,84 @@
+"""
+异步并发收集引擎
+把各平台的同步爬虫方法放到线程里并发执行，
+请求间隔由HttpClient的按主机令牌桶负责，不同主机互不等待
+"""
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.deadline import deadline_scope, remaining_time
+
+
+async def _run_endpoint(platform, name, func, executor, started, timings, late):
+    """执行单个接口调用，异常时返回None，完成时间记入timings
+
+    结束时预算已用完的接口记入late: 爬虫通常自己捕获超时并返回空结果，
+    这时任务虽然按时结束，数据却是因为预算不足才缺失的
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    try:
+        return await loop.run_in_executor(executor, context.run, func)
+    except Exception as e:
+        print(f"  ❌ {platform}/{name} 失败: {e}")
+        return None
+    finally:
+        timings[(platform, name)] = time.monotonic() - started
+        left = context.run(remaining_time)
+        if left is not None and left <= 0:
+            late.add((platform, name))
+
+
+async def gather_endpoints(jobs, max_workers=None, timeout=None):
+    """并发执行所有平台的所有接口
+
+    Args:
+        jobs: {平台: {接口名: 无参可调用对象}}
+        max_workers: 线程数上限，默认每个接口一个线程
+        timeout: 整体时间预算（秒），到时未完成的接口被取消，结果为None。
+            接口线程在同一预算的deadline_scope内运行，进行中的请求超时被截短到剩余时间，
+            之后的请求直接抛出DeadlineExceeded，线程在截止时间后很快结束，不会拖住进程退出
+    Returns:
+        (结果, 报告)
+        结果: {平台: {接口名: 结果}}，保持jobs中的顺序
+        报告: {平台: {"latency": 秒, "timed_out": [未完成或预算用完时才结束的接口名]}}
+    """
+    endpoint_count = sum(len(endpoints) for endpoints in jobs.values())
+    executor = ThreadPoolExecutor(max_workers=max_workers or max(endpoint_count, 1))
+
+    started = time.monotonic()
+    timings = {}
+    late = set()
+    tasks = {}
+    # 任务创建时复制当前上下文，截止时间随之传到各接口线程
+    with deadline_scope(timeout):
+        for platform, endpoints in jobs.items():
+            for name, func in endpoints.items():
+                task = asyncio.ensure_future(_run_endpoint(platform, name, func, executor, started, timings, late))
+                tasks[task] = (platform, name)
+
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+    finally:
+        # 线程无法强制中断，不等待它们结束；还在排队的接口直接取消，进行中的请求受截止时间限制
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.monotonic() - started
+    collected = {platform: {} for platform in jobs}
+    report = {platform: {"latency": 0.0, "timed_out": []} for platform in jobs}
+    for task, (platform, name) in tasks.items():
+        if task in done:
+            collected[platform][name] = task.result()
+            latency = timings.get((platform, name), elapsed)
+            if (platform, name) in late:
+                report[platform]["timed_out"].append(name)
+        else:
+            collected[platform][name] = None
+            report[platform]["timed_out"].append(name)
+            latency = elapsed
+        report[platform]["latency"] = round(max(report[platform]["latency"], latency), 3)
+    return collected, report
@@ -0,0 +1,209 @@
+"""
+有上限的响应正文读取
+所有请求都以stream=True发出，正文边下载边解压，按接口限制最大字节数和Content-Type，
+验证码页、错误页等异常响应在读到上限前（或根据响应头在读取前）就中止，不会整页进内存。
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+JSON_TYPES = ("application/json", "text/json", "text/plain", "application/javascript", "text/javascript")
+HTML_TYPES = ("text/html",)
+
+# (URL前缀, 解压后最大字节数, 允许的Content-Type)，按顺序匹配第一个；
+# Content-Type为None表示不检查。只对200响应检查Content-Type
+DEFAULT_BODY_RULES = [
+    ("https://api.bilibili.com/", 4 * 1024 * 1024, JSON_TYPES),
+    ("https://app.bilibili.com/", 1024 * 1024, JSON_TYPES),
+    ("https://github.com/trending", 3 * 1024 * 1024, HTML_TYPES),
+    ("https://api.github.com/", 2 * 1024 * 1024, JSON_TYPES),
+    ("https://www.toutiao.com/hot-event/", 2 * 1024 * 1024, JSON_TYPES),
+    ("https://www.toutiao.com/api/", 2 * 1024 * 1024, JSON_TYPES),
+    ("https://weibo.com/ajax/", 1024 * 1024, JSON_TYPES),
+    ("https://s.weibo.com/", 2 * 1024 * 1024, HTML_TYPES),
+    ("https://www.zhihu.com/api/", 2 * 1024 * 1024, JSON_TYPES),
+    ("https://www.zhihu.com/billboard", 8 * 1024 * 1024, HTML_TYPES),
+    ("https://www.douyin.com/aweme/", 2 * 1024 * 1024, JSON_TYPES)
+]
+
+
+class BodyRejected(requests.RequestException):
+    """响应正文超过上限或Content-Type不符，已中止读取"""
+
+
+class BodyReader:
+    """按接口限制正文大小的读取器
+
+    每个请求的统计记录在response.body_stats中:
+        wire_bytes: 线上实际读取的字节数（压缩后）
+        bytes: 解压后读取的字节数
+        peak_buffer: 内存中正文缓冲的峰值；逐块交给调用方时为最大的单块
+        saved_bytes: 提前中止省下的线上字节数，仅Content-Length已知时可算
+        aborted: None / "too_large" / "content_type" / "stopped"（调用方主动停止读取）
+
+    Args:
+        rules: [(URL前缀, 最大字节数, Content-Type元组或None)]，覆盖DEFAULT_BODY_RULES
+        default_max_bytes: 未匹配规则的接口的最大字节数
+        chunk_size: 每次从连接读取的字节数
+        log_size: 保留最近多少个请求的统计
+    """
+
+    def __init__(self, rules=None, default_max_bytes=10 * 1024 * 1024, chunk_size=64 * 1024, log_size=200):
+        self.rules = rules if rules is not None else DEFAULT_BODY_RULES
+        self.default_max_bytes = default_max_bytes
+        self.chunk_size = chunk_size
+        self.log_size = log_size
+
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._log = []
+
+    def rule_for(self, url):
+        """返回 (最大字节数, 允许的Content-Type)"""
+        for prefix, max_bytes, content_types in self.rules:
+            if url.startswith(prefix):
+                return max_bytes, content_types
+        return self.default_max_bytes, None
+
+    def begin(self, response, url):
+        """根据响应头检查大小和类型，不符合时不读正文直接中止
+
+        规则按请求的url匹配，跳转到验证码页等其他地址时仍按原接口检查
+
+        Raises:
+            BodyRejected
+        """
+        max_bytes, content_types = self.rule_for(url)
+        content_length = self._content_length(response)
+        response.body_stats = {
+            "url": response.url or url,
+            "status": response.status_code,
+            "max_bytes": max_bytes,
+            "content_length": content_length,
+            "wire_bytes": 0,
+            "bytes": 0,
+            "peak_buffer": 0,
+            "saved_bytes": 0,
+            "aborted": None
+        }
+
+        if content_length is not None and content_length > max_bytes:
+            self._abort(response, "too_large",
+                        f"正文 {content_length} 字节超过上限 {max_bytes}: {url}")
+
+        if content_types and response.status_code == 200:
+            mime = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if mime and mime not in content_types:
+                self._abort(response, "content_type", f"Content-Type不符 ({mime}): {url}")
+
+    def read(self, response, url):
+        """读取完整正文并放入response，之后.content/.text/.json()照常使用
+
+        Raises:
+            BodyRejected
+        """
+        self.begin(response, url)
+        buffer = bytearray()
+        for chunk in self._iter_chunks(response):
+            buffer += chunk
+            response.body_stats["peak_buffer"] = len(buffer)
+        response._content = bytes(buffer)
+        response._content_consumed = True
+        self._finish(response)
+
+    def iter_body(self, response):
+        """逐块返回解压后的正文，供stream=True的调用方边读边处理
+
+        调用方提前停止时关闭生成器即可，省下的字节计入统计
+        """
+        stats = getattr(response, "body_stats", None)
+        if stats is None:
+            # 缓存命中等非网络响应
+            yield from response.iter_content(chunk_size=self.chunk_size)
+            return
+
+        completed = False
+        try:
+            for chunk in self._iter_chunks(response):
+                stats["peak_buffer"] = max(stats["peak_buffer"], len(chunk))
+                yield chunk
+            completed = True
+        finally:
+            if not completed and stats["aborted"] is None:
+                stats["aborted"] = "stopped"
+            self._finish(response)
+
+    def _iter_chunks(self, response):
+        stats = response.body_stats
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            stats["bytes"] += len(chunk)
+            stats["wire_bytes"] = self._wire_bytes(response, stats["bytes"])
+            if stats["bytes"] > stats["max_bytes"]:
+                self._abort(response, "too_large",
+                            f"正文超过上限 {stats['max_bytes']} 字节，已中止: {stats['url']}")
+            yield chunk
+
+    def _abort(self, response, reason, message):
+        stats = response.body_stats
+        stats["aborted"] = reason
+        stats["wire_bytes"] = self._wire_bytes(response, stats["bytes"])
+        # 关闭连接，不再读取剩余正文；关闭后urllib3的计数会清零，所以先记下
+        response.close()
+        self._finish(response, closed=True)
+        raise BodyRejected(message, response=response)
+
+    def _finish(self, response, closed=False):
+        stats = response.body_stats
+        if stats.get("finished"):
+            return
+        stats["finished"] = True
+        if not closed:
+            stats["wire_bytes"] = self._wire_bytes(response, stats["bytes"])
+        if stats["aborted"] and stats["content_length"] is not None:
+            stats["saved_bytes"] = max(stats["content_length"] - stats["wire_bytes"], 0)
+
+        host = urlsplit(stats["url"]).netloc
+        with self._lock:
+            entry = self._hosts.setdefault(host, {"requests": 0, "wire_bytes": 0, "bytes": 0, "saved_bytes": 0,
+                                                  "aborted": 0, "peak_buffer": 0})
+            entry["requests"] += 1
+            entry["wire_bytes"] += stats["wire_bytes"]
+            entry["bytes"] += stats["bytes"]
+            entry["saved_bytes"] += stats["saved_bytes"]
+            entry["peak_buffer"] = max(entry["peak_buffer"], stats["peak_buffer"])
+            if stats["aborted"]:
+                entry["aborted"] += 1
+
+            record = {key: value for key, value in stats.items() if key != "finished"}
+            record["time"] = time.time()
+            self._log.append(record)
+            del self._log[:-self.log_size]
+
+    def _content_length(self, response):
+        try:
+            return int(response.headers["Content-Length"])
+        except (KeyError, ValueError):
+            return None
+
+    def _wire_bytes(self, response, fallback):
+        """urllib3记录的线上字节数（压缩后）
+
+        取不到时用解压后的字节数代替；分块传输(chunked)时urllib3不计数，也是如此
+        """
+        tell = getattr(response.raw, "tell", None)
+        try:
+            return (tell() if tell else 0) or fallback
+        except Exception:
+            return fallback
+
+    def stats(self):
+        """按主机汇总: {主机: {requests, wire_bytes, bytes, saved_bytes, aborted, peak_buffer}}"""
+        with self._lock:
+            return {host: dict(entry) for host, entry in self._hosts.items()}
+
+    def recent(self):
+        """最近请求的逐条统计"""
+        with self._lock:
+            return list(self._log)
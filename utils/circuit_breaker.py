@@ -0,0 +1,166 @@
+"""
+按接口的熔断器
+连续失败的接口进入打开状态，冷却期内直接跳过；冷却结束后放行一次探测(半开)，
+成功则恢复，失败则加倍冷却时间。状态保存在数据目录，跨运行生效。
+"""
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 视为接口失效的状态码（另外所有5xx也算失败）
+FAILURE_STATUSES = {401, 403, 404, 410, 429}
+
+
+class CircuitOpenError(requests.RequestException):
+    """接口处于熔断状态，本次请求被跳过"""
+
+
+class CircuitBreaker:
+    """按接口(主机+路径)记录健康状态的熔断器
+
+    Args:
+        state_file: 状态持久化文件
+        failure_threshold: 连续失败多少次后打开
+        cooldown: 首次打开后的冷却秒数
+        max_cooldown: 冷却时间加倍的上限
+    """
+
+    def __init__(self, state_file="data/circuit_state.json", failure_threshold=3,
+                 cooldown=1800, max_cooldown=86400):
+        self.state_file = state_file
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self._lock = threading.Lock()
+        self._probing = set()
+        self._failures_before_success = {}
+        self._states = self._load()
+        self.skipped = {}
+
+    @staticmethod
+    def endpoint_key(url):
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path}"
+
+    @staticmethod
+    def is_failure_status(status_code):
+        return status_code >= 500 or status_code in FAILURE_STATUSES
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ 熔断状态文件损坏，已重置: {e}")
+            return {}
+
+    def save(self):
+        """原子写入状态文件"""
+        with self._lock:
+            directory = os.path.dirname(self.state_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.state_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._states, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_file)
+
+    def _state(self, key):
+        return self._states.setdefault(key, {
+            "state": CLOSED,
+            "failures": 0,
+            "opened_at": 0,
+            "cooldown": self.cooldown,
+            "last_error": ""
+        })
+
+    def before_request(self, key):
+        """请求前检查，接口熔断中时抛出CircuitOpenError"""
+        with self._lock:
+            state = self._states.get(key)
+            if not state or state["state"] == CLOSED:
+                return
+
+            remaining = state["opened_at"] + state["cooldown"] - time.time()
+            if state["state"] == OPEN and remaining <= 0:
+                state["state"] = HALF_OPEN
+
+            # 半开状态同一时间只放行一个探测请求
+            if state["state"] == HALF_OPEN and key not in self._probing:
+                self._probing.add(key)
+                print(f"🔎 熔断探测: {key}")
+                return
+
+            self.skipped[key] = self.skipped.get(key, 0) + 1
+        raise CircuitOpenError(f"接口熔断中，跳过: {key} (剩余冷却 {max(remaining, 0):.0f}秒)")
+
+    def release_probe(self, key):
+        """请求没有得出结果就结束时（如超出整体时间预算）释放半开探测名额，不计成功或失败"""
+        with self._lock:
+            self._probing.discard(key)
+
+    def record_success(self, key):
+        with self._lock:
+            self._probing.discard(key)
+            state = self._states.get(key)
+            if not state:
+                return
+            changed = state["state"] != CLOSED
+            self._failures_before_success[key] = state["failures"]
+            state.update({"state": CLOSED, "failures": 0, "cooldown": self.cooldown, "last_error": ""})
+        if changed:
+            print(f"✅ 接口恢复: {key}")
+            self.save()
+
+    def record_failure(self, key, reason="", after_success=False):
+        """记录一次失败
+
+        Args:
+            after_success: 请求本身成功但内容无效时为True，
+                撤销刚才record_success对失败计数的清零
+        """
+        with self._lock:
+            was_probing = key in self._probing
+            self._probing.discard(key)
+            state = self._state(key)
+            if after_success:
+                state["failures"] = self._failures_before_success.pop(key, state["failures"])
+            state["failures"] += 1
+            state["last_error"] = str(reason)[:200]
+
+            if was_probing:
+                # 探测失败，冷却时间加倍
+                state["cooldown"] = min(state["cooldown"] * 2, self.max_cooldown)
+            elif state["state"] == OPEN or state["failures"] < self.failure_threshold:
+                return
+
+            state["state"] = OPEN
+            state["opened_at"] = time.time()
+            cooldown = state["cooldown"]
+        print(f"⛔ 接口熔断: {key} ({cooldown:.0f}秒内跳过) - {reason}")
+        self.save()
+
+    def stats(self):
+        """当前非关闭状态的接口及本次运行跳过次数"""
+        with self._lock:
+            return {
+                key: {
+                    "state": state["state"],
+                    "failures": state["failures"],
+                    "skipped": self.skipped.get(key, 0),
+                    "last_error": state["last_error"]
+                }
+                for key, state in self._states.items()
+                if state["state"] != CLOSED or key in self.skipped
+            }
@@ -0,0 +1,55 @@
+"""
+整体截止时间
+在deadline_scope内发出的所有请求共享同一个时间预算，
+每次请求的超时不超过剩余时间。通过contextvars传递，线程池中同样生效。
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+import requests
+
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(requests.Timeout):
+    """整体时间预算已用完"""
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """设置整体时间预算，seconds为None时不限制；嵌套时不会晚于外层的截止时间"""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time():
+    """剩余秒数，没有设置预算时返回None"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def clamp_timeout(timeout, left):
+    """把requests的timeout(数字或(连接, 读取)元组)限制在剩余时间内
+
+    Returns:
+        (新的timeout, 是否被截短)
+    """
+    if timeout is None:
+        return left, True
+    if isinstance(timeout, tuple):
+        clamped = tuple(left if value is None else min(value, left) for value in timeout)
+        return clamped, clamped != timeout
+    return min(timeout, left), left < timeout
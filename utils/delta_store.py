@@ -0,0 +1,365 @@
+"""
+增量快照存储
+高频采集时相邻快照大部分相同：同样的视频、仓库反复上榜，只有名次和指标小幅变化。
+这里每隔若干次保存一个完整的关键帧，其余只记录与上一次的差异:
+    entered 新上榜的条目 / left 下榜的条目键 / moved 名次变化 / changed 字段变化
+条目按 bvid、头条ClusterId（id）、仓库URL 等区分。
+每个关键帧开启一个分段文件 data/deltas/YYYYMMDD_HHMMSS.ndjson，每次采集追加一行；
+重建任意时刻的快照只需读取所在分段：关键帧 + 至多 keyframe_interval 个增量。
+"""
+import bisect
+import json
+import os
+from datetime import datetime
+
+from utils.stream_writer import is_stream_file, load_stream
+
+# 条目键的候选字段，按顺序取第一个非空值
+DELTA_KEY_FIELDS = ("bvid", "id", "url", "keyword", "word", "query", "title")
+
+SEGMENT_SUFFIX = ".ndjson"
+
+
+def record_key(record, position):
+    for field in DELTA_KEY_FIELDS:
+        value = record.get(field)
+        if value not in (None, ""):
+            return str(value)
+    return f"#{position}"
+
+
+def _flatten(value, prefix=()):
+    """嵌套字典展开为 {路径元组: 叶子值}，列表整体作为叶子"""
+    if isinstance(value, dict) and value:
+        flat = {}
+        for key, child in value.items():
+            flat.update(_flatten(child, prefix + (key,)))
+        return flat
+    return {prefix: value}
+
+
+def diff_dict(old, new):
+    """字典的差异: {"set": [[路径, 值]], "unset": [路径]}，没有差异返回None"""
+    old_flat, new_flat = _flatten(old), _flatten(new)
+    changes = {}
+    updated = [[list(path), value] for path, value in new_flat.items()
+               if path not in old_flat or old_flat[path] != value]
+    removed = [list(path) for path in old_flat if path not in new_flat]
+    if updated:
+        changes["set"] = updated
+    if removed:
+        changes["unset"] = removed
+    return changes or None
+
+
+def apply_dict_diff(value, changes):
+    """把diff_dict的结果应用到value（原地修改）并返回"""
+    for path in changes.get("unset", []):
+        if not path:
+            value = {}
+            continue
+        parents = [value]
+        for key in path[:-1]:
+            parent = parents[-1].get(key) if isinstance(parents[-1], dict) else None
+            parents.append(parent)
+        if not isinstance(parents[-1], dict):
+            continue
+        parents[-1].pop(path[-1], None)
+        # 删除后变空的中间层一并删除，确实为空字典的字段会在下面的set中恢复
+        for depth in range(len(path) - 1, 0, -1):
+            if parents[depth]:
+                break
+            parents[depth - 1].pop(path[depth - 1], None)
+    for path, leaf in changes.get("set", []):
+        if not path:
+            value = leaf
+            continue
+        parent = value
+        for key in path[:-1]:
+            if not isinstance(parent.get(key), dict):
+                parent[key] = {}
+            parent = parent[key]
+        parent[path[-1]] = leaf
+    return value
+
+
+def split_boards(payload):
+    """把快照拆成 榜单 {"平台/类别": [条目]} 和其余的元数据"""
+    meta = {key: value for key, value in payload.items() if key != "data"}
+    boards = {}
+    other = {}
+    for platform, value in (payload.get("data") or {}).items():
+        if isinstance(value, list):
+            boards[platform] = value
+            continue
+        if not isinstance(value, dict):
+            other[platform] = value
+            continue
+        # 先占位，保留平台顺序和空的平台
+        other[platform] = {}
+        for kind, records in value.items():
+            if isinstance(records, list) and all(isinstance(record, dict) for record in records):
+                boards[f"{platform}/{kind}"] = records
+            else:
+                other[platform][kind] = records
+    meta["data"] = other
+    return boards, meta
+
+
+def join_boards(boards, meta):
+    """split_boards的逆操作"""
+    payload = {key: value for key, value in meta.items() if key != "data"}
+    data = json.loads(json.dumps(meta.get("data", {})))
+    for name, records in boards.items():
+        platform, _, kind = name.partition("/")
+        if kind:
+            data.setdefault(platform, {})[kind] = records
+        else:
+            data[platform] = records
+    payload["data"] = data
+    return payload
+
+
+def _keyed(records):
+    """[条目] -> [(键, 条目)]，同一榜单内重复的键加序号区分"""
+    seen = {}
+    keyed = []
+    for position, record in enumerate(records, 1):
+        key = record_key(record, position)
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        keyed.append((key if count == 0 else f"{key}#{count}", record))
+    return keyed
+
+
+def diff_board(old_records, new_records):
+    """两次榜单的差异，没有差异返回None
+
+    entered: [[新位置, 键, 条目]]，left: [键]，moved: {键: 新位置}，changed: {键: 字段差异}
+    未出现在moved中的留榜条目位置不变
+    """
+    old_keyed = _keyed(old_records)
+    old = dict(old_keyed)
+    old_position = {key: position for position, (key, _) in enumerate(old_keyed)}
+    new_keyed = _keyed(new_records)
+    new_keys = {key for key, _ in new_keyed}
+
+    left = [key for key, _ in old_keyed if key not in new_keys]
+    entered, moved, changed = [], {}, {}
+    for position, (key, record) in enumerate(new_keyed):
+        if key not in old:
+            entered.append([position, key, record])
+            continue
+        if old_position[key] != position:
+            moved[key] = position
+        changes = diff_dict(old[key], record)
+        if changes:
+            changed[key] = changes
+
+    delta = {}
+    for name, value in (("entered", entered), ("left", left), ("moved", moved), ("changed", changed)):
+        if value:
+            delta[name] = value
+    return delta or None
+
+
+def apply_board(records, delta):
+    """把diff_board的结果应用到旧榜单，返回新榜单"""
+    old_keyed = _keyed(records)
+    keyed = dict(old_keyed)
+    left = set(delta.get("left", []))
+    moved = delta.get("moved", {})
+    entered = delta.get("entered", [])
+
+    slots = [None] * (len(old_keyed) - len(left) + len(entered))
+    for position, key, record in entered:
+        keyed[key] = json.loads(json.dumps(record))
+        slots[position] = key
+    for key, position in moved.items():
+        slots[position] = key
+    for position, (key, _) in enumerate(old_keyed):
+        if key not in left and key not in moved:
+            slots[position] = key
+
+    for key, changes in delta.get("changed", {}).items():
+        keyed[key] = apply_dict_diff(keyed[key], changes)
+    return [keyed[key] for key in slots]
+
+
+class DeltaStore:
+    """关键帧 + 增量的快照存储
+
+    Args:
+        root: 分段文件目录
+        keyframe_interval: 每个分段最多多少个增量，之后写新的关键帧
+        fsync: 每次追加后是否fsync
+    """
+
+    def __init__(self, root="data/deltas", keyframe_interval=48, fsync=True):
+        self.root = root
+        self.keyframe_interval = keyframe_interval
+        self.fsync = fsync
+        self._head = None
+
+    def segments(self):
+        """按时间排序的分段文件名"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if name.endswith(SEGMENT_SUFFIX))
+
+    def _read_segment(self, name, until=None):
+        """按顺序重建分段内的快照，产出 (时间, 快照, 该行字节数)；until之后的行不再读取"""
+        boards, meta = None, None
+        with open(os.path.join(self.root, name), "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 崩溃时可能留下不完整的最后一行
+                    break
+                if until is not None and entry["t"] > until:
+                    break
+                if entry["type"] == "keyframe":
+                    boards, meta = entry["boards"], entry["meta"]
+                else:
+                    for board, delta in entry.get("boards", {}).items():
+                        if delta is None:
+                            boards.pop(board, None)
+                        else:
+                            boards[board] = apply_board(boards.get(board, []), delta)
+                    if entry.get("meta"):
+                        meta = apply_dict_diff(meta, entry["meta"])
+                yield entry["t"], boards, meta, len(line.encode("utf-8"))
+
+    def _repair_tail(self, name):
+        """截掉崩溃留下的不完整尾行，否则之后追加的行都会接在坏行后面而读不到
+
+        Returns:
+            分段是否还有内容（连关键帧都不完整时删除该分段）
+        """
+        path = os.path.join(self.root, name)
+        good = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    try:
+                        json.loads(line)
+                    except ValueError:
+                        break
+                good += len(line)
+            size = f.seek(0, os.SEEK_END)
+        if good == size:
+            return True
+        if good == 0:
+            print(f"⚠️ 增量分段 {name} 的关键帧不完整，已删除")
+            os.remove(path)
+            return False
+        print(f"⚠️ 增量分段 {name} 末尾不完整，已截掉 {size - good} 字节")
+        with open(path, "r+b") as f:
+            f.truncate(good)
+            f.flush()
+            os.fsync(f.fileno())
+        return True
+
+    def _load_head(self):
+        """当前分段的最新状态: (分段名, 增量数, 榜单, 元数据)"""
+        if self._head is None:
+            segments = self.segments()
+            while segments and not self._repair_tail(segments[-1]):
+                segments.pop()
+            self._head = (None, 0, None, None)
+            if segments:
+                count, boards, meta = -1, None, None
+                for _, boards, meta, _ in self._read_segment(segments[-1]):
+                    count += 1
+                if boards is not None:
+                    self._head = (segments[-1], count, boards, meta)
+        return self._head
+
+    def append(self, payload):
+        """保存一次快照，返回 (类型 keyframe/delta, 写入字节数, 分段引用 "分段文件#时间")"""
+        captured_at = datetime.fromisoformat(payload["timestamp"]).replace(microsecond=0).isoformat()
+        boards, meta = split_boards(json.loads(json.dumps(payload, ensure_ascii=False)))
+        segment, count, head_boards, head_meta = self._load_head()
+
+        if segment is None or count >= self.keyframe_interval:
+            segment = datetime.fromisoformat(captured_at).strftime("%Y%m%d_%H%M%S") + SEGMENT_SUFFIX
+            entry = {"type": "keyframe", "t": captured_at, "boards": boards, "meta": meta}
+            count = 0
+        else:
+            board_deltas = {}
+            # 按上一帧的顺序、新榜单追加在后，与重建时的顺序一致；不能用集合，其迭代顺序每次运行都可能不同
+            order = list(dict.fromkeys([*head_boards, *boards]))
+            for board in order:
+                if board not in boards:
+                    board_deltas[board] = None
+                    continue
+                delta = diff_board(head_boards.get(board, []), boards[board])
+                if delta:
+                    board_deltas[board] = delta
+            boards = {board: boards[board] for board in order if board in boards}
+            entry = {"type": "delta", "t": captured_at, "boards": board_deltas}
+            meta_changes = diff_dict(head_meta, meta)
+            if meta_changes:
+                entry["meta"] = meta_changes
+            count += 1
+
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, segment), "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+        self._head = (segment, count, boards, meta)
+        return entry["type"], len(line.encode("utf-8")), f"{segment}#{captured_at}"
+
+    def rebuild(self, at=None):
+        """重建at时刻（含）之前最近一次的快照，at默认最新；没有时返回None"""
+        segments = self.segments()
+        if not segments:
+            return None
+        if at is None:
+            name = segments[-1]
+        else:
+            if isinstance(at, str):
+                at = datetime.fromisoformat(at)
+            at = at.replace(microsecond=0).isoformat()
+            index = bisect.bisect_right(segments, at.replace("-", "").replace(":", "").replace("T", "_")
+                                        + SEGMENT_SUFFIX) - 1
+            if index < 0:
+                return None
+            name = segments[index]
+
+        result = None
+        for _, boards, meta, _ in self._read_segment(name, until=at):
+            result = (boards, meta)
+        return join_boards(*result) if result else None
+
+    def stats(self):
+        """分段数、关键帧和增量数量及字节数"""
+        stats = {"segments": 0, "keyframes": 0, "deltas": 0, "keyframe_bytes": 0, "delta_bytes": 0}
+        for name in self.segments():
+            stats["segments"] += 1
+            with open(os.path.join(self.root, name), "r", encoding="utf-8") as f:
+                for index, line in enumerate(f):
+                    kind = "keyframe" if index == 0 else "delta"
+                    stats[f"{kind}s"] += 1
+                    stats[f"{kind}_bytes"] += len(line.encode("utf-8"))
+        return stats
+
+
+def load_snapshot(path):
+    """读取快照: 普通JSON文件、流式写入的NDJSON(.gz)，或增量存储的引用 "data/deltas/分段.ndjson#时间" """
+    if "#" in path:
+        segment_path, captured_at = path.split("#", 1)
+        return DeltaStore(os.path.dirname(segment_path)).rebuild(at=captured_at)
+    if is_stream_file(path):
+        return load_stream(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,364 @@
+"""
+带类型声明的快速JSON解码
+每个接口用Schema子类声明需要的字段，解码时直接生成只含这些字段的紧凑记录，
+未声明的字段（owner、rights等大对象里的其余内容）不会变成Python对象，类型在同一遍里校验。
+
+后端优先级: msgspec（直接解码成Struct） > orjson > 标准库json（解析后按Schema遍历）。
+各后端返回的记录都用属性访问，字段和取值完全一致。
+"""
+import json
+from typing import List, Optional, Union, get_args, get_origin
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ("msgspec", "orjson", "json")
+
+_MISSING = object()
+
+
+class SchemaError(ValueError):
+    """JSON无法解析或字段类型与Schema不符"""
+
+
+class Schema:
+    """接口响应结构声明
+
+    用类注解声明字段，类属性作为缺省值，没有缺省值的字段是必填的:
+
+        class Stat(Schema):
+            view: int = 0
+
+        class Video(Schema):
+            bvid: str
+            stat: Stat
+
+    支持的类型: int / float / str / bool、Schema子类、List[...]、Optional[...]。
+    int字段兼容整数值的浮点数和数字字符串（如头条的"HotValue": "123"），float字段兼容数字字符串；
+    bool字段只接受true/false。各后端按同样的规则转换，结果一致。
+    有缺省值的字段为null时同样取缺省值；Schema类型的字段可以用空记录作缺省值（如 owner: Owner = Owner()），
+    这样单个条目缺字段或字段为null时不会导致整个响应解码失败。
+    """
+
+    _fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = {}
+        for klass in reversed(cls.__mro__):
+            for name, annotation in klass.__dict__.get("__annotations__", {}).items():
+                fields[name] = (annotation, getattr(cls, name, _MISSING))
+        cls._fields = tuple((name, annotation, default) for name, (annotation, default) in fields.items())
+
+    def __init__(self, **values):
+        for name, _, default in self._fields:
+            value = values.get(name, _MISSING)
+            if value is _MISSING or (value is None and default is not _MISSING):
+                if default is _MISSING:
+                    raise SchemaError(f"{type(self).__name__} 缺少字段: {name}")
+                value = _fresh_default(default, lambda schema: schema())
+            setattr(self, name, list(value) if isinstance(value, list) else value)
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name, _, _ in self._fields)
+        return f"{type(self).__name__}({values})"
+
+
+def available_backends():
+    """当前环境可用的后端，按速度从快到慢"""
+    result = []
+    if msgspec is not None:
+        result.append("msgspec")
+    if orjson is not None:
+        result.append("orjson")
+    result.append("json")
+    return result
+
+
+def resolve_backend(name=None):
+    """返回要使用的后端名称，None表示自动选择最快的"""
+    backends = available_backends()
+    if name is None:
+        return backends[0]
+    if name not in backends:
+        raise ValueError(f"JSON后端不可用: {name} (可用: {', '.join(backends)})")
+    return name
+
+
+def decode(data, schema, backend=None):
+    """把JSON文本（bytes或str）按schema解码成记录
+
+    Raises:
+        SchemaError: JSON格式错误或字段类型不符
+    """
+    backend = resolve_backend(backend)
+    if backend == "msgspec":
+        try:
+            return _fixer(schema)(_msgspec_decoder(schema).decode(data))
+        except msgspec.DecodeError as e:
+            raise SchemaError(f"{schema.__name__}: {e}") from e
+
+    try:
+        raw = orjson.loads(data) if backend == "orjson" else json.loads(data)
+    except ValueError as e:
+        raise SchemaError(f"{schema.__name__}: JSON格式错误: {e}") from e
+    return _converter(schema)(raw)
+
+
+def decode_response(response, schema, backend=None):
+    """按schema解码HTTP响应正文，代替response.json()"""
+    return decode(response.content, schema, backend)
+
+
+def to_builtins(record):
+    """把解码出的记录转换回dict/list，便于保存或比较"""
+    if msgspec is not None and isinstance(record, msgspec.Struct):
+        return msgspec.to_builtins(record)
+    if isinstance(record, Schema):
+        return {name: to_builtins(getattr(record, name)) for name, _, _ in record._fields}
+    if isinstance(record, list):
+        return [to_builtins(item) for item in record]
+    return record
+
+
+def _fresh_default(default, empty_record):
+    """缺省值的新副本: 列表复制一份，Schema缺省值换成该后端的空记录"""
+    if isinstance(default, Schema):
+        return empty_record(type(default))
+    if isinstance(default, list):
+        return list(default)
+    return default
+
+
+def _optional_inner(annotation):
+    """Optional[X] 返回X，否则返回None"""
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1 and len(get_args(annotation)) == 2:
+            return args[0]
+    return None
+
+
+# ---------- msgspec ----------
+
+_structs = {}
+_decoders = {}
+_fixers = {}
+
+
+def _msgspec_type(annotation):
+    """Schema注解对应的msgspec类型；int/float字段放宽为联合类型，解码后由_fixer按统一规则转换"""
+    if isinstance(annotation, type) and issubclass(annotation, Schema):
+        return _struct_for(annotation)
+    inner = _optional_inner(annotation)
+    if inner is not None:
+        return Optional[_msgspec_type(inner)]
+    if get_origin(annotation) is list:
+        return List[_msgspec_type(get_args(annotation)[0])]
+    if annotation is int:
+        return Union[int, float, str]
+    if annotation is float:
+        return Union[float, str]
+    return annotation
+
+
+def _struct_for(schema):
+    struct = _structs.get(schema)
+    if struct is None:
+        fields = []
+        for name, annotation, default in schema._fields:
+            if default is _MISSING:
+                fields.append((name, _msgspec_type(annotation)))
+            else:
+                # 有缺省值的字段允许null，由_fixer换成缺省值；Schema缺省值同样先解码为None
+                fields.append((name, Optional[_msgspec_type(annotation)],
+                               None if isinstance(default, Schema) else default))
+        # kw_only: 必填字段可以排在有缺省值的字段之后
+        struct = msgspec.defstruct(schema.__name__, fields, kw_only=True)
+        _structs[schema] = struct
+    return struct
+
+
+def _msgspec_decoder(schema):
+    decoder = _decoders.get(schema)
+    if decoder is None:
+        decoder = msgspec.json.Decoder(_struct_for(schema))
+        _decoders[schema] = decoder
+    return decoder
+
+
+def _fixer(annotation):
+    """解码后的修正: 数字转换、null换成缺省值，规则与_converter相同；返回None表示该类型无需修正"""
+    if annotation in _fixers:
+        return _fixers[annotation]
+
+    if annotation is int:
+        fixer = _convert_int
+    elif annotation is float:
+        fixer = _convert_float
+    elif isinstance(annotation, type) and issubclass(annotation, Schema):
+        fixer = _struct_fixer(annotation)
+    elif _optional_inner(annotation) is not None:
+        inner = _fixer(_optional_inner(annotation))
+        fixer = None if inner is None else (lambda value: None if value is None else inner(value))
+    elif get_origin(annotation) is list:
+        item = _fixer(get_args(annotation)[0])
+        fixer = None if item is None else (lambda value: _fix_list(item, value))
+    else:
+        fixer = None
+
+    _fixers[annotation] = fixer
+    return fixer
+
+
+def _fix_list(item, value):
+    for index, element in enumerate(value):
+        try:
+            value[index] = item(element)
+        except SchemaError as e:
+            raise SchemaError(f"[{index}] {e}") from None
+    return value
+
+
+def _struct_fixer(schema):
+    fields = []
+
+    def fixer(record):
+        for name, fix, default in fields:
+            value = getattr(record, name)
+            if value is None and default is not _MISSING:
+                setattr(record, name, _fresh_default(default, _empty_struct))
+                continue
+            if fix is not None:
+                try:
+                    setattr(record, name, fix(value))
+                except SchemaError as e:
+                    raise SchemaError(f"{schema.__name__}.{name}: {e}") from None
+        return record
+
+    # 先占位，允许Schema引用自身
+    _fixers[schema] = fixer
+    fields.extend((name, _fixer(annotation), default) for name, annotation, default in schema._fields)
+    return fixer
+
+
+def _empty_struct(schema):
+    return _fixer(schema)(msgspec.convert({}, _struct_for(schema)))
+
+
+# ---------- orjson / json 解析后按Schema遍历 ----------
+
+_converters = {}
+
+
+def _fail(expected, value):
+    raise SchemaError(f"期望 {expected}，实际为 {type(value).__name__}: {value!r:.50}")
+
+
+def _convert_int(value):
+    if type(value) is int:
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    _fail("int", value)
+
+
+def _convert_float(value):
+    if type(value) in (int, float):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    _fail("float", value)
+
+
+def _convert_str(value):
+    if isinstance(value, str):
+        return value
+    _fail("str", value)
+
+
+def _convert_bool(value):
+    if isinstance(value, bool):
+        return value
+    _fail("bool", value)
+
+
+_SCALAR_CONVERTERS = {
+    int: _convert_int,
+    float: _convert_float,
+    str: _convert_str,
+    bool: _convert_bool
+}
+
+
+def _converter(annotation):
+    converter = _converters.get(annotation)
+    if converter is not None:
+        return converter
+
+    if annotation in _SCALAR_CONVERTERS:
+        converter = _SCALAR_CONVERTERS[annotation]
+    elif isinstance(annotation, type) and issubclass(annotation, Schema):
+        converter = _record_converter(annotation)
+    elif _optional_inner(annotation) is not None:
+        inner = _converter(_optional_inner(annotation))
+        converter = lambda value: None if value is None else inner(value)
+    elif get_origin(annotation) is list:
+        item = _converter(get_args(annotation)[0])
+
+        def converter(value):
+            if not isinstance(value, list):
+                _fail("list", value)
+            result = []
+            for index, element in enumerate(value):
+                try:
+                    result.append(item(element))
+                except SchemaError as e:
+                    raise SchemaError(f"[{index}] {e}") from None
+            return result
+    else:
+        raise TypeError(f"Schema不支持的字段类型: {annotation!r}")
+
+    _converters[annotation] = converter
+    return converter
+
+
+def _record_converter(schema):
+    # 先占位，允许Schema引用自身
+    fields = []
+
+    def converter(value):
+        if not isinstance(value, dict):
+            _fail("object", value)
+        record = object.__new__(schema)
+        for name, convert, default in fields:
+            raw = value.get(name, _MISSING)
+            if raw is _MISSING or (raw is None and default is not _MISSING):
+                if default is _MISSING:
+                    raise SchemaError(f"{schema.__name__} 缺少字段: {name}")
+                setattr(record, name, _fresh_default(default, lambda schema: _converter(schema)({})))
+                continue
+            try:
+                setattr(record, name, convert(raw))
+            except SchemaError as e:
+                raise SchemaError(f"{schema.__name__}.{name}: {e}") from None
+        return record
+
+    _converters[schema] = converter
+    fields.extend((name, _converter(annotation), default) for name, annotation, default in schema._fields)
+    return converter
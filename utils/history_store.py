@@ -0,0 +1,273 @@
+"""
+热点历史库（SQLite, WAL模式）
+每次收集写入一条快照及其全部条目，按平台、条目键和时间建索引；
+查询某平台某时间段的条目、某条目的上榜轨迹都不需要再打开历史JSON文件。
+已有的JSON文件可以一次性导入: python utils/history_store.py --import data
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.delta_store import load_snapshot
+from utils.stream_writer import RUN_FILE, is_stream_file
+
+# 条目键的候选字段，按顺序取第一个非空值
+ITEM_KEY_FIELDS = ("bvid", "url", "id", "keyword", "word", "query", "title")
+
+# 热度的候选字段，按顺序取第一个数值
+HEAT_FIELDS = ("hot_value", "heat", "hot", "view", "stars", "play_count")
+
+TITLE_FIELDS = ("title", "keyword", "show_name", "word", "query")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    captured_at TEXT NOT NULL,
+    source TEXT UNIQUE,
+    item_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE,
+    captured_at TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    rank INTEGER,
+    title TEXT,
+    url TEXT,
+    heat REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_platform_key_time ON items(platform, item_key, captured_at);
+CREATE INDEX IF NOT EXISTS idx_items_platform_time ON items(platform, captured_at);
+CREATE INDEX IF NOT EXISTS idx_items_snapshot ON items(snapshot_id);
+CREATE INDEX IF NOT EXISTS idx_snapshots_time ON snapshots(captured_at);
+"""
+
+
+def normalize_time(value):
+    """各种时间写法统一为本地时间 YYYY-MM-DDTHH:MM:SS，便于按字符串比较范围
+
+    带时区的时间先换算成本地时间再去掉时区，与收集器写入的本地时间可以直接比较
+    """
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.replace(microsecond=0).isoformat()
+
+
+def _first(record, fields, accept):
+    for field in fields:
+        value = record.get(field)
+        if value not in (None, "") and accept(value):
+            return value
+    return None
+
+
+def item_fields(record, position):
+    """条目的通用列: item_key / rank / title / url / heat，position为条目在榜单中的位置（从1开始）"""
+    rank = record.get("rank")
+    return {
+        "item_key": str(_first(record, ITEM_KEY_FIELDS, lambda v: True) or position),
+        "rank": rank if isinstance(rank, int) else position,
+        "title": _first(record, TITLE_FIELDS, lambda v: isinstance(v, str)),
+        "url": record.get("url"),
+        "heat": _first(record, HEAT_FIELDS, lambda v: isinstance(v, (int, float)) and not isinstance(v, bool))
+    }
+
+
+def iter_records(payload):
+    """遍历快照中的条目，产出 (平台, 类别, 条目)
+
+    支持四种文件结构:
+        收集器:     {"data": {平台: {类别: [条目]}}}
+        多平台脚本: {"data": {平台: [条目]}}
+        单个爬虫:   {"platform": 平台, "data": [条目]}
+                    {"platform": 平台, "data": {类别: [条目]}}
+    """
+    data = payload.get("data")
+    if isinstance(data, list):
+        groups = {payload.get("platform", "unknown"): {"items": data}}
+    elif isinstance(data, dict) and payload.get("platform"):
+        groups = {payload["platform"]: data}
+    elif isinstance(data, dict):
+        groups = {platform: value if isinstance(value, dict) else {"items": value}
+                  for platform, value in data.items()}
+    else:
+        return
+
+    for platform, kinds in groups.items():
+        for kind, records in kinds.items():
+            if not isinstance(records, list):
+                continue
+            for record in records:
+                if isinstance(record, dict):
+                    yield platform, kind, record
+
+
+class HistoryStore:
+    """SQLite历史库
+
+    写入在一个事务内批量完成；WAL模式下写入时报表等读取方不会被阻塞。
+
+    Args:
+        db_path: 数据库文件
+    """
+
+    def __init__(self, db_path="data/history.db"):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def save_snapshot(self, payload, captured_at=None, source=None):
+        """写入一次收集结果，返回快照ID；source已导入过时跳过并返回None
+
+        Args:
+            payload: 收集结果（结构见iter_records）
+            captured_at: 收集时间，默认取payload["timestamp"]
+            source: 来源标识（如JSON文件名），用于导入去重
+        """
+        captured_at = normalize_time(captured_at or payload.get("timestamp") or datetime.now())
+        rows = []
+        ranks = {}
+        for platform, kind, record in iter_records(payload):
+            position = ranks[(platform, kind)] = ranks.get((platform, kind), 0) + 1
+            fields = item_fields(record, position)
+            rows.append((
+                captured_at, platform, kind,
+                fields["item_key"], fields["rank"], fields["title"], fields["url"], fields["heat"],
+                json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+            ))
+
+        with self._lock, self.conn:
+            try:
+                cursor = self.conn.execute(
+                    "INSERT INTO snapshots (captured_at, source, item_count) VALUES (?, ?, ?)",
+                    (captured_at, source, len(rows)))
+            except sqlite3.IntegrityError:
+                return None
+            snapshot_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO items (snapshot_id, captured_at, platform, kind, item_key, rank, title, url, heat, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(snapshot_id,) + row for row in rows])
+        return snapshot_id
+
+    def query(self, platform, start=None, end=None, kind=None, item_key=None, limit=None):
+        """按平台和时间范围查询条目，按时间、类别、名次排序
+
+        Args:
+            start / end: 时间范围（含两端），datetime或ISO字符串
+        Returns:
+            [{"captured_at", "platform", "kind", "item_key", "rank", "title", "url", "heat", "data"}]
+        """
+        sql = ["SELECT captured_at, platform, kind, item_key, rank, title, url, heat, data FROM items "
+               "WHERE platform = ?"]
+        args = [platform]
+        if item_key is not None:
+            sql.append("AND item_key = ?")
+            args.append(item_key)
+        if start is not None:
+            sql.append("AND captured_at >= ?")
+            args.append(normalize_time(start))
+        if end is not None:
+            sql.append("AND captured_at <= ?")
+            args.append(normalize_time(end))
+        if kind is not None:
+            sql.append("AND kind = ?")
+            args.append(kind)
+        sql.append("ORDER BY captured_at, kind, rank")
+        if limit is not None:
+            sql.append("LIMIT ?")
+            args.append(limit)
+
+        with self._lock:
+            rows = self.conn.execute(" ".join(sql), args).fetchall()
+        result = []
+        for row in rows:
+            item = dict(row)
+            item["data"] = json.loads(item["data"])
+            result.append(item)
+        return result
+
+    def item_history(self, platform, item_key, start=None, end=None):
+        """某个条目（bvid、仓库URL等）每次上榜的名次和热度"""
+        return [{key: row[key] for key in ("captured_at", "kind", "rank", "heat")}
+                for row in self.query(platform, start=start, end=end, item_key=item_key)]
+
+    def snapshots(self, start=None, end=None):
+        """时间范围内的快照列表 [{"id", "captured_at", "source", "item_count"}]"""
+        sql, args = "SELECT id, captured_at, source, item_count FROM snapshots WHERE 1 = 1", []
+        if start is not None:
+            sql += " AND captured_at >= ?"
+            args.append(normalize_time(start))
+        if end is not None:
+            sql += " AND captured_at <= ?"
+            args.append(normalize_time(end))
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql + " ORDER BY captured_at", args)]
+
+    def import_json_files(self, data_dir="data"):
+        """一次性导入历史JSON文件（含日期目录 YYYY/MM/DD/ 下的快照，以及流式写入的NDJSON(.gz)），
+        已导入的文件（按文件名）跳过；未完成的运行文件不导入
+
+        Returns:
+            (导入文件数, 导入条目数)
+        """
+        files = []
+        for root, dirs, names in os.walk(data_dir):
+            # 只进入日期目录，跳过http_cache等
+            dirs[:] = [name for name in dirs if name.isdigit()]
+            files.extend((name, os.path.join(root, name)) for name in names
+                         if (name.endswith(".json") or is_stream_file(name))
+                         and not name.startswith((".", RUN_FILE)) and "_" in name)
+        files.sort()
+        imported, items = 0, 0
+        for name, path in files:
+            try:
+                payload = load_snapshot(path)
+                if not isinstance(payload, dict) or "data" not in payload or "timestamp" not in payload:
+                    continue
+                snapshot_id = self.save_snapshot(payload, source=name)
+            except Exception as e:
+                print(f"⚠️ 导入失败 {name}: {e}")
+                continue
+            if snapshot_id is not None:
+                imported += 1
+                items += sum(1 for _ in iter_records(payload))
+        print(f"📥 导入 {imported} 个快照文件，共 {items} 条记录")
+        return imported, items
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="热点历史库")
+    parser.add_argument("--db", default="data/history.db", help="数据库文件")
+    parser.add_argument("--import", dest="import_dir", default=None, help="导入该目录下的历史JSON文件")
+    args = parser.parse_args()
+
+    store = HistoryStore(args.db)
+    if args.import_dir:
+        store.import_json_files(args.import_dir)
+    for snapshot in store.snapshots()[-5:]:
+        print(f"  {snapshot['captured_at']}  {snapshot['item_count']:4} 条  {snapshot['source'] or ''}")
+    store.close()
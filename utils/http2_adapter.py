@@ -0,0 +1,174 @@
+"""
+HTTP/2 传输适配器（可选，依赖 httpx[http2]）
+作为requests的传输适配器挂载到Session上，同一主机的并发请求在一条连接上多路复用；
+服务器不支持HTTP/2时httpx通过ALPN自动退回HTTP/1.1，带代理的请求交给原来的HTTP/1.1连接池。
+上层的限流、缓存、熔断、正文上限等逻辑不受影响，拿到的仍是requests.Response。
+"""
+import http.client
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import h2  # noqa: F401  httpx的http2=True需要
+    import httpx
+except ImportError:
+    httpx = None
+
+# HTTP/2禁止逐跳首部，requests默认会带上Connection: keep-alive
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"}
+
+
+def http2_available():
+    """是否安装了httpx和h2"""
+    return httpx is not None
+
+
+class Http2Adapter(BaseAdapter):
+    """基于httpx的requests传输适配器
+
+    Args:
+        fallback: 带代理的请求改用的HTTP/1.1适配器
+        http1: 是否允许HTTP/1.1；False时对http://地址直接使用HTTP/2（h2c，需服务器支持）
+        max_connections: 连接总数上限
+        verify: 是否校验证书（httpx在创建时配置，单次请求的verify参数无效）
+    """
+
+    def __init__(self, fallback=None, http1=True, max_connections=100, verify=True):
+        if httpx is None:
+            raise ImportError("HTTP/2需要安装 httpx[http2]")
+        super().__init__()
+        self.fallback = fallback
+        self.client = httpx.Client(
+            http1=http1, http2=True, verify=verify, follow_redirects=False, trust_env=False,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if proxies and self.fallback is not None:
+            proxy = proxies.get(urlsplit(request.url).scheme) or proxies.get("all")
+            if proxy:
+                return self.fallback.send(request, stream=stream, timeout=timeout, verify=verify,
+                                          cert=cert, proxies=proxies)
+
+        headers = [(name, value) for name, value in request.headers.items()
+                   if name.lower() not in HOP_BY_HOP_HEADERS]
+        outgoing = self.client.build_request(request.method, request.url, headers=headers,
+                                             content=request.body, timeout=self._timeout(timeout))
+        try:
+            upstream = self.client.send(outgoing, stream=True)
+        except httpx.ConnectTimeout as e:
+            raise requests.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.ReadTimeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(e, request=request)
+
+        self._record(upstream)
+        response = self._build_response(request, upstream)
+        if not stream:
+            response.content
+        return response
+
+    def _timeout(self, timeout):
+        """requests的timeout（秒或(连接, 读取)元组）转换为httpx.Timeout"""
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(connect=connect, read=read, write=read, pool=connect)
+        return httpx.Timeout(timeout)
+
+    def _build_response(self, request, upstream):
+        response = requests.Response()
+        response.status_code = upstream.status_code
+        response.reason = upstream.reason_phrase
+        response.headers = CaseInsensitiveDict(upstream.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = str(upstream.url)
+        response.request = request
+        response.connection = self
+        response.raw = _StreamBody(upstream)
+        response.http_version = upstream.http_version
+        return response
+
+    def _record(self, upstream):
+        url = upstream.url
+        host = url.host if url.port in (None, 80, 443) else f"{url.host}:{url.port}"
+        # 同一连接上的请求共享network_stream，据此统计实际建立的连接数
+        stream = upstream.extensions.get("network_stream")
+        with self._lock:
+            entry = self._hosts.setdefault(host, {"requests": 0, "connections": set(), "http_version": None})
+            entry["requests"] += 1
+            entry["connections"].add(id(stream) if stream is not None else entry["requests"])
+            entry["http_version"] = upstream.http_version
+
+    def connection_stats(self):
+        """连接复用统计: {主机: {requests, connections, reused, http_version}}"""
+        with self._lock:
+            stats = {}
+            for host, entry in self._hosts.items():
+                connections = len(entry["connections"])
+                stats[host] = {
+                    "requests": entry["requests"],
+                    "connections": connections,
+                    "reused": max(entry["requests"] - connections, 0),
+                    "http_version": entry["http_version"]
+                }
+            return stats
+
+    def close(self):
+        self.client.close()
+
+
+class _OriginalResponse:
+    """requests从 raw._original_response.msg 读取Set-Cookie"""
+
+    def __init__(self, upstream):
+        self.msg = http.client.HTTPMessage()
+        for name, value in upstream.headers.multi_items():
+            self.msg[name] = value
+
+
+class _StreamBody:
+    """把httpx的流式响应包装成requests期望的raw对象
+
+    httpx已经解压过正文，read返回的就是解压后的字节；tell返回线上字节数（压缩后）
+    """
+
+    def __init__(self, upstream):
+        self._upstream = upstream
+        self._chunks = upstream.iter_bytes()
+        self._buffer = b""
+        self._original_response = _OriginalResponse(upstream)
+
+    def read(self, amt=None, decode_content=True):
+        try:
+            while amt is None or len(self._buffer) < amt:
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                self._buffer += chunk
+        except httpx.TimeoutException as e:
+            raise requests.ConnectionError(e)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+
+        if amt is None:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def tell(self):
+        return self._upstream.num_bytes_downloaded
+
+    def close(self):
+        self._upstream.close()
+
+    def release_conn(self):
+        self._upstream.close()
@@ -0,0 +1,462 @@
+"""
+共享HTTP客户端
+所有爬虫通过注入同一个HttpClient发请求，复用每个主机的keep-alive连接
+"""
+import os
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.adaptive_timeout import AdaptiveTimeouts
+from utils.body_reader import BodyReader, BodyRejected
+from utils.circuit_breaker import CircuitBreaker
+from utils.deadline import DeadlineExceeded, clamp_timeout, remaining_time
+from utils.http2_adapter import Http2Adapter, http2_available
+from utils.proxy_pool import ProxyPool
+from utils.rate_limiter import RateLimiter
+from utils.session_store import SessionStore
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8"
+}
+
+# 各平台默认请求头，会与爬虫自己传入的headers合并（爬虫传入的优先）
+PLATFORM_HEADERS = {
+    "bilibili": {
+        "Referer": "https://www.bilibili.com"
+    },
+    "github": {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
+    },
+    "toutiao": {
+        "Accept": "application/json, text/plain, */*",
+        "Referer": "https://www.toutiao.com",
+        "Origin": "https://www.toutiao.com"
+    },
+    "weibo": {
+        "Referer": "https://weibo.com"
+    },
+    "zhihu": {
+        "Referer": "https://www.zhihu.com"
+    }
+}
+
+
+class HttpClient:
+    """带连接池的共享HTTP客户端
+
+    Args:
+        pool_connections: 缓存的主机连接池数量
+        pool_maxsize: 每个主机连接池的最大连接数
+        default_headers: 覆盖DEFAULT_HEADERS
+        platform_headers: 覆盖/追加PLATFORM_HEADERS
+        rate_limiter: RateLimiter实例，默认按DEFAULT_BUDGETS限流；传False关闭限流
+        cache: ResponseCache实例，为None时不缓存
+        circuit_breaker: CircuitBreaker实例，为None时不熔断
+        body_reader: BodyReader实例，默认按DEFAULT_BODY_RULES限制正文大小；传False关闭
+        adaptive_timeouts: AdaptiveTimeouts实例，按接口历史耗时推算超时；为None时使用爬虫传入的timeout
+        http2: True时所有https请求走HTTP/2（需要httpx[http2]，同一主机的并发请求共用一条连接）；
+            也可以传URL前缀列表只对这些地址启用。未安装httpx时退回HTTP/1.1连接池
+        session_store: SessionStore实例，启动时加载各平台保存的cookie，首次请求平台前按需做访客引导；
+            为None时每次运行都从空cookie开始
+        proxy_pool: ProxyPool实例，请求经得分最高的代理发出；为None时直连。爬虫显式传入proxies时不经过代理池
+    """
+
+    def __init__(self, pool_connections=16, pool_maxsize=8,
+                 default_headers=None, platform_headers=None, rate_limiter=None, cache=None,
+                 circuit_breaker=None, body_reader=None, adaptive_timeouts=None, http2=False,
+                 session_store=None, proxy_pool=None):
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if default_headers:
+            self.session.headers.update(default_headers)
+
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if http2:
+            self.enable_http2(["https://"] if http2 is True else http2, fallback=adapter)
+
+        self.platform_headers = {name: dict(headers) for name, headers in PLATFORM_HEADERS.items()}
+        for name, headers in (platform_headers or {}).items():
+            self.platform_headers.setdefault(name, {}).update(headers)
+
+        if rate_limiter is None:
+            rate_limiter = RateLimiter()
+        self.rate_limiter = rate_limiter or None
+        self.cache = cache
+        self.circuit_breaker = circuit_breaker
+        if body_reader is None:
+            body_reader = BodyReader()
+        self.body_reader = body_reader or None
+        self.adaptive_timeouts = adaptive_timeouts
+        self.session_store = session_store
+        self.proxy_pool = proxy_pool
+        if session_store:
+            session_store.load_into(self.session.cookies)
+
+    def enable_http2(self, prefixes, fallback=None, **adapter_kwargs):
+        """对指定URL前缀挂载HTTP/2适配器，返回适配器；未安装httpx[http2]时返回None"""
+        if not http2_available():
+            print("⚠️ 未安装httpx[http2]，继续使用HTTP/1.1连接池")
+            return None
+        adapter = Http2Adapter(fallback=fallback or self.session.get_adapter("http://"), **adapter_kwargs)
+        for prefix in prefixes:
+            self.session.mount(prefix, adapter)
+        return adapter
+
+    def get(self, url, platform=None, headers=None, params=None, **kwargs):
+        """发送GET请求，参数与requests.get一致，见request"""
+        return self.request("GET", url, platform=platform, headers=headers, params=params, **kwargs)
+
+    def post(self, url, platform=None, headers=None, data=None, json=None, **kwargs):
+        """发送POST请求（不缓存），参数与requests.post一致，见request"""
+        return self.request("POST", url, platform=platform, headers=headers, data=data, json=json, **kwargs)
+
+    def request(self, method, url, platform=None, headers=None, params=None, rate_key=None, **kwargs):
+        """发送请求，参数与requests.request一致
+
+        只有GET请求使用响应缓存，其余限流、熔断、超时、正文上限和代理对所有方法相同。
+
+        配置了缓存且命中未过期条目时直接返回缓存，不发网络请求；
+        条目过期则带上ETag/Last-Modified做条件请求，304时复用缓存正文。
+        返回的response带有from_cache属性: None / "hit" / "revalidated"
+        接口处于熔断状态时抛出CircuitOpenError（requests.RequestException子类）
+        配置了adaptive_timeouts且该接口历史样本足够时，timeout由历史耗时推算，传入的timeout只作冷启动默认值
+        在deadline_scope内时超时不超过剩余预算，预算用完抛出DeadlineExceeded
+        正文超过接口上限或Content-Type不符时中止读取并抛出BodyRejected；
+        stream=True时只检查响应头，正文由调用方通过iter_body逐块读取
+
+        Args:
+            platform: 平台名，用于合并该平台的默认请求头
+            rate_key: 指定使用的限流桶（如批量扫描的专用预算），默认按主机/平台
+        """
+        merged_headers = dict(self.platform_headers.get(platform, {}))
+        if headers:
+            merged_headers.update(headers)
+
+        cache_key, entry, ttl = None, None, None
+        if self.cache and method == "GET":
+            full_url = self.cache.full_url(url, params)
+            ttl = self.cache.ttl_for(full_url)
+            if ttl is not None:
+                cache_key, entry = self.cache.lookup(full_url)
+                if entry and self.cache.is_fresh(entry):
+                    return self.cache.build_response(cache_key, entry, "hit")
+                if entry:
+                    merged_headers.update(self.cache.conditional_headers(entry))
+
+        breaker_key = None
+        if self.circuit_breaker:
+            breaker_key = self.circuit_breaker.endpoint_key(url)
+            self.circuit_breaker.before_request(breaker_key)
+
+        # 半开探测名额在记录结果前一直占用；预算用完、限流或其他异常提前退出时释放，
+        # 否则该接口会一直被当作正在探测而被跳过
+        try:
+            if self.rate_limiter:
+                host = urlsplit(url).netloc
+                self.rate_limiter.acquire(rate_key or self.rate_limiter.bucket_key(host, platform))
+
+            if self.session_store:
+                # 在熔断和限流检查之后引导: 接口熔断中时不引导，引导请求的超时同样受整体预算约束
+                self.session_store.ensure(platform or self.session_store.platform_of(urlsplit(url).hostname or ""),
+                                          self.session)
+
+            latency_key = None
+            if self.adaptive_timeouts:
+                latency_key = self.adaptive_timeouts.endpoint_key(url)
+                kwargs["timeout"] = self.adaptive_timeouts.timeout_for(latency_key, kwargs.get("timeout"))
+
+            timeout = kwargs.pop("timeout", None)
+            stream = kwargs.pop("stream", False)
+            try:
+                if self.proxy_pool and "proxies" not in kwargs:
+                    # 每换一个代理都按当时的剩余预算重新截短超时
+                    response = self.proxy_pool.send(
+                        platform or urlsplit(url).netloc,
+                        lambda proxies: self._send_within_deadline(
+                            url, timeout,
+                            lambda attempt_timeout: self.session.request(
+                                method, url, headers=merged_headers, params=params, proxies=proxies,
+                                stream=stream or bool(self.body_reader), timeout=attempt_timeout, **kwargs)),
+                        url=url)
+                else:
+                    response = self._send_within_deadline(
+                        url, timeout,
+                        lambda attempt_timeout: self.session.request(
+                            method, url, headers=merged_headers, params=params,
+                            stream=stream or bool(self.body_reader), timeout=attempt_timeout, **kwargs))
+            except DeadlineExceeded:
+                # 预算用完或超时是预算截短造成的，不算接口失败
+                raise
+            except requests.RequestException as e:
+                if latency_key and isinstance(e, requests.Timeout):
+                    self.adaptive_timeouts.record_timeout(latency_key, self._timeout_value(timeout, e))
+                if breaker_key:
+                    self.circuit_breaker.record_failure(breaker_key, f"{type(e).__name__}: {e}")
+                raise
+            response.from_cache = None
+            if latency_key:
+                # stream=True时elapsed是到收到响应头为止的耗时
+                self.adaptive_timeouts.record(latency_key, response.elapsed.total_seconds())
+
+            if breaker_key:
+                if self.circuit_breaker.is_failure_status(response.status_code):
+                    self.circuit_breaker.record_failure(breaker_key, f"HTTP {response.status_code}")
+                else:
+                    self.circuit_breaker.record_success(breaker_key)
+        finally:
+            if breaker_key:
+                self.circuit_breaker.release_probe(breaker_key)
+
+        if self.body_reader:
+            try:
+                if stream:
+                    self.body_reader.begin(response, url)
+                else:
+                    self.body_reader.read(response, url)
+            except requests.RequestException as e:
+                response.close()
+                if isinstance(e, BodyRejected):
+                    print(f"⚠️ {e}")
+                self.report_failure(url, f"{type(e).__name__}: {e}")
+                raise
+
+        if cache_key:
+            if entry and response.status_code == 304:
+                self.cache.refresh(cache_key, response, ttl)
+                return self.cache.build_response(cache_key, entry, "revalidated")
+            if response.status_code == 200:
+                self.cache.store(cache_key, full_url, response, ttl)
+        return response
+
+    @staticmethod
+    def _send_within_deadline(url, timeout, send):
+        """在整体预算内发送一次请求: 超时截短到剩余时间，预算已用完或截短后的超时触发时抛出DeadlineExceeded"""
+        clamped = False
+        left = remaining_time()
+        if left is not None:
+            if left <= 0:
+                raise DeadlineExceeded(f"时间预算已用完，跳过: {url}")
+            timeout, clamped = clamp_timeout(timeout, left)
+        try:
+            return send(timeout)
+        except requests.Timeout as e:
+            if clamped and not isinstance(e, DeadlineExceeded):
+                raise DeadlineExceeded(f"时间预算内未完成: {url}") from e
+            raise
+
+    @staticmethod
+    def _timeout_value(timeout, error):
+        """超时异常对应的超时秒数（连接超时取连接部分，其余取读取部分）"""
+        if isinstance(timeout, tuple):
+            return timeout[0] if isinstance(error, requests.ConnectTimeout) else timeout[1]
+        return timeout
+
+    def iter_body(self, response, chunk_size=16 * 1024):
+        """逐块读取stream=True请求的正文，同样受正文上限约束并计入统计"""
+        if self.body_reader:
+            return self.body_reader.iter_body(response)
+        return response.iter_content(chunk_size=chunk_size)
+
+    def report_failure(self, url, reason):
+        """爬虫发现返回内容无效（如接口已下线但仍返回200）时计入熔断"""
+        if self.circuit_breaker:
+            self.circuit_breaker.record_failure(self.circuit_breaker.endpoint_key(url), reason,
+                                                after_success=True)
+
+    def cached_parse(self, response, name, parse):
+        """对响应正文做一次解析并缓存结果
+
+        响应来自缓存且之前解析过时直接返回上次的结果，跳过解析。
+        Args:
+            name: 解析结果名称，同一正文可以有多种解析
+            parse: 无参函数，返回可JSON序列化的解析结果
+        """
+        parsed = self.load_parsed(response, name)
+        if parsed is not None:
+            return parsed
+
+        parsed = parse()
+        self.store_parsed(response, name, parsed)
+        return parsed
+
+    def load_parsed(self, response, name):
+        """响应来自缓存时读取之前保存的解析结果，没有则返回None"""
+        cache_key = getattr(response, "cache_key", None)
+        if self.cache and cache_key and response.from_cache:
+            return self.cache.load_derived(cache_key, name)
+        return None
+
+    def store_parsed(self, response, name, parsed):
+        """保存响应正文的解析结果，供下次命中缓存时复用"""
+        cache_key = getattr(response, "cache_key", None)
+        if self.cache and cache_key:
+            self.cache.store_derived(cache_key, name, parsed)
+
+    def connection_stats(self):
+        """连接复用统计: {主机: {requests, connections, reused}}，HTTP/2主机另有http_version"""
+        stats = {}
+        adapters = {id(adapter): adapter for adapter in self.session.adapters.values()}
+        for adapter in adapters.values():
+            if isinstance(adapter, Http2Adapter):
+                for host, entry in adapter.connection_stats().items():
+                    merged = stats.setdefault(host, {"requests": 0, "connections": 0, "reused": 0})
+                    for key in ("requests", "connections", "reused"):
+                        merged[key] += entry[key]
+                    merged["http_version"] = entry["http_version"]
+                continue
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+                entry = stats.setdefault(host, {"requests": 0, "connections": 0, "reused": 0})
+                entry["requests"] += pool.num_requests
+                entry["connections"] += pool.num_connections
+                entry["reused"] += max(pool.num_requests - pool.num_connections, 0)
+        return stats
+
+    def throttle_stats(self):
+        """限流等待统计"""
+        return self.rate_limiter.stats() if self.rate_limiter else {}
+
+    def cache_stats(self):
+        """响应缓存命中统计"""
+        return self.cache.stats() if self.cache else {}
+
+    def body_stats(self):
+        """正文读取统计"""
+        return self.body_reader.stats() if self.body_reader else {}
+
+    def timeout_stats(self):
+        """本次运行各接口使用的超时及其依据的耗时百分位"""
+        return self.adaptive_timeouts.stats() if self.adaptive_timeouts else {}
+
+    def circuit_stats(self):
+        """熔断状态统计"""
+        return self.circuit_breaker.stats() if self.circuit_breaker else {}
+
+    def proxy_stats(self):
+        """各代理按平台的耗时、成功率和剔除状态"""
+        return self.proxy_pool.stats() if self.proxy_pool else {}
+
+    def session_stats(self):
+        """各平台cookie加载、访客引导和节省的往返次数"""
+        return self.session_store.stats() if self.session_store else {}
+
+    def save_state(self):
+        """保存需要跨运行保留的状态"""
+        if self.cache:
+            self.cache.save()
+        if self.circuit_breaker:
+            self.circuit_breaker.save()
+        if self.adaptive_timeouts:
+            self.adaptive_timeouts.save()
+        if self.session_store:
+            self.session_store.save_from(self.session.cookies)
+
+    def print_stats(self):
+        """打印连接复用、限流、缓存、熔断、代理和会话复用情况"""
+        stats = self.connection_stats()
+        if stats:
+            print("🔌 连接复用统计:")
+            for host, entry in stats.items():
+                version = f" | {entry['http_version']}" if entry.get("http_version") else ""
+                print(f"  {host:30} 请求 {entry['requests']:3} | 新建连接 {entry['connections']:2} | 复用 {entry['reused']:3}{version}")
+
+        throttled = {key: entry for key, entry in self.throttle_stats().items() if entry["throttled"]}
+        if throttled:
+            print("🚦 限流等待统计:")
+            for key, entry in throttled.items():
+                print(f"  {key:30} 等待 {entry['throttled']:3} 次 | 共 {entry['throttled_seconds']:.2f}秒")
+
+        cache = self.cache_stats()
+        if cache:
+            print(f"🗄️ 响应缓存: 命中 {cache['hit']} | 未命中 {cache['miss']} | "
+                  f"重新验证 {cache['revalidated']} | 条目 {cache['entries']} ({cache['bytes']/1024:.1f}KB)")
+
+        bodies = self.body_stats()
+        if bodies:
+            print("📦 正文读取统计:")
+            for host, entry in bodies.items():
+                aborted = f" | 中止 {entry['aborted']} 次, 节省 {entry['saved_bytes']/1024:.1f}KB" if entry["aborted"] else ""
+                print(f"  {host:30} 读取 {entry['bytes']/1024:8.1f}KB (线上 {entry['wire_bytes']/1024:.1f}KB) | "
+                      f"峰值缓冲 {entry['peak_buffer']/1024:.1f}KB{aborted}")
+
+        timeouts = self.timeout_stats()
+        if timeouts:
+            print("⏱️ 接口超时:")
+            for key, entry in timeouts.items():
+                if entry["source"] == "history":
+                    connect, read = entry["timeout"]
+                    print(f"  {key:45} 连接 {connect:.1f}s 读取 {read:.1f}s | p50 {entry['p50']:.2f}s "
+                          f"p95 {entry['p95']:.2f}s p99 {entry['p99']:.2f}s ({entry['samples']} 个样本)")
+                else:
+                    timeout = entry["timeout"]
+                    if isinstance(timeout, tuple):
+                        timeout = f"连接 {timeout[0]:.1f}s 读取 {timeout[1]:.1f}"
+                    print(f"  {key:45} 默认 {timeout}s (样本不足: {entry['samples']})")
+
+        circuits = self.circuit_stats()
+        if circuits:
+            print("⛔ 熔断接口:")
+            for key, entry in circuits.items():
+                print(f"  {key:45} {entry['state']:9} 跳过 {entry['skipped']} 次")
+
+        proxies = self.proxy_stats()
+        if proxies:
+            print("🌐 代理统计:")
+            for proxy, platforms in proxies.items():
+                for platform, entry in platforms.items():
+                    latency = f"{entry['latency']:.2f}s" if entry["latency"] is not None else "-"
+                    ejected = " | 已剔除" if entry["ejected"] else ""
+                    print(f"  {proxy:28} {platform:22} 请求 {entry['requests']:3} | 失败 {entry['failures']:2} | "
+                          f"耗时 {latency} | 成功率 {entry['success']:.0%}{ejected}")
+
+        sessions = self.session_stats()
+        if sessions:
+            saved = sum(entry["saved_round_trips"] for entry in sessions.values())
+            print(f"🍪 会话复用: 本次省去 {saved} 次引导请求")
+            for platform, entry in sessions.items():
+                if entry["bootstrapped"]:
+                    state = f"访客引导 {entry['round_trips']} 次请求"
+                elif entry["saved_round_trips"]:
+                    state = f"复用cookie, 省去 {entry['saved_round_trips']} 次请求"
+                else:
+                    state = "未使用"
+                print(f"  {platform:12} 加载cookie {entry['loaded']:2} 个 | {state}")
+
+    def close(self):
+        if self.proxy_pool:
+            self.proxy_pool.close()
+        self.session.close()
+
+
+# 默认客户端的状态文件放在项目根目录的data下，与从哪个目录启动无关
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_default_client(data_dir=None):
+    """获取进程内共享的默认客户端
+
+    Args:
+        data_dir: 熔断、耗时历史和会话状态文件所在目录，默认DEFAULT_DATA_DIR；只在首次创建客户端时生效
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            data_dir = data_dir or DEFAULT_DATA_DIR
+            _default_client = HttpClient(
+                circuit_breaker=CircuitBreaker(os.path.join(data_dir, "circuit_state.json")),
+                adaptive_timeouts=AdaptiveTimeouts(os.path.join(data_dir, "latency_history.json")),
+                session_store=SessionStore(os.path.join(data_dir, "sessions.json")))
+        return _default_client
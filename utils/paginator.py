@@ -0,0 +1,57 @@
+"""
+游标分页抓取
+按游标逐页请求信息流类接口，逐条产出记录；当前页解析的同时后台已经在请求下一页。
+任何时刻最多只有当前页和预取的下一页在内存中，翻得再深内存占用也不变；
+调用方提前停止（break / close）时不再请求后续页面。
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+
+def paginate(fetch, next_cursor, parse, first_cursor=None, max_pages=None, max_items=None, prefetch=True):
+    """游标分页生成器
+
+    Args:
+        fetch: fetch(cursor) -> 页面数据，失败返回None（结束分页）
+        next_cursor: next_cursor(页面数据, 当前游标) -> 下一页游标，没有更多时返回None
+        parse: parse(页面数据) -> 可迭代的记录
+        first_cursor: 第一页的游标
+        max_pages: 最多请求多少页，None不限
+        max_items: 最多产出多少条记录，None不限
+        prefetch: 解析当前页时是否提前请求下一页
+    Yields:
+        parse产出的记录
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    seen = {first_cursor}
+    pages, items = 1, 0
+    try:
+        page = fetch(first_cursor)
+        cursor = first_cursor
+        while page is not None:
+            following, upcoming = next_cursor(page, cursor), None
+            if following is not None and following not in seen and (max_pages is None or pages < max_pages):
+                seen.add(following)
+                pages += 1
+                if executor:
+                    # 带上当前上下文，deadline_scope在预取线程中同样生效
+                    upcoming = executor.submit(contextvars.copy_context().run, fetch, following)
+            else:
+                following = None
+
+            for record in parse(page):
+                if max_items is not None and items >= max_items:
+                    return
+                items += 1
+                yield record
+
+            if following is None or (max_items is not None and items >= max_items):
+                return
+            # 先释放当前页，再等下一页
+            page = None
+            page = upcoming.result() if upcoming else fetch(following)
+            cursor = following
+    finally:
+        if executor:
+            # 预取中的请求无法中断，结果直接丢弃
+            executor.shutdown(wait=False, cancel_futures=True)
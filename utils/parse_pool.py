@@ -0,0 +1,45 @@
+"""
+解析进程池
+把下载好的页面正文交给工作进程解析，主线程/抓取线程继续发请求，
+CPU密集的HTML解析可以用满多核并与网络IO重叠
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+class ParsePool:
+    """HTML解析用的进程池
+
+    提交的解析函数必须是模块级函数，参数和返回值都是可pickle的普通数据
+    （字符串、列表、字典），不要传入爬虫实例或响应对象。
+
+    工作进程由forkserver（不支持时用spawn）启动，不直接fork当前进程:
+    进程池是在抓取线程运行时按需创建的，fork会把其他线程持有的锁（连接池、日志等）
+    原样复制进子进程，可能导致子进程死锁。
+
+    Args:
+        max_workers: 工作进程数，默认CPU核数
+        start_method: 工作进程启动方式，默认forkserver，不可用时spawn
+    """
+
+    def __init__(self, max_workers=None, start_method=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.start_method = start_method
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context(start_method))
+
+    def submit(self, func, *args):
+        """提交解析任务，返回Future"""
+        return self._executor.submit(func, *args)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,151 @@
+"""
+按主机/平台的令牌桶限流
+不同主机互不阻塞，只有某个主机的预算用完时才等待
+"""
+import threading
+import time
+
+from utils.deadline import DeadlineExceeded, remaining_time
+
+# 预算: (每秒请求数, 突发容量)，键可以是主机名或平台名
+DEFAULT_BUDGETS = {
+    "github.com": (0.5, 2),
+    "api.github.com": (1.0, 4),
+    "api.bilibili.com": (1.0, 2),
+    # BilibiliCrawler.sweep_rankings专用，同时受api.bilibili.com预算约束（见BUDGET_PARENTS），
+    # 扫描不会增加该主机的总请求速率；单独的键用于统计扫描的等待，也可以单独调低扫描占用的份额
+    "bilibili_sweep": (1.0, 2),
+    "app.bilibili.com": (1.0, 2),
+    "www.toutiao.com": (1.0, 2),
+    "weibo.com": (1.0, 2),
+    "s.weibo.com": (1.0, 2),
+    "www.zhihu.com": (0.5, 1),
+    # 知乎热榜对冲（crawlers/zhihu_hot.py）: 每次最多3个来源，允许同时发出，stagger才有意义
+    "zhihu_hedge": (0.5, 3),
+    "www.douyin.com": (0.5, 1)
+}
+
+# 专用预算 -> 同时要满足的上级预算；不在这里的专用预算（如zhihu_hedge）独立计算
+BUDGET_PARENTS = {
+    "bilibili_sweep": "api.bilibili.com"
+}
+
+
+class TokenBucket:
+    """线程安全的令牌桶
+
+    令牌不足时预约未来的令牌（允许为负），调用方在锁外等待，
+    多个线程按预约顺序依次放行。
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.clock = clock
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait=None):
+        """取一个令牌，返回需要等待的秒数；需要等待超过max_wait时不取令牌，返回None"""
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(1 - self.tokens, 0.0) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+            self.tokens -= 1
+            return wait
+
+    def refund(self):
+        """退回reserve取走的令牌（同时要满足的其他预算无法放行时）"""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class RateLimiter:
+    """令牌桶集合，每个主机（或平台）一个桶
+
+    Args:
+        budgets: {主机或平台: (每秒请求数, 突发容量)}，覆盖DEFAULT_BUDGETS
+        default_rate: 未配置主机的每秒请求数
+        default_burst: 未配置主机的突发容量
+        parents: {专用预算: 上级预算}，覆盖BUDGET_PARENTS
+        clock / sleep: 计时和等待函数，测试时可替换
+    """
+
+    def __init__(self, budgets=None, default_rate=2.0, default_burst=2, parents=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.budgets = dict(DEFAULT_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.parents = dict(BUDGET_PARENTS)
+        self.parents.update(parents or {})
+        self.clock = clock
+        self.sleep = sleep
+
+        self._buckets = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def bucket_key(self, host, platform=None):
+        """主机有单独预算时按主机限流，否则按平台，最后退回主机"""
+        if host in self.budgets:
+            return host
+        if platform and platform in self.budgets:
+            return platform
+        return host
+
+    def _get_bucket(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate, burst = self.budgets.get(key, (self.default_rate, self.default_burst))
+                bucket = TokenBucket(rate, burst, clock=self.clock)
+                self._buckets[key] = bucket
+                self._stats[key] = {"requests": 0, "throttled": 0, "throttled_seconds": 0.0}
+            return bucket
+
+    def acquire(self, key):
+        """阻塞直到该键（及其上级预算）都有可用令牌，返回实际等待秒数
+
+        Raises:
+            DeadlineExceeded: 在deadline_scope内且需要等待的时间超过剩余预算（此时不占用令牌）
+        """
+        keys = [key] + ([self.parents[key]] if key in self.parents else [])
+        left = remaining_time()
+        reserved = []
+        for name in keys:
+            bucket = self._get_bucket(name)
+            wait = bucket.reserve(max_wait=left)
+            if wait is None:
+                for taken, _ in reserved:
+                    taken.refund()
+                raise DeadlineExceeded(f"限流等待超出剩余时间预算，跳过: {name}")
+            reserved.append((bucket, wait))
+
+        # 各桶独立预约，按最晚放行的一个等待
+        wait = max(bucket_wait for _, bucket_wait in reserved)
+        if wait > 0:
+            self.sleep(wait)
+
+        with self._lock:
+            for name in keys:
+                stats = self._stats[name]
+                stats["requests"] += 1
+                if wait > 0:
+                    stats["throttled"] += 1
+                    stats["throttled_seconds"] += wait
+        return wait
+
+    def stats(self):
+        """限流统计: {键: {requests, throttled, throttled_seconds}}"""
+        with self._lock:
+            return {key: {**value, "throttled_seconds": round(value["throttled_seconds"], 3)}
+                    for key, value in self._stats.items()}
+
+    def total_throttled_seconds(self):
+        with self._lock:
+            return round(sum(value["throttled_seconds"] for value in self._stats.values()), 3)
@@ -0,0 +1,272 @@
+"""
+HTTP响应磁盘缓存
+按接口配置TTL，过期后用ETag/Last-Modified做条件请求，
+总大小超限时按最近最少使用(LRU)淘汰
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+
+# (URL前缀, TTL秒)，按顺序匹配第一个；未匹配的接口不缓存
+DEFAULT_TTL_RULES = [
+    ("https://github.com/trending", 600),
+    ("https://api.bilibili.com/x/web-interface/ranking", 300),
+    ("https://app.bilibili.com/x/v2/search/trending", 120),
+    ("https://www.toutiao.com/hot-event/hot-board", 120),
+    ("https://weibo.com/ajax/side/hotSearch", 60)
+]
+
+# 这些接口出错时仍返回200，用正文里的code表示成败；code不为0的响应不缓存，
+# 否则风控/错误页会在TTL内被当作命中反复返回
+JSON_CODE_PREFIXES = (
+    "https://api.bilibili.com/",
+    "https://app.bilibili.com/"
+)
+
+_LEADING_CODE = re.compile(rb'^\s*\{\s*"code"\s*:\s*(-?\d+)')
+
+
+class ResponseCache:
+    """磁盘响应缓存
+
+    Args:
+        cache_dir: 缓存目录，正文和索引都存放在这里
+        max_bytes: 正文总大小上限，超出时LRU淘汰
+        ttl_rules: [(URL前缀, TTL秒)]，覆盖DEFAULT_TTL_RULES
+
+    统计中的miss是查找时没有新鲜条目、需要发出请求的次数，其中304的部分另计入revalidated。
+    命中只更新内存中的访问时间，索引在save()时统一写盘。
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir="data/http_cache", max_bytes=50 * 1024 * 1024, ttl_rules=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl_rules = ttl_rules if ttl_rules is not None else DEFAULT_TTL_RULES
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+        self._dirty = False
+        self.counters = {"hit": 0, "miss": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+
+    def _load_index(self):
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ 缓存索引损坏，已重置: {e}")
+            return {}
+
+    def _save_index(self):
+        path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._dirty = False
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def save(self):
+        """把命中时更新的访问时间写入索引"""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.body")
+
+    def _derived_path(self, key, name):
+        return os.path.join(self.cache_dir, f"{key}.{name}.json")
+
+    @staticmethod
+    def full_url(url, params=None):
+        """与requests一致地拼接查询参数"""
+        if not params:
+            return url
+        return requests.Request("GET", url, params=params).prepare().url
+
+    @staticmethod
+    def key_for(full_url):
+        return hashlib.sha1(full_url.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, full_url):
+        """返回该URL的TTL，不缓存时返回None"""
+        for prefix, ttl in self.ttl_rules:
+            if full_url.startswith(prefix):
+                return ttl
+        return None
+
+    def lookup(self, full_url):
+        """返回(key, 条目)，条目不存在时为None"""
+        key = self.key_for(full_url)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry and not os.path.exists(self._body_path(key)):
+                self._index.pop(key, None)
+                entry = None
+            if entry is None or not self.is_fresh(entry):
+                self.counters["miss"] += 1
+            return key, (dict(entry) if entry else None)
+
+    @staticmethod
+    def is_fresh(entry):
+        return time.time() - entry["stored_at"] < entry["ttl"]
+
+    @staticmethod
+    def conditional_headers(entry):
+        """根据缓存条目生成条件请求头"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def build_response(self, key, entry, status):
+        """从缓存条目构造requests.Response，status为hit或revalidated"""
+        with open(self._body_path(key), "rb") as f:
+            body = f.read()
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry["url"]
+        response._content = body
+        response.encoding = entry.get("encoding")
+        response.headers.update(entry.get("headers", {}))
+        response.from_cache = status
+        response.cache_key = key
+
+        with self._lock:
+            self.counters[status] += 1
+            if key in self._index:
+                self._index[key]["last_access"] = time.time()
+                self._dirty = True
+        return response
+
+    def refresh(self, key, response, ttl):
+        """304后刷新条目的存储时间和校验值"""
+        with self._lock:
+            current = self._index.get(key)
+            if current is None:
+                return
+            current["stored_at"] = time.time()
+            current["ttl"] = ttl
+            current["etag"] = response.headers.get("ETag") or current.get("etag")
+            current["last_modified"] = response.headers.get("Last-Modified") or current.get("last_modified")
+            self._save_index()
+
+    @staticmethod
+    def is_cacheable(full_url, body):
+        """JSON_CODE_PREFIXES下的接口只缓存code为0的正文"""
+        if not full_url.startswith(JSON_CODE_PREFIXES):
+            return True
+        # 正文一般以code开头，先只看开头，匹配不到再完整解析
+        match = _LEADING_CODE.match(body[:64])
+        if match:
+            return int(match.group(1)) == 0
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return False
+        return isinstance(data, dict) and data.get("code") == 0
+
+    def store(self, key, full_url, response, ttl):
+        """保存200响应，正文变化时旧的解析结果一并失效"""
+        body = response.content
+        response.from_cache = None
+        if not self.is_cacheable(full_url, body):
+            return
+
+        with self._lock:
+            self._write_atomic(self._body_path(key), body)
+            for name in self._index.get(key, {}).get("derived", []):
+                try:
+                    os.remove(self._derived_path(key, name))
+                except OSError:
+                    pass
+
+            now = time.time()
+            self._index[key] = {
+                "url": full_url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "encoding": response.encoding,
+                "headers": {name: value for name, value in response.headers.items()
+                            if name.lower() in ("content-type", "etag", "last-modified")},
+                "stored_at": now,
+                "last_access": now,
+                "ttl": ttl,
+                "size": len(body),
+                "derived": []
+            }
+            self.counters["stored"] += 1
+            self._evict()
+            self._save_index()
+
+        response.cache_key = key
+
+    def _evict(self):
+        """按last_access淘汰，直到总大小不超过上限（调用方持有锁）"""
+        total = sum(entry["size"] for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            for path in [self._body_path(key)] + [self._derived_path(key, name) for name in entry.get("derived", [])]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            del self._index[key]
+            self.counters["evicted"] += 1
+
+    def load_derived(self, key, name):
+        """读取某个响应正文对应的解析结果，不存在时返回None"""
+        with self._lock:
+            entry = self._index.get(key)
+            if not entry or name not in entry.get("derived", []):
+                return None
+        try:
+            with open(self._derived_path(key, name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def store_derived(self, key, name, value):
+        """保存解析结果，正文被替换时自动失效"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return
+            self._write_atomic(self._derived_path(key, name),
+                               json.dumps(value, ensure_ascii=False).encode("utf-8"))
+            if name not in entry["derived"]:
+                entry["derived"].append(name)
+                self._save_index()
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self.counters,
+                "entries": len(self._index),
+                "bytes": sum(entry["size"] for entry in self._index.values())
+            }
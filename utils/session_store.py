@@ -0,0 +1,198 @@
+"""
+按平台持久化的Cookie会话
+知乎、微博等平台没有cookie时会跳转到访客验证页，需要先走几次引导请求拿到访客cookie。
+把各平台的cookie连同过期时间保存在数据目录，启动时加载；cookie仍然有效时跳过引导请求。
+"""
+import json
+import os
+import re
+import threading
+import time
+
+from requests.cookies import create_cookie
+
+from utils.deadline import clamp_timeout, remaining_time
+
+# 平台 -> cookie所属域名（按后缀匹配）
+PLATFORM_DOMAINS = {
+    "bilibili": "bilibili.com",
+    "douyin": "douyin.com",
+    "github": "github.com",
+    "toutiao": "toutiao.com",
+    "weibo": "weibo.com",
+    "zhihu": "zhihu.com"
+}
+
+
+def _weibo_visitor(session, timeout):
+    """微博访客系统: genvisitor2直接下发SUB/SUBP访客cookie"""
+    response = session.post(
+        "https://passport.weibo.com/visitor/genvisitor2",
+        data={"cb": "visitor_gray_callback", "tid": "", "from": "weibo"},
+        headers={"Referer": "https://passport.weibo.com/visitor/visitor"},
+        timeout=timeout
+    )
+    round_trips = len(response.history) + 1
+    if "SUB" not in session.cookies.get_dict(domain=".weibo.com"):
+        # 部分版本只在JSONP正文里返回，需要自己写入
+        match = re.search(r'"sub"\s*:\s*"([^"]+)".*?"subp"\s*:\s*"([^"]+)"', response.text)
+        if match:
+            for name, value in (("SUB", match.group(1)), ("SUBP", match.group(2))):
+                session.cookies.set_cookie(create_cookie(name, value, domain=".weibo.com",
+                                                         expires=int(time.time()) + 365 * 86400))
+    return round_trips
+
+
+def _zhihu_visitor(session, timeout):
+    """知乎: 首页下发_xsrf，再请求/udid拿到设备标识d_c0"""
+    home = session.get("https://www.zhihu.com/", timeout=timeout)
+    udid = session.post("https://www.zhihu.com/udid", headers={"Referer": "https://www.zhihu.com/"},
+                        timeout=timeout)
+    return len(home.history) + len(udid.history) + 2
+
+
+# 平台 -> (必需的cookie名, 引导函数)；引导函数在session上完成请求，返回实际请求次数
+DEFAULT_BOOTSTRAPS = {
+    "weibo": (("SUB",), _weibo_visitor),
+    "zhihu": (("d_c0",), _zhihu_visitor)
+}
+
+
+class SessionStore:
+    """按平台保存cookie并负责访客引导
+
+    Args:
+        state_file: cookie持久化文件
+        session_ttl: 没有过期时间的会话cookie保留多久（秒）
+        bootstraps: {平台: (必需cookie名, 引导函数)}，覆盖DEFAULT_BOOTSTRAPS
+        bootstrap_timeout: 引导请求的超时，在deadline_scope内时不超过剩余预算
+    """
+
+    def __init__(self, state_file="data/sessions.json", session_ttl=12 * 3600, bootstraps=None,
+                 bootstrap_timeout=10):
+        self.state_file = state_file
+        self.session_ttl = session_ttl
+        self.bootstraps = bootstraps if bootstraps is not None else DEFAULT_BOOTSTRAPS
+        self.bootstrap_timeout = bootstrap_timeout
+
+        self._lock = threading.Lock()
+        self._platform_locks = {platform: threading.Lock() for platform in self.bootstraps}
+        self._state = self._load()
+        self._ensured = set()
+        # 本次运行: {平台: {"loaded", "bootstrapped", "round_trips", "saved_round_trips"}}
+        self.run_stats = {}
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ 会话文件损坏，已重置: {e}")
+            return {}
+
+    @staticmethod
+    def platform_of(domain):
+        domain = domain.lstrip(".")
+        for platform, suffix in PLATFORM_DOMAINS.items():
+            if domain == suffix or domain.endswith("." + suffix):
+                return platform
+        return None
+
+    def _run_entry(self, platform):
+        return self.run_stats.setdefault(platform, {"loaded": 0, "bootstrapped": False,
+                                                    "round_trips": 0, "saved_round_trips": 0})
+
+    def load_into(self, jar):
+        """把未过期的cookie加载到requests的cookie jar，返回加载数量"""
+        now = time.time()
+        loaded = 0
+        with self._lock:
+            for platform, entry in self._state.items():
+                for cookie in entry.get("cookies", []):
+                    expires = cookie.get("expires")
+                    if expires is None:
+                        expires = entry.get("saved_at", 0) + self.session_ttl
+                    if expires <= now:
+                        continue
+                    jar.set_cookie(create_cookie(cookie["name"], cookie["value"], domain=cookie["domain"],
+                                                 path=cookie.get("path", "/"), secure=cookie.get("secure", False),
+                                                 expires=cookie.get("expires")))
+                    self._run_entry(platform)["loaded"] += 1
+                    loaded += 1
+        return loaded
+
+    def save_from(self, jar):
+        """按平台保存jar中的cookie（原子写入）"""
+        now = time.time()
+        grouped = {}
+        for cookie in jar:
+            platform = self.platform_of(cookie.domain)
+            if platform is None or (cookie.expires is not None and cookie.expires <= now):
+                continue
+            grouped.setdefault(platform, []).append({
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "secure": cookie.secure,
+                "expires": cookie.expires
+            })
+
+        with self._lock:
+            for platform, cookies in grouped.items():
+                entry = self._state.setdefault(platform, {})
+                if entry.get("cookies") != cookies:
+                    entry["saved_at"] = now
+                entry["cookies"] = cookies
+
+            directory = os.path.dirname(self.state_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.state_file + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._state, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_file)
+
+    def ensure(self, platform, session):
+        """请求该平台前确保访客cookie就绪，每次运行每个平台只检查一次
+
+        必需的cookie都在时跳过引导，并按上次引导的实际请求数记为节省的往返次数；
+        整体预算已用完时不引导（本次运行不再检查）
+        """
+        if platform not in self.bootstraps or platform in self._ensured:
+            return
+        with self._platform_locks[platform]:
+            if platform in self._ensured:
+                return
+            required, bootstrap = self.bootstraps[platform]
+            domain = PLATFORM_DOMAINS[platform]
+            present = {cookie.name for cookie in session.cookies if self.platform_of(cookie.domain) == platform}
+            run = self._run_entry(platform)
+
+            if all(name in present for name in required):
+                run["saved_round_trips"] = self._state.get(platform, {}).get("bootstrap_round_trips", 0)
+                print(f"🍪 {platform} 复用已保存的会话，省去 {run['saved_round_trips']} 次引导请求")
+            elif remaining_time() == 0:
+                print(f"⏰ {platform} 时间预算已用完，跳过会话引导")
+            else:
+                timeout = self.bootstrap_timeout
+                left = remaining_time()
+                if left is not None:
+                    timeout, _ = clamp_timeout(timeout, left)
+                try:
+                    round_trips = bootstrap(session, timeout)
+                    run["bootstrapped"] = True
+                    run["round_trips"] = round_trips
+                    with self._lock:
+                        self._state.setdefault(platform, {})["bootstrap_round_trips"] = round_trips
+                    print(f"🍪 {platform} 会话引导完成 ({round_trips} 次请求, 域名 {domain})")
+                except Exception as e:
+                    print(f"⚠️ {platform} 会话引导失败，继续无cookie请求: {e}")
+            self._ensured.add(platform)
+
+    def stats(self):
+        """本次运行各平台的会话情况"""
+        with self._lock:
+            return {platform: dict(entry) for platform, entry in self.run_stats.items()}
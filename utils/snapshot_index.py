@@ -0,0 +1,200 @@
+"""
+快照清单
+收集结果按日期分目录存放（data/YYYY/MM/DD/），每次保存追加一行到清单 data/manifest.jsonl，
+并原子更新最新快照指针: data/LATEST（全局）和 data/YYYY/MM/DD/LATEST（当天）。
+报表查找最新或某天的快照只需读一个指针文件，不再列目录、逐个stat。
+"""
+import json
+import os
+import re
+from datetime import date, datetime
+
+MANIFEST_FILE = "manifest.jsonl"
+LATEST_FILE = "LATEST"
+
+SNAPSHOT_SUFFIXES = (".json", ".ndjson", ".ndjson.gz")
+
+# 旧版平铺在数据目录下的快照
+LEGACY_PATTERN = re.compile(r"^hotspot_daily_(\d{8})_(\d{4})\.json$")
+
+
+def _day_parts(day):
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return f"{day.year:04d}", f"{day.month:02d}", f"{day.day:02d}"
+
+
+class SnapshotIndex:
+    """日期分片的快照目录及其清单
+
+    Args:
+        data_dir: 数据目录
+        prefix: 快照文件名前缀
+    """
+
+    def __init__(self, data_dir="data", prefix="hotspot_daily"):
+        self.data_dir = data_dir
+        self.prefix = prefix
+
+    def day_dir(self, day):
+        return os.path.join(self.data_dir, *_day_parts(day))
+
+    def path_for(self, captured_at):
+        """快照应保存的路径（会创建当天目录）"""
+        if isinstance(captured_at, str):
+            captured_at = datetime.fromisoformat(captured_at)
+        directory = self.day_dir(captured_at.date())
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{self.prefix}_{captured_at.strftime('%Y%m%d_%H%M')}.json")
+
+    def _write_pointer(self, pointer_path, entry):
+        tmp_path = pointer_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, pointer_path)
+
+    def _read_pointer(self, pointer_path):
+        try:
+            with open(pointer_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ 快照指针损坏 {pointer_path}: {e}")
+            return None
+
+    def record(self, path, payload, bytes_written=None):
+        """登记一个已写好的快照: 追加清单并更新全局和当天的LATEST指针
+
+        Args:
+            path: 快照文件，或增量存储的引用 "data/deltas/分段.ndjson#时间"
+            bytes_written: 本次写入的字节数，默认取文件大小
+        """
+        captured_at = datetime.fromisoformat(payload["timestamp"]).replace(microsecond=0)
+        entry = {
+            "path": os.path.relpath(path, self.data_dir),
+            "captured_at": captured_at.isoformat(),
+            "platforms": sorted(payload.get("data", {})),
+            "items": payload.get("summary", {}).get("total_items"),
+            "bytes": bytes_written if bytes_written is not None else os.path.getsize(path)
+        }
+
+        # 增量存储的快照不在当天目录下，指针所在目录可能还不存在
+        os.makedirs(self.day_dir(captured_at.date()), exist_ok=True)
+        with open(os.path.join(self.data_dir, MANIFEST_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        # 补录旧快照时不能让指针回退
+        for pointer in (os.path.join(self.day_dir(captured_at.date()), LATEST_FILE),
+                        os.path.join(self.data_dir, LATEST_FILE)):
+            current = self._read_pointer(pointer)
+            if current is None or current["captured_at"] <= entry["captured_at"]:
+                self._write_pointer(pointer, entry)
+        return entry
+
+    def latest(self, day=None):
+        """最新快照（或某天最新快照）的清单条目，没有时返回None"""
+        directory = self.day_dir(day) if day is not None else self.data_dir
+        return self._read_pointer(os.path.join(directory, LATEST_FILE))
+
+    def resolve(self, day=None):
+        """最新快照（或某天最新快照）的文件路径
+
+        还没有指针时退回扫描旧版平铺的 hotspot_daily_*.json
+        """
+        entry = self.latest(day)
+        if entry:
+            path = os.path.join(self.data_dir, entry["path"])
+            if os.path.exists(path.split("#", 1)[0]):
+                return path
+            print(f"⚠️ 指针指向的快照不存在: {path}")
+        return self._resolve_legacy(day)
+
+    def _resolve_legacy(self, day=None):
+        if not os.path.isdir(self.data_dir):
+            return None
+        wanted = "".join(_day_parts(day)) if day is not None else None
+        names = []
+        for name in os.listdir(self.data_dir):
+            match = LEGACY_PATTERN.match(name)
+            if match and (wanted is None or match.group(1) == wanted):
+                names.append(name)
+        if not names:
+            return None
+        # 文件名中的时间戳定长，按名称排序即按时间排序
+        return os.path.join(self.data_dir, max(names))
+
+    def snapshots_on(self, day):
+        """某天的全部快照路径
+
+        先列当天目录（按时间排序，含流式写入的NDJSON）；增量存储的快照不在当天目录下，
+        再从清单中按日期补上它们的引用 "data/deltas/分段.ndjson#时间"，可直接交给load_snapshot读取。
+        """
+        directory = self.day_dir(day)
+        paths = []
+        if os.path.isdir(directory):
+            paths = [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                     if name.startswith(self.prefix + "_") and name.endswith(SNAPSHOT_SUFFIXES)]
+        for entry in self.entries_on(day):
+            path = os.path.join(self.data_dir, entry["path"])
+            if "#" in path and path not in paths:
+                paths.append(path)
+        return paths
+
+    def entries_on(self, day):
+        """清单中某天登记的条目（按登记顺序）"""
+        wanted = "-".join(_day_parts(day))
+        return [entry for entry in self.entries() if entry["captured_at"][:10] == wanted]
+
+    def entries(self):
+        """遍历清单中的全部条目（按登记顺序）"""
+        path = os.path.join(self.data_dir, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # 崩溃时可能留下不完整的最后一行
+                        continue
+
+    def migrate_legacy(self):
+        """把平铺的旧快照移入日期目录并登记到清单，返回迁移数量"""
+        names = sorted(name for name in os.listdir(self.data_dir) if LEGACY_PATTERN.match(name))
+        moved = 0
+        for name in names:
+            source = os.path.join(self.data_dir, name)
+            try:
+                with open(source, "r", encoding="utf-8") as f:
+                    payload = json.load(f)
+                day, minute = LEGACY_PATTERN.match(name).groups()
+                target = self.path_for(datetime.strptime(day + minute, "%Y%m%d%H%M"))
+                os.replace(source, target)
+                self.record(target, payload)
+                moved += 1
+            except Exception as e:
+                print(f"⚠️ 迁移失败 {name}: {e}")
+        print(f"📦 已迁移 {moved} 个旧快照到日期目录")
+        return moved
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="快照清单")
+    parser.add_argument("--data-dir", default="data", help="数据目录")
+    parser.add_argument("--migrate", action="store_true", help="把平铺的旧快照移入日期目录")
+    parser.add_argument("--date", default=None, help="查看某天最新快照 (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    index = SnapshotIndex(args.data_dir)
+    if args.migrate:
+        index.migrate_legacy()
+    print(f"📌 最新快照: {index.resolve(args.date)}")
@@ -0,0 +1,177 @@
+"""
+数据源链（对冲请求）
+同一份数据有多个可替代来源时，按学习到的排名先启动最可能成功的来源，
+若它在stagger秒内没有结果（或已失败）就启动下一个，取第一个有效结果，其余的不再等待。
+各来源的胜出记录保存在数据目录，下次优先尝试最常胜出的来源。
+胜者出现后置位cancelled，仍在进行的来源应尽快停止读取；之后才返回的结果若有close()会被关闭。
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.http_client import DEFAULT_DATA_DIR
+
+# 多条链在同一进程中并发运行时，保护state_file的读改写
+_state_lock = threading.Lock()
+
+
+class SourceChain:
+    """可替代数据源的对冲执行
+
+    Args:
+        name: 链名称，用于持久化排名
+        sources: [(来源名, 无参可调用对象)]，按默认优先级排列；返回值经validate判断是否有效
+        state_file: 排名持久化文件，多条链共用，默认DEFAULT_DATA_DIR/source_chains.json
+        stagger: 启动下一个来源前等待的秒数，0表示全部同时启动
+        validate: 判断结果是否有效的函数，默认非空即有效
+        decay: 排名分数的衰减系数，越小越快适应来源变化
+    """
+
+    def __init__(self, name, sources, state_file=None, stagger=1.0,
+                 validate=None, decay=0.8):
+        self.name = name
+        self.sources = list(sources)
+        self.state_file = state_file or os.path.join(DEFAULT_DATA_DIR, "source_chains.json")
+        self.stagger = stagger
+        self.validate = validate or bool
+        self.decay = decay
+        # run()结束（出现胜者或全部失败）时置位，来源可以据此中止流式读取
+        self.cancelled = threading.Event()
+
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ 数据源排名文件损坏，已重置: {e}")
+            return {}
+
+    def _save(self, states):
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.state_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(states, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    def ranked_sources(self):
+        """按胜出分数排序的来源，分数相同时保持声明顺序"""
+        scores = self._load().get(self.name, {})
+        declared = {name: index for index, (name, _) in enumerate(self.sources)}
+        return sorted(self.sources,
+                      key=lambda source: (-scores.get(source[0], {}).get("score", 0.0), declared[source[0]]))
+
+    def run(self):
+        """执行链，返回 (结果, 报告)
+
+        结果: 第一个有效结果，全部失败时为None
+        报告: {"winner", "latency", "order", "attempts": [{"source", "status", "latency", "error"}]}
+            status: won / failed / invalid / abandoned（胜者出现时仍在进行）/ skipped（未启动）
+        """
+        order = self.ranked_sources()
+        self.cancelled.clear()
+        executor = ThreadPoolExecutor(max_workers=len(order) or 1)
+        started = time.monotonic()
+        pending = {}
+        attempts = {name: {"source": name, "status": "skipped", "latency": None, "error": ""}
+                    for name, _ in order}
+        next_index = 0
+        winner, result = None, None
+
+        def launch():
+            nonlocal next_index
+            name, func = order[next_index]
+            next_index += 1
+            # 带上当前上下文，deadline_scope在线程中同样生效
+            future = executor.submit(contextvars.copy_context().run, func)
+            pending[future] = (name, time.monotonic())
+
+        try:
+            while winner is None and (pending or next_index < len(order)):
+                if not pending:
+                    launch()
+                    continue
+
+                hedge = self.stagger if next_index < len(order) else None
+                done, _ = wait(pending, timeout=hedge, return_when=FIRST_COMPLETED)
+                if not done:
+                    # 当前来源迟迟没有结果，对冲启动下一个
+                    launch()
+                    continue
+
+                failed = False
+                for future in done:
+                    name, launched = pending.pop(future)
+                    attempt = attempts[name]
+                    attempt["latency"] = round(time.monotonic() - launched, 3)
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        attempt["status"], attempt["error"] = "failed", f"{type(e).__name__}: {e}"
+                        failed = True
+                        continue
+                    if winner is None and self.validate(value):
+                        winner, result = name, value
+                        attempt["status"] = "won"
+                    else:
+                        attempt["status"] = "invalid" if winner is None else "abandoned"
+                        failed = failed or winner is None
+
+                # 有来源失败时不必等满stagger，立即启动下一个
+                if winner is None and failed and next_index < len(order):
+                    launch()
+        finally:
+            self.cancelled.set()
+            for future, (name, _) in pending.items():
+                attempts[name]["status"] = "abandoned"
+                if not future.cancel():
+                    future.add_done_callback(_close_result)
+            # 线程无法强制中断；未启动的来源取消，进行中的来源收到cancelled后自行停止
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        report = {
+            "winner": winner,
+            "latency": round(time.monotonic() - started, 3),
+            "order": [name for name, _ in order],
+            "attempts": [attempts[name] for name, _ in order]
+        }
+        self._learn(winner, attempts)
+        self._print_report(report)
+        return result, report
+
+    def _learn(self, winner, attempts):
+        """胜者加分，所有来源分数按decay衰减"""
+        with _state_lock:
+            states = self._load()
+            chain = states.setdefault(self.name, {})
+            for name, _ in self.sources:
+                entry = chain.setdefault(name, {"score": 0.0, "wins": 0, "failures": 0})
+                entry["score"] = round(entry["score"] * self.decay + (1.0 if name == winner else 0.0), 4)
+                if name == winner:
+                    entry["wins"] += 1
+                elif attempts[name]["status"] in ("failed", "invalid"):
+                    entry["failures"] += 1
+            self._save(states)
+
+    def _print_report(self, report):
+        if report["winner"] is None:
+            print(f"❌ {self.name}: 所有数据源均失败 ({report['latency']:.2f}秒)")
+            return
+        others = [f"{attempt['source']}({attempt['status']})" for attempt in report["attempts"]
+                  if attempt["source"] != report["winner"]]
+        print(f"🏁 {self.name}: {report['winner']} 胜出 ({report['latency']:.2f}秒) | 其余: {', '.join(others)}")
+
+
+def _close_result(future):
+    """落选来源的结果（如流式响应）到达后立即关闭"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    close = getattr(future.result(), "close", None)
+    if callable(close):
+        close()
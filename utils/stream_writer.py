@@ -0,0 +1,182 @@
+"""
+流式运行文件（NDJSON，可选gzip）
+每个平台的结果一到就逐条写成紧凑的NDJSON行，平台写完追加一行完成标记并fsync；
+收集结束后原子改名为正式快照。进程中途崩溃时，已完成的平台留在未完成的运行文件
+data/unfinished_run.ndjson(.gz) 中，下次用 --resume 运行只需补采其余平台。
+
+行格式:
+    {"type": "run", "timestamp": ...}                              运行开始
+    {"type": "record", "platform", "kind", "record"}               一个条目
+    {"type": "platform", "platform", "info", "kinds"}              平台完成，之前的条目才算数
+    {"type": "meta", "key", "value"}                               summary等其余顶层字段
+gzip模式下每个平台单独压缩为一个gzip成员，崩溃只会截断最后一个未完成的成员。
+"""
+import gzip
+import json
+import os
+import zlib
+
+RUN_FILE = "unfinished_run"
+
+SUFFIXES = {False: ".ndjson", True: ".ndjson.gz"}
+
+
+def is_stream_file(path):
+    return path.endswith(SUFFIXES[False]) or path.endswith(SUFFIXES[True])
+
+
+def _dumps(entry):
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def iter_entries(path):
+    """逐行读取运行文件，遇到截断的行或gzip成员即停止"""
+    opener = gzip.open if path.endswith(".gz") else open
+    try:
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                yield entry
+    except (EOFError, gzip.BadGzipFile, zlib.error) as e:
+        print(f"⚠️ 运行文件末尾不完整，已忽略: {e}")
+
+
+def load_stream(path):
+    """把运行文件还原为收集器的快照结构，只保留已写完的平台"""
+    payload = {"timestamp": None, "platforms": {}, "data": {}}
+    pending = {}
+    for entry in iter_entries(path):
+        kind = entry.get("type")
+        if kind == "run":
+            payload["timestamp"] = entry["timestamp"]
+        elif kind == "record":
+            pending.setdefault(entry["platform"], {}).setdefault(entry["kind"], []).append(entry["record"])
+        elif kind == "platform":
+            platform = entry["platform"]
+            records = pending.pop(platform, {})
+            payload["platforms"][platform] = entry["info"]
+            if entry.get("kinds") is not None:
+                payload["data"][platform] = {name: records.get(name, []) for name in entry["kinds"]}
+        elif kind == "meta":
+            payload[entry["key"]] = entry["value"]
+    return payload
+
+
+class StreamWriter:
+    """一次收集的流式运行文件
+
+    Args:
+        data_dir: 数据目录，运行期间写入 data_dir/unfinished_run.ndjson(.gz)
+        compress: 是否gzip压缩
+        fsync: 每个平台写完后是否fsync
+    """
+
+    def __init__(self, data_dir="data", compress=False, fsync=True):
+        self.data_dir = data_dir
+        self.compress = compress
+        self.fsync = fsync
+        self.suffix = SUFFIXES[compress]
+        self.path = os.path.join(data_dir, RUN_FILE + self.suffix)
+        # {平台: {类别: 条目数}}
+        self.counts = {}
+        self._file = None
+
+    def _existing_runs(self):
+        return [path for path in (os.path.join(self.data_dir, RUN_FILE + suffix) for suffix in SUFFIXES.values())
+                if os.path.exists(path)]
+
+    def start(self, timestamp, resume=False):
+        """开始一次运行
+
+        resume时沿用未完成运行文件的时间戳，并保留其中成功完成的平台；
+        否则丢弃遗留的运行文件。
+
+        Returns:
+            (本次运行的时间戳, {已完成的平台: 平台信息})
+        """
+        done, done_data = {}, {}
+        existing = self._existing_runs()
+        if existing and resume:
+            payload = load_stream(existing[0])
+            if payload["timestamp"]:
+                timestamp = payload["timestamp"]
+                done = {platform: info for platform, info in payload["platforms"].items()
+                        if info.get("status") == "success"}
+                done_data = {platform: payload["data"].get(platform) for platform in done}
+        elif existing:
+            print(f"⚠️ 丢弃上次未完成的运行文件: {existing[0]}（使用 --resume 可续采）")
+
+        # 重写一份只含已完成平台的文件，截断的尾部和未完成的平台不会残留
+        os.makedirs(self.data_dir, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        self.counts = {}
+        self._file = open(tmp_path, "wb")
+        self._write_block([{"type": "run", "timestamp": timestamp}])
+        for platform, info in done.items():
+            self.write_platform(platform, info, done_data[platform])
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        for path in existing:
+            if path != self.path:
+                os.remove(path)
+        self._file = open(self.path, "ab")
+        return timestamp, done
+
+    def _write_block(self, entries):
+        """写入一组行并落盘；gzip模式下每组是一个独立的gzip成员"""
+        target = gzip.GzipFile(fileobj=self._file, mode="wb") if self.compress else self._file
+        for entry in entries:
+            target.write(_dumps(entry).encode("utf-8"))
+        if self.compress:
+            target.close()
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def write_platform(self, platform, info, results):
+        """逐条写出一个平台的结果并追加完成标记
+
+        Args:
+            info: 平台信息（name / status ...）
+            results: {类别: [条目]}，没有数据时为None
+        """
+        def entries():
+            for kind, records in (results or {}).items():
+                for record in records:
+                    yield {"type": "record", "platform": platform, "kind": kind, "record": record}
+            yield {"type": "platform", "platform": platform, "info": info,
+                   "kinds": list(results) if results else None}
+
+        self._write_block(entries())
+        if results:
+            self.counts[platform] = {kind: len(records) for kind, records in results.items()}
+
+    def write_meta(self, key, value):
+        self._write_block([{"type": "meta", "key": key, "value": value}])
+
+    def finalize(self, final_path):
+        """关闭并原子改名为正式快照，返回final_path"""
+        self._file.close()
+        self._file = None
+        directory = os.path.dirname(final_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        os.replace(self.path, final_path)
+        if self.fsync and hasattr(os, "O_DIRECTORY"):
+            fd = os.open(directory or ".", os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return final_path
+
+    def close(self):
+        """不改名直接关闭，运行文件留待 --resume"""
+        if self._file:
+            self._file.close()
+            self._file = None